@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Engine Benchmark
+================
+Runs the same batch of accounts through the Selenium fleet (fleet.py, one
+Chrome + ChromeDriver per worker thread) and the asyncio CDP engine
+(cdp_engine.py, browser contexts of one Chrome on one event loop) against
+the local fake Naukri site and fake Gmail API, and reports:
+
+    sessions/core   session wall time per CPU second of the whole process
+                    tree (bot + drivers + Chrome) - how many concurrent
+                    sessions one saturated core sustains
+    sessions/GB     sessions in flight per GB of peak tree RSS
+    accounts/min, p50/p90 session time and the status counts
+
+Each engine runs in its own child process, so CPU and memory are measured
+for that engine's process tree only.
+
+Usage:
+    python3 benchmark/bench_engines.py
+    python3 benchmark/bench_engines.py --accounts 24 --concurrency 8 --otp-delay 3
+    python3 benchmark/bench_engines.py --engines cdp
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import resource
+import threading
+import subprocess
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+NAUKRI_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, NAUKRI_DIR)
+
+from fake_gmail import FakeGmail
+from fake_naukri import FakeNaukri
+from run_benchmark import percentile
+
+
+def run_engine(engine, accounts_file, concurrency):
+    """Child process: run the accounts on one engine and print the summary as JSON."""
+    with open(accounts_file) as f:
+        accounts = json.load(f)
+    if engine == "cdp":
+        from cdp_engine import run_fleet_cdp
+        summary = run_fleet_cdp(accounts, contexts=concurrency)
+    else:
+        from fleet import run_fleet
+        summary = run_fleet(accounts, workers=concurrency)
+    print("BENCH_SUMMARY " + json.dumps(summary))
+
+
+def measure(engine, workdir, env, accounts_file, concurrency, timeout):
+    """
+    Run one engine as a child process, sampling its process tree's RSS.
+
+    Returns:
+        dict: summary, cpu_seconds, elapsed, peak_rss_mb
+    """
+    from daemon import process_tree_rss_mb
+
+    run_dir = os.path.join(workdir, engine)
+    os.makedirs(run_dir)
+    before = resource.getrusage(resource.RUSAGE_CHILDREN)
+    start = time.time()
+    log_path = os.path.join(run_dir, "output.log")
+    with open(log_path, "w") as log:
+        child = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "--run-engine", engine,
+             "--accounts-file", accounts_file, "--concurrency", str(concurrency)],
+            cwd=run_dir, env=env, stdout=log, stderr=subprocess.STDOUT)
+
+        peak = [0.0]
+        done = threading.Event()
+
+        def sample():
+            while not done.wait(0.2):
+                peak[0] = max(peak[0], process_tree_rss_mb(child.pid) or 0.0)
+
+        sampler = threading.Thread(target=sample, daemon=True)
+        sampler.start()
+        try:
+            child.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            child.kill()
+            child.wait()
+        done.set()
+        sampler.join()
+    elapsed = time.time() - start
+    after = resource.getrusage(resource.RUSAGE_CHILDREN)
+
+    summary = None
+    with open(log_path) as f:
+        for line in f:
+            if line.startswith("BENCH_SUMMARY "):
+                summary = json.loads(line.split(" ", 1)[1])
+    return {
+        "summary": summary,
+        "cpu_seconds": (after.ru_utime - before.ru_utime) + (after.ru_stime - before.ru_stime),
+        "elapsed": elapsed,
+        "peak_rss_mb": peak[0],
+        "log": log_path,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Selenium fleet against the asyncio CDP engine.")
+    parser.add_argument("--accounts", type=int, default=12)
+    parser.add_argument("--concurrency", type=int, default=4,
+                        help="Selenium browser workers / CDP browser contexts")
+    parser.add_argument("--engines", nargs="+", default=["selenium", "cdp"], choices=["selenium", "cdp"])
+    parser.add_argument("--latency-ms", type=int, default=50, help="Fake Naukri response latency")
+    parser.add_argument("--otp-delay", type=float, default=2.0,
+                        help="Seconds between the login click and the OTP mail arriving")
+    parser.add_argument("--gmail-latency-ms", type=int, default=30)
+    parser.add_argument("--timeout", type=int, default=900, help="Per-engine timeout in seconds")
+    parser.add_argument("--run-engine", choices=["selenium", "cdp"], help=argparse.SUPPRESS)
+    parser.add_argument("--accounts-file", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_engine:
+        run_engine(args.run_engine, args.accounts_file, args.concurrency)
+        return
+
+    gmail = FakeGmail(latency_ms=args.gmail_latency_ms).start()
+    naukri = FakeNaukri(
+        on_otp=lambda otp, email: gmail.deliver_otp(otp, args.otp_delay, recipient=email),
+        latency_ms=args.latency_ms,
+    ).start()
+    workdir = tempfile.mkdtemp(prefix="naukri-engines-")
+    accounts_file = os.path.join(workdir, "accounts.json")
+    with open(accounts_file, "w") as f:
+        json.dump([{"email": f"bench+{i}@example.com", "password": "bench-password"}
+                   for i in range(args.accounts)], f)
+
+    env = dict(os.environ)
+    env.update({
+        "PYTHONPATH": NAUKRI_DIR,
+        "NAUKRI_BASE_URL": naukri.base_url,
+        "GMAIL_API_BASE_URL": gmail.base_url,
+        "GMAIL_TOKEN_URI": f"{gmail.base_url}/token",
+        "GMAIL_CLIENT_ID": "bench",
+        "GMAIL_CLIENT_SECRET": "bench",
+        "GMAIL_REFRESH_TOKEN": "bench",
+        "OTP_SOURCE": "gmail_api",
+        "HEADLESS": "true",
+        "SCREENSHOT_LEVEL": "failure",
+        "GMAIL_TOKEN_CACHE": os.path.join(workdir, "gmail_token_cache"),
+        "LOCATOR_CACHE_FILE": os.path.join(workdir, "locators.json"),
+        "OTP_STATE_DIR": os.path.join(workdir, "otp_state"),
+        "OTP_SOURCE_STATS": os.path.join(workdir, "otp_sources.json"),
+        "RUN_HISTORY_DB": os.path.join(workdir, "history.db"),
+    })
+    env.pop("NAUKRI_SESSION_KEY", None)
+
+    print(f"[Bench] {args.accounts} accounts, concurrency {args.concurrency}, "
+          f"fake Naukri at {naukri.base_url}")
+    reports = {}
+    try:
+        for engine in args.engines:
+            print(f"\n[Bench] {engine}...")
+            reports[engine] = measure(engine, workdir, env, accounts_file, args.concurrency, args.timeout)
+            summary = reports[engine]["summary"]
+            print(f"[Bench] {engine}: {summary['status_counts'] if summary else 'no summary'} "
+                  f"in {reports[engine]['elapsed']:.1f}s (log: {reports[engine]['log']})")
+    finally:
+        naukri.stop()
+        gmail.stop()
+
+    print(f"\n{'engine':<10}{'ok':>5}{'acc/min':>9}{'p50':>8}{'p90':>8}{'cpu s':>8}"
+          f"{'peak MB':>9}{'sess/core':>11}{'sess/GB':>9}")
+    for engine, r in reports.items():
+        summary = r["summary"]
+        if not summary:
+            print(f"{engine:<10}  failed - see {r['log']}")
+            continue
+        sessions = [x["duration_seconds"] for x in summary["results"] if x["status"] == "SUCCESS"]
+        session_seconds = sum(x["duration_seconds"] for x in summary["results"])
+        per_core = session_seconds / r["cpu_seconds"] if r["cpu_seconds"] else 0.0
+        in_flight = min(args.concurrency, args.accounts)
+        per_gb = in_flight / (r["peak_rss_mb"] / 1024) if r["peak_rss_mb"] else 0.0
+        p50, p90 = (f"{percentile(sessions, pct):.1f}s" if sessions else "-" for pct in (50, 90))
+        print(f"{engine:<10}{len(sessions):>5}{summary['accounts_per_minute']:>9.1f}{p50:>8}{p90:>8}"
+              f"{r['cpu_seconds']:>8.1f}{r['peak_rss_mb']:>9.0f}{per_core:>11.1f}{per_gb:>9.1f}")
+    print("\n[Bench] sess/core: session seconds per CPU second of the engine's process tree;"
+          " sess/GB: sessions in flight per GB of peak RSS.")
+
+
+if __name__ == "__main__":
+    main()
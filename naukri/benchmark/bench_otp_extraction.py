@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+OTP Extraction Benchmark
+========================
+Measures throughput and accuracy of OTP extraction over the sample corpus
+(otp_corpus.py, which includes the real Naukri mail from the bundled PDF),
+for the current extractor and the previous reader logic.
+
+Usage:
+    python3 benchmark/bench_otp_extraction.py
+    python3 benchmark/bench_otp_extraction.py --copies 200 --repeat 5
+
+Exits non-zero if the current extractor gets any sample wrong.
+"""
+
+import os
+import re
+import sys
+import time
+import base64
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from otp_corpus import build_corpus, to_gmail_message
+from otp_extractor import MIN_CONFIDENCE, otp_from_email_message, otp_from_gmail_message
+
+
+def legacy_otp(message):
+    """The reader's previous logic: top-level text/plain or body, then five regexes and a 6-digit fallback."""
+    payload = message["payload"]
+    text = message.get("snippet", "")
+    for part in payload.get("parts", []):
+        if part["mimeType"] == "text/plain" and part["body"].get("data"):
+            text = base64.urlsafe_b64decode(part["body"]["data"]).decode("utf-8")
+            break
+    else:
+        if "data" in payload.get("body", {}):
+            text = base64.urlsafe_b64decode(payload["body"]["data"]).decode("utf-8")
+    patterns = [
+        r'OTP\s*(?:is|:)?\s*(\d{4,6})',
+        r'(?:verification|confirm(?:ation)?)\s*code\s*(?:is|:)?\s*(\d{4,6})',
+        r'(\d{4,6})\s*is\s*your\s*(?:OTP|code)',
+        r'code\s*(?:is|:)?\s*(\d{4,6})',
+        r'(?:one[- ]time|temporary)\s*(?:password|code)\s*(?:is|:)?\s*(\d{4,6})',
+    ]
+    for pattern in patterns:
+        match = re.search(pattern, text, re.IGNORECASE)
+        if match:
+            return match.group(1)
+    match = re.search(r'(?<!\d)(\d{6})(?!\d)', text)
+    return match.group(1) if match else None
+
+
+def current_gmail(message):
+    otp, confidence = otp_from_gmail_message(message)
+    return otp if confidence >= MIN_CONFIDENCE else None
+
+
+def current_email(message):
+    otp, confidence = otp_from_email_message(message)
+    return otp if confidence >= MIN_CONFIDENCE else None
+
+
+def run(name, extract, samples, repeat):
+    """Time extract over all samples and score it against the expected OTPs."""
+    results = []
+    start = time.perf_counter()
+    for _ in range(repeat):
+        results = [extract(message) for _, message, _ in samples]
+    elapsed = time.perf_counter() - start
+
+    wrong = {}
+    for (template, _, expected), got in zip(samples, results):
+        if got != expected:
+            wrong[template] = wrong.get(template, 0) + 1
+    correct = len(samples) - sum(wrong.values())
+    return {
+        "name": name,
+        "per_second": len(samples) * repeat / elapsed,
+        "us_per_message": elapsed / (len(samples) * repeat) * 1e6,
+        "accuracy": correct / len(samples),
+        "wrong": wrong,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark OTP extraction on a sample corpus.")
+    parser.add_argument("--copies", type=int, default=50, help="Mails per corpus template")
+    parser.add_argument("--repeat", type=int, default=3, help="Passes over the corpus")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    corpus = build_corpus(copies=args.copies, seed=args.seed)
+    gmail_samples = [(t, to_gmail_message(m, f"m{i}"), otp) for i, (t, m, otp) in enumerate(corpus)]
+    print(f"[Bench] {len(corpus)} sample mails, {args.repeat} passes")
+
+    reports = [
+        run("legacy (Gmail API)", legacy_otp, gmail_samples, args.repeat),
+        run("current (Gmail API)", current_gmail, gmail_samples, args.repeat),
+        run("current (raw MIME)", current_email, corpus, args.repeat),
+    ]
+
+    print(f"\n{'extractor':<22}{'msgs/s':>10}{'us/msg':>10}{'accuracy':>10}")
+    for r in reports:
+        print(f"{r['name']:<22}{r['per_second']:>10.0f}{r['us_per_message']:>10.1f}{r['accuracy']:>10.1%}")
+    for r in reports:
+        for template, count in sorted(r["wrong"].items()):
+            print(f"[Bench] {r['name']}: {count} wrong in {template}")
+
+    if any(r["wrong"] for r in reports if r["name"].startswith("current")):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
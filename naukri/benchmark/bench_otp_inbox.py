@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Shared Inbox Benchmark
+======================
+Simulates many concurrent logins whose OTP mails all land in one mailbox
+(plus-addressed aliases) and compares one Gmail API reader per login with
+a single otp_inbox.SharedInbox, against FakeGmail: API requests, OTPs
+handed to the wrong login, timeouts and time-to-OTP.
+
+Usage:
+    python3 benchmark/bench_otp_inbox.py
+    python3 benchmark/bench_otp_inbox.py --logins 20 --spread 10 --latency-ms 50
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import threading
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from fake_gmail import FakeGmail
+from run_benchmark import percentile
+
+
+def simulate(gmail, open_source, logins, spread, otp_delay, timeout, seed):
+    """
+    Start logins over spread seconds; each baselines its source, has its OTP
+    delivered otp_delay (+ jitter) seconds later and waits for it.
+
+    Returns:
+        dict: requests, wrong, timeouts and time-to-OTP latencies
+    """
+    rng = random.Random(seed)
+    plans = [(i, rng.uniform(0, spread), otp_delay + rng.uniform(0, 1.5)) for i in range(logins)]
+    outcomes = {}
+
+    def login(index, start_after, delay):
+        time.sleep(start_after)
+        address = f"bench+{index}@example.com"
+        otp = f"{500000 + index}"
+        source = open_source(address)
+        source.capture_baseline()
+        started = time.time()
+        gmail.deliver_otp(otp, delay, recipient=address)
+        try:
+            got = source.wait_for_otp(sender_filter="naukri.com", max_wait_seconds=delay + timeout)
+        finally:
+            source.close()
+        outcomes[index] = (otp, got, time.time() - started - delay)
+
+    before = gmail.requests
+    threads = [threading.Thread(target=login, args=plan) for plan in plans]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return {
+        "requests": gmail.requests - before,
+        "wrong": sum(1 for otp, got, _ in outcomes.values() if got and got != otp),
+        "timeouts": sum(1 for _, got, _ in outcomes.values() if not got),
+        "latencies": [late for otp, got, late in outcomes.values() if got == otp],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-login OTP readers vs a shared inbox.")
+    parser.add_argument("--logins", type=int, default=10)
+    parser.add_argument("--spread", type=float, default=5.0, help="Logins start within this many seconds")
+    parser.add_argument("--otp-delay", type=float, default=2.0, help="Seconds from login click to OTP mail")
+    parser.add_argument("--latency-ms", type=int, default=30, help="Fake Gmail response latency")
+    parser.add_argument("--timeout", type=float, default=20.0, help="Extra wait per login before giving up")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    gmail = FakeGmail(latency_ms=args.latency_ms).start()
+    workdir = tempfile.mkdtemp(prefix="otp_inbox_")
+    # gmail_client reads these at import time
+    os.environ.update({
+        "GMAIL_API_BASE_URL": gmail.base_url,
+        "GMAIL_TOKEN_URI": f"{gmail.base_url}/token",
+        "GMAIL_CLIENT_ID": "bench",
+        "GMAIL_CLIENT_SECRET": "bench",
+        "GMAIL_REFRESH_TOKEN": "bench",
+        "GMAIL_TOKEN_CACHE": os.path.join(workdir, "gmail_token_cache"),
+        "OTP_SOURCE_STATS": os.path.join(workdir, "sources.json"),
+    })
+    from otp_inbox import SharedInbox
+    from otp_sources import open_otp_source
+
+    print(f"[Bench] {args.logins} logins over {args.spread:.0f}s, one shared mailbox")
+    reports = {}
+    try:
+        print("\n[Bench] One Gmail reader per login")
+        reports["per-login readers"] = simulate(
+            gmail, lambda address: open_otp_source(address, name="gmail_api"),
+            args.logins, args.spread, args.otp_delay, args.timeout, args.seed)
+
+        print("\n[Bench] Shared inbox")
+        inbox = SharedInbox.open(name="gmail_api").start()
+        try:
+            reports["shared inbox"] = simulate(
+                gmail, inbox.ticket, args.logins, args.spread, args.otp_delay, args.timeout, args.seed)
+        finally:
+            inbox.stop()
+        print(f"[Bench] Shared inbox counters: {inbox.stats()}")
+    finally:
+        gmail.stop()
+
+    print(f"\n{'mode':<19}{'requests':>10}{'req/login':>11}{'wrong':>7}{'timeouts':>10}{'p50':>8}{'p90':>8}")
+    for name, r in reports.items():
+        latencies = r["latencies"]
+        p50, p90 = (f"{percentile(latencies, pct):.2f}s" if latencies else "-" for pct in (50, 90))
+        print(f"{name:<19}{r['requests']:>10}{r['requests'] / args.logins:>11.1f}{r['wrong']:>7}"
+              f"{r['timeouts']:>10}{p50:>8}{p90:>8}")
+    print("\n[Bench] p50/p90: seconds from the OTP mail landing to the right login receiving it.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+OTP Source Benchmark
+====================
+Measures how quickly each OTP source (otp_sources.py) picks up an OTP mail
+after it lands, and how many server round trips the wait costs, against
+local fakes: FakeGmail (history.list polling), FakeIMAP (IDLE push) and a
+temporary Maildir.
+
+Usage:
+    python3 benchmark/bench_otp_sources.py
+    python3 benchmark/bench_otp_sources.py --trials 20 --otp-delay 3 --latency-ms 40
+    python3 benchmark/bench_otp_sources.py --sources imap maildir
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import threading
+from email.message import EmailMessage
+from email.utils import formatdate
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from fake_gmail import FakeGmail, OTP_MAIL_HTML
+from fake_imap import FakeIMAP
+from run_benchmark import percentile
+
+
+def deliver_maildir(path, otp, serial):
+    """Deliver an OTP mail the Maildir way: write into tmp/, then rename into new/."""
+    msg = EmailMessage()
+    msg["From"] = "Naukri <info@naukri.com>"
+    msg["To"] = "bot@example.com"
+    msg["Subject"] = "Your OTP for logging in Naukri account"
+    msg["Date"] = formatdate(localtime=True)
+    msg.set_content(OTP_MAIL_HTML.format(otp=otp), subtype="html")
+    name = f"{time.time():.6f}.bench{serial}.localhost"
+    with open(os.path.join(path, "tmp", name), "wb") as f:
+        f.write(msg.as_bytes())
+    os.rename(os.path.join(path, "tmp", name), os.path.join(path, "new", name))
+
+
+def deliver_maildir_later(path, otp, delay_seconds, serial):
+    timer = threading.Timer(delay_seconds, deliver_maildir, args=(path, otp, serial))
+    timer.daemon = True
+    timer.start()
+
+
+def bench_source(name, deliver, counter, trials, otp_delay, timeout):
+    """
+    Connect the source once, then per trial: baseline, deliver an OTP after
+    otp_delay seconds, and time the wait.
+
+    Returns:
+        dict: detection latencies (seconds after delivery), misses and requests per trial
+    """
+    from otp_sources import open_otp_source
+
+    connect_start = time.time()
+    source = open_otp_source(name=name)
+    if source is None:
+        return None
+    connect_seconds = time.time() - connect_start
+
+    latencies, misses, requests = [], 0, []
+    try:
+        for trial in range(trials):
+            otp = f"{700000 + trial}"
+            source.baseline_time = None
+            source.capture_baseline()
+            before = counter()
+            delivered_at = time.time() + otp_delay
+            deliver(otp, otp_delay, trial)
+            got = source.wait_for_otp(sender_filter="naukri.com", max_wait_seconds=otp_delay + timeout)
+            if got == otp:
+                latencies.append(time.time() - delivered_at)
+            else:
+                misses += 1
+            requests.append(counter() - before)
+    finally:
+        source.close()
+    return {"connect": connect_seconds, "latencies": latencies, "misses": misses, "requests": requests}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark OTP sources against local fakes.")
+    parser.add_argument("--trials", type=int, default=10)
+    parser.add_argument("--otp-delay", type=float, default=2.0,
+                        help="Seconds between the baseline and the OTP mail landing")
+    parser.add_argument("--latency-ms", type=int, default=30, help="Fake Gmail/IMAP response latency")
+    parser.add_argument("--timeout", type=float, default=15.0, help="Extra wait per trial before a miss")
+    parser.add_argument("--sources", nargs="+", default=["gmail_api", "imap", "maildir"],
+                        choices=["gmail_api", "imap", "maildir"])
+    args = parser.parse_args()
+
+    gmail = FakeGmail(latency_ms=args.latency_ms).start()
+    imap = FakeIMAP(latency_ms=args.latency_ms).start()
+    workdir = tempfile.mkdtemp(prefix="otp_sources_")
+    maildir = os.path.join(workdir, "Maildir")
+    for sub in ("tmp", "new", "cur"):
+        os.makedirs(os.path.join(maildir, sub))
+
+    # gmail_client reads these at import time
+    os.environ.update({
+        "GMAIL_API_BASE_URL": gmail.base_url,
+        "GMAIL_TOKEN_URI": f"{gmail.base_url}/token",
+        "GMAIL_CLIENT_ID": "bench",
+        "GMAIL_CLIENT_SECRET": "bench",
+        "GMAIL_REFRESH_TOKEN": "bench",
+        "GMAIL_TOKEN_CACHE": os.path.join(workdir, "gmail_token_cache"),
+        "IMAP_HOST": imap.address[0],
+        "IMAP_PORT": str(imap.address[1]),
+        "IMAP_SSL": "false",
+        "IMAP_USER": "bench@example.com",
+        "IMAP_PASSWORD": "bench",
+        "MAILDIR_PATH": maildir,
+    })
+
+    # (deliver(otp, delay, serial), server request counter) per source;
+    # a Maildir has no server, only directory scans
+    setups = {
+        "gmail_api": (lambda otp, delay, _: gmail.deliver_otp(otp, delay), lambda: gmail.requests),
+        "imap": (lambda otp, delay, _: imap.deliver_otp(otp, delay), lambda: imap.commands),
+        "maildir": (lambda otp, delay, serial: deliver_maildir_later(maildir, otp, delay, serial), lambda: 0),
+    }
+
+    reports = {}
+    try:
+        for name in args.sources:
+            print(f"\n[Bench] {name}: {args.trials} trials, OTP lands {args.otp_delay:.1f}s after the baseline")
+            deliver, counter = setups[name]
+            reports[name] = bench_source(name, deliver, counter, args.trials, args.otp_delay, args.timeout)
+    finally:
+        gmail.stop()
+        imap.stop()
+
+    print(f"\n{'source':<11}{'connect':>9}{'p50':>9}{'p90':>9}{'max':>9}{'misses':>8}{'req/otp':>9}")
+    for name, report in reports.items():
+        if report is None:
+            print(f"{name:<11}  could not be opened")
+            continue
+        latencies = report["latencies"] or [float("nan")]
+        requests = report["requests"]
+        per_otp = f"{sum(requests) / len(requests):.1f}" if requests and name != "maildir" else "-"
+        print(f"{name:<11}{report['connect']:>8.3f}s{percentile(latencies, 50):>8.3f}s"
+              f"{percentile(latencies, 90):>8.3f}s{max(latencies):>8.3f}s{report['misses']:>8}"
+              f"{per_otp:>9}")
+    print("\n[Bench] Latency is measured from the moment the mail lands to the OTP being returned.")
+
+
+if __name__ == "__main__":
+    main()
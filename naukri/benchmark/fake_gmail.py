@@ -0,0 +1,159 @@
+import json
+import time
+import uuid
+import base64
+import threading
+from email.parser import Parser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+OTP_MAIL_HTML = (
+    "<html><body><p>Hi,</p>"
+    "<p>Your OTP for logging in Naukri account is <b>{otp}</b>.</p>"
+    "<p>It is valid for 10 minutes.</p></body></html>"
+)
+
+
+class FakeGmail:
+    """
+    Stand-in for the parts of the Gmail API the OTP reader uses: the OAuth
+    token endpoint, users.getProfile, users.history.list, users.messages.list,
+    users.messages.get and batch requests.
+
+    deliver_otp() makes an OTP mail from Naukri appear in the inbox after a
+    delay, the way the real one lands some seconds after the login click.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency_ms=0):
+        self.latency = latency_ms / 1000.0
+        self.messages = []
+        self.history_id = 1000
+        self.requests = 0
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, name="fake-gmail", daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def deliver_otp(self, otp, delay_seconds=0.0, sender="Naukri <info@naukri.com>",
+                    recipient="bot@example.com"):
+        """Add an OTP mail to the inbox after delay_seconds (non-blocking)."""
+        def deliver():
+            with self._lock:
+                self.history_id += 1
+                body = OTP_MAIL_HTML.format(otp=otp).encode("utf-8")
+                self.messages.append({
+                    "id": uuid.uuid4().hex[:16],
+                    "historyId": str(self.history_id),
+                    "internalDate": str(int(time.time() * 1000)),
+                    "snippet": f"Your OTP for logging in Naukri account is {otp}",
+                    "payload": {
+                        "mimeType": "text/html",
+                        "headers": [
+                            {"name": "From", "value": sender},
+                            {"name": "To", "value": recipient},
+                            {"name": "Subject", "value": "Your OTP for logging in Naukri account"},
+                        ],
+                        "body": {"data": base64.urlsafe_b64encode(body).decode("ascii")},
+                    },
+                })
+        timer = threading.Timer(delay_seconds, deliver)
+        timer.daemon = True
+        timer.start()
+
+    # -- API ----------------------------------------------------------------
+
+    def handle(self, method, path, query):
+        """Return (status, body dict) for one API call."""
+        with self._lock:
+            self.requests += 1
+            if method == "POST" and path.endswith("/token"):
+                return 200, {"access_token": "fake-token", "expires_in": 3600, "token_type": "Bearer"}
+            if path == "/gmail/v1/users/me/profile":
+                return 200, {"emailAddress": "bot@example.com", "historyId": str(self.history_id)}
+            if path == "/gmail/v1/users/me/history":
+                start = int(query.get("startHistoryId", ["0"])[0])
+                added = [m for m in self.messages if int(m["historyId"]) > start]
+                return 200, {
+                    "history": [{"id": m["historyId"], "messagesAdded": [{"message": {"id": m["id"]}}]}
+                                for m in added],
+                    "historyId": str(self.history_id),
+                }
+            if path == "/gmail/v1/users/me/messages":
+                newest = sorted(self.messages, key=lambda m: m["internalDate"], reverse=True)
+                limit = int(query.get("maxResults", ["100"])[0])
+                return 200, {"messages": [{"id": m["id"]} for m in newest[:limit]]}
+            if path.startswith("/gmail/v1/users/me/messages/"):
+                msg_id = path.rsplit("/", 1)[1]
+                for message in self.messages:
+                    if message["id"] == msg_id:
+                        return 200, message
+                return 404, {"error": {"code": 404, "message": "Not Found"}}
+        return 404, {"error": {"code": 404, "message": f"No fake for {method} {path}"}}
+
+    def handle_batch(self, content_type, body):
+        """Answer a multipart/mixed batch request part by part."""
+        request = Parser().parsestr(f"Content-Type: {content_type}\r\n\r\n{body}")
+        boundary = f"batch_{uuid.uuid4().hex}"
+        parts = []
+        for part in request.get_payload():
+            request_line = part.get_payload().lstrip().split("\n", 1)[0].strip()
+            method, url = request_line.split(" ")[:2]
+            target = urlsplit(url)
+            status, payload = self.handle(method, target.path, parse_qs(target.query))
+            content_id = part["Content-ID"].strip()
+            parts.append(
+                f"--{boundary}\r\n"
+                "Content-Type: application/http\r\n"
+                f"Content-ID: <response-{content_id[1:]}\r\n\r\n"
+                f"HTTP/1.1 {status} {'OK' if status == 200 else 'Not Found'}\r\n"
+                "Content-Type: application/json; charset=UTF-8\r\n\r\n"
+                f"{json.dumps(payload)}\r\n"
+            )
+        return f"multipart/mixed; boundary={boundary}", "".join(parts) + f"--{boundary}--\r\n"
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _reply(self, status, content_type, body):
+                data = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _serve(self, method):
+                time.sleep(fake.latency)
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length).decode("utf-8") if length else ""
+                target = urlsplit(self.path)
+                if target.path == "/batch":
+                    content_type, payload = fake.handle_batch(self.headers["Content-Type"], body)
+                    self._reply(200, content_type, payload)
+                    return
+                status, payload = fake.handle(method, target.path, parse_qs(target.query))
+                self._reply(status, "application/json; charset=UTF-8", json.dumps(payload))
+
+            def do_GET(self):
+                self._serve("GET")
+
+            def do_POST(self):
+                self._serve("POST")
+
+        return Handler
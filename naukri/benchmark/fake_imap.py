@@ -0,0 +1,174 @@
+import re
+import time
+import socket
+import threading
+import socketserver
+from email.message import EmailMessage
+from email.utils import formatdate
+
+from fake_gmail import OTP_MAIL_HTML
+
+
+class FakeIMAP:
+    """
+    Stand-in for an IMAP4rev1 server with IDLE, covering what
+    otp_sources.IMAPIdleSource uses: CAPABILITY, LOGIN, SELECT/EXAMINE,
+    UID SEARCH, UID FETCH, IDLE/DONE, NOOP and LOGOUT. Plain TCP, one INBOX,
+    any login accepted.
+
+    deliver_otp() makes an OTP mail appear after a delay and pushes
+    "* n EXISTS" to every client that is idling at that moment.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency_ms=0):
+        self.latency = latency_ms / 1000.0
+        self.messages = []  # (uid, internal_time, raw bytes)
+        self.next_uid = 1
+        self.commands = 0
+        self._lock = threading.Lock()
+        self._idlers = set()
+        self.server = socketserver.ThreadingTCPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+
+    @property
+    def address(self):
+        return self.server.server_address[:2]
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, name="fake-imap", daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def deliver(self, raw, delay_seconds=0.0):
+        """Append a raw RFC 822 message after delay_seconds (non-blocking)."""
+        def deliver():
+            with self._lock:
+                self.messages.append((self.next_uid, time.time(), raw))
+                self.next_uid += 1
+                exists = len(self.messages)
+                idlers = list(self._idlers)
+            for conn in idlers:
+                conn.push(f"* {exists} EXISTS")
+        timer = threading.Timer(delay_seconds, deliver)
+        timer.daemon = True
+        timer.start()
+
+    def deliver_otp(self, otp, delay_seconds=0.0, sender="Naukri <info@naukri.com>",
+                    recipient="bot@example.com"):
+        msg = EmailMessage()
+        msg["From"] = sender
+        msg["To"] = recipient
+        msg["Subject"] = "Your OTP for logging in Naukri account"
+        msg["Date"] = formatdate(localtime=True)
+        msg.set_content(OTP_MAIL_HTML.format(otp=otp), subtype="html")
+        self.deliver(msg.as_bytes(), delay_seconds)
+
+    # -- protocol -----------------------------------------------------------
+
+    def _search(self, criteria):
+        """UID SEARCH UID <set> - the only search the source sends."""
+        match = re.match(r"UID (\d+|\*)(?::(\d+|\*))?$", criteria.strip(), re.I)
+        if not match or not self.messages:
+            return []
+        highest = self.messages[-1][0]
+        low = highest if match.group(1) == "*" else int(match.group(1))
+        high = low if match.group(2) is None else (highest if match.group(2) == "*" else int(match.group(2)))
+        low, high = min(low, high), max(low, high)
+        uids = [uid for uid, _, _ in self.messages if low <= uid <= high]
+        # RFC 3501: a range ending in * always includes the highest UID
+        if (match.group(1) == "*" or match.group(2) == "*") and highest not in uids:
+            uids.append(highest)
+        return uids
+
+    def _handler(self):
+        fake = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def push(self, line):
+                with self.write_lock:
+                    self.wfile.write(line.encode("ascii") + b"\r\n")
+                    self.wfile.flush()
+
+            def push_bytes(self, data):
+                with self.write_lock:
+                    self.wfile.write(data)
+                    self.wfile.flush()
+
+            def handle(self):
+                self.write_lock = threading.Lock()
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                self.push("* OK [CAPABILITY IMAP4rev1 IDLE] Fake IMAP ready")
+                while True:
+                    line = self.rfile.readline()
+                    if not line:
+                        return
+                    parts = line.decode("utf-8", "replace").rstrip("\r\n").split(" ", 2)
+                    if len(parts) < 2:
+                        continue
+                    tag, command = parts[0], parts[1].upper()
+                    args = parts[2] if len(parts) > 2 else ""
+                    with fake._lock:
+                        fake.commands += 1
+                    if fake.latency:
+                        time.sleep(fake.latency)
+                    if not self.dispatch(tag, command, args):
+                        return
+
+            def dispatch(self, tag, command, args):
+                if command == "CAPABILITY":
+                    self.push("* CAPABILITY IMAP4rev1 IDLE")
+                elif command in ("LOGIN", "NOOP"):
+                    pass
+                elif command in ("SELECT", "EXAMINE"):
+                    with fake._lock:
+                        self.push(f"* {len(fake.messages)} EXISTS")
+                        self.push("* OK [UIDVALIDITY 1] UIDs valid")
+                        self.push(f"* OK [UIDNEXT {fake.next_uid}] Predicted next UID")
+                    if command == "EXAMINE":
+                        self.push(f"{tag} OK [READ-ONLY] EXAMINE completed")
+                        return True
+                elif command == "UID":
+                    sub, _, rest = args.partition(" ")
+                    if sub.upper() == "SEARCH":
+                        with fake._lock:
+                            uids = fake._search(rest)
+                        self.push("* SEARCH" + "".join(f" {uid}" for uid in uids))
+                    elif sub.upper() == "FETCH":
+                        uid = int(rest.split(" ", 1)[0])
+                        with fake._lock:
+                            found = [(i, m) for i, m in enumerate(fake.messages, 1) if m[0] == uid]
+                        for seq, (_, arrived, raw) in found:
+                            date = time.strftime("%d-%b-%Y %H:%M:%S +0000", time.gmtime(arrived))
+                            self.push_bytes(
+                                f'* {seq} FETCH (UID {uid} INTERNALDATE "{date}" BODY[] {{{len(raw)}}}\r\n'
+                                .encode("ascii") + raw + b")\r\n")
+                    else:
+                        self.push(f"{tag} BAD Unsupported UID command")
+                        return True
+                elif command == "IDLE":
+                    self.push("+ idling")
+                    with fake._lock:
+                        fake._idlers.add(self)
+                    try:
+                        done = self.rfile.readline()
+                    finally:
+                        with fake._lock:
+                            fake._idlers.discard(self)
+                    if not done:
+                        return False
+                    self.push(f"{tag} OK IDLE terminated")
+                    return True
+                elif command == "LOGOUT":
+                    self.push("* BYE Logging out")
+                    self.push(f"{tag} OK LOGOUT completed")
+                    return False
+                else:
+                    self.push(f"{tag} BAD Unknown command")
+                    return True
+                self.push(f"{tag} OK {command} completed")
+                return True
+
+        return Handler
@@ -0,0 +1,229 @@
+import html
+import json
+import time
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+SESSION_COOKIE = "nauk_at"
+# Ties an OTP verification to the login that requested it
+PENDING_COOKIE = "nauk_otp"
+
+PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{title}</title>
+<style>body {{ font-family: sans-serif; }} .otp input {{ width: 2em; }} .edit {{ cursor: pointer; padding: 0 6px; }}</style>
+</head><body>{body}</body></html>"""
+
+LOGIN_BODY = """
+<div id="app">
+  <h2>Login</h2>
+  <form id="loginForm">
+    <input id="usernameField" type="text" placeholder="Enter your active Email ID / Username">
+    <input id="passwordField" type="password" placeholder="Enter your password">
+    <button type="submit">Login</button>
+  </form>
+</div>
+<script>
+var app = document.getElementById('app');
+function post(url, data) {
+  return fetch(url, {method: 'POST', headers: {'Content-Type': 'application/json'},
+                     body: JSON.stringify(data), credentials: 'same-origin'})
+    .then(function(r) { return r.json(); });
+}
+function showOtp() {
+  var boxes = '';
+  for (var i = 0; i < 6; i++) boxes += '<input type="text" maxlength="1" inputmode="numeric">';
+  app.innerHTML = '<p>Enter the OTP sent to your registered email</p>'
+    + '<div class="otp">' + boxes + '</div><p id="otpError"></p>'
+    + '<button id="verifyBtn">Verify</button>';
+  document.getElementById('verifyBtn').addEventListener('click', function() {
+    var otp = Array.prototype.map.call(document.querySelectorAll('.otp input'),
+                                       function(el) { return el.value; }).join('');
+    post('/api/verify', {otp: otp}).then(function(res) {
+      if (res.status === 'ok') { location.href = '/mnjuser/homepage'; }
+      else { document.getElementById('otpError').textContent = res.message; }
+    });
+  });
+}
+document.getElementById('loginForm').addEventListener('submit', function(e) {
+  e.preventDefault();
+  post('/api/login', {
+    email: document.getElementById('usernameField').value,
+    password: document.getElementById('passwordField').value
+  }).then(function(res) {
+    if (res.status === 'otp') { showOtp(); }
+    else { app.insertAdjacentHTML('beforeend', '<p class="err">' + res.message + '</p>'); }
+  });
+});
+</script>
+"""
+
+HOME_BODY = """
+<nav><a href="/mnjuser/homepage">My Naukri</a> | <a href="/mnjuser/profile">View profile</a></nav>
+<h2>Welcome back</h2>
+"""
+
+PROFILE_BODY = """
+<nav><a href="/mnjuser/homepage">My Naukri</a></nav>
+<div class="widget">
+  <div class="widgetHead"><span class="widgetTitle">Resume headline</span><span class="edit icon">Edit</span></div>
+  <div id="headlineView">{headline}</div>
+  <div id="editor" style="display:none">
+    <textarea id="resumeHeadlineTxt" rows="4" cols="80"></textarea>
+    <button id="saveBtn">Save</button>
+  </div>
+  <p id="toast"></p>
+</div>
+<script>
+var editor = document.getElementById('editor');
+var textarea = document.getElementById('resumeHeadlineTxt');
+document.querySelector('.widgetHead .edit').addEventListener('click', function() {
+  textarea.value = document.getElementById('headlineView').textContent;
+  editor.style.display = 'block';
+});
+document.getElementById('saveBtn').addEventListener('click', function() {
+  fetch('/api/headline', {method: 'POST', headers: {'Content-Type': 'application/json'},
+                          body: JSON.stringify({headline: textarea.value}), credentials: 'same-origin'})
+    .then(function(r) { return r.json(); })
+    .then(function(res) {
+      if (res.status !== 'ok') { document.getElementById('toast').textContent = res.message; return; }
+      document.getElementById('headlineView').textContent = textarea.value;
+      editor.style.display = 'none';
+      document.getElementById('toast').textContent = 'Resume Headline has been successfully updated.';
+    });
+});
+</script>
+"""
+
+
+class FakeNaukri:
+    """
+    Local stand-in for the Naukri pages the bot drives: the login form, the
+    six-box OTP prompt, the rate-limit message, the logged-in home page and
+    the profile page with the Resume headline editor.
+
+    Args:
+        on_otp: Called with (otp, email) for each OTP the fake 'sends' (e.g. to
+                FakeGmail.deliver_otp with the email as recipient). Logins
+                are tracked per browser, so concurrent sessions get their own OTP
+        latency_ms: Delay added to every response
+        jitter_ms: Random extra delay (0..jitter_ms) per response
+        failure_rate: Probability (0-1) that an API call (login, OTP verify,
+                      headline save) fails with a server error
+        scenario: 'ok' or 'rate_limit' (login always refuses to send an OTP)
+    """
+
+    def __init__(self, on_otp=None, host="127.0.0.1", port=0, latency_ms=0, jitter_ms=0,
+                 failure_rate=0.0, scenario="ok"):
+        self.on_otp = on_otp
+        self.latency = latency_ms / 1000.0
+        self.jitter = jitter_ms / 1000.0
+        self.failure_rate = failure_rate
+        self.scenario = scenario
+        self.headline = "Software Engineer"
+        self.pending = {}  # pending-cookie token -> OTP
+        self.headline_saves = 0
+        self._random = random.Random()
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, name="fake-naukri", daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def api(self, path, data, cookies=None):
+        """Return (status, body dict, extra headers) for one API call."""
+        cookies = cookies or {}
+        if self._random.random() < self.failure_rate:
+            return 500, {"status": "error", "message": "Something went wrong. Please try again."}, {}
+        with self._lock:
+            if path == "/api/login":
+                if self.scenario == "rate_limit":
+                    return 200, {"status": "rate_limited",
+                                 "message": "You have reached max limit to generate OTP. Try after 24 hours."}, {}
+                if not data.get("email") or not data.get("password"):
+                    return 200, {"status": "error", "message": "Invalid details"}, {}
+                otp = f"{self._random.randint(0, 999999):06d}"
+                token = f"{self._random.getrandbits(64):016x}"
+                self.pending[token] = otp
+                if self.on_otp:
+                    self.on_otp(otp, data["email"])
+                return 200, {"status": "otp"}, {"Set-Cookie": f"{PENDING_COOKIE}={token}; Path=/"}
+            if path == "/api/verify":
+                token = cookies.get(PENDING_COOKIE)
+                if token not in self.pending or data.get("otp") != self.pending[token]:
+                    return 200, {"status": "error", "message": "Invalid OTP. Please try again."}, {}
+                del self.pending[token]
+                return 200, {"status": "ok"}, {"Set-Cookie": f"{SESSION_COOKIE}=fake-session; Path=/"}
+            if path == "/api/headline":
+                self.headline = data.get("headline", "")
+                self.headline_saves += 1
+                return 200, {"status": "ok"}, {}
+        return 404, {"status": "error", "message": "Not found"}, {}
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _delay(self):
+                time.sleep(fake.latency + fake._random.random() * fake.jitter)
+
+            def _reply(self, status, content_type, body, headers=None):
+                data = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _cookies(self):
+                pairs = (c.strip().partition("=") for c in (self.headers.get("Cookie") or "").split(";"))
+                return {name: value for name, _, value in pairs if name}
+
+            def _logged_in(self):
+                return SESSION_COOKIE in self._cookies()
+
+            def do_GET(self):
+                self._delay()
+                path = urlsplit(self.path).path
+                if path in ("/", "/mnjuser/login", "/nlogin/login"):
+                    self._reply(200, "text/html", PAGE.format(title="Login | Naukri", body=LOGIN_BODY))
+                elif path in ("/mnjuser/homepage", "/mnjuser/profile") and not self._logged_in():
+                    self.send_response(302)
+                    self.send_header("Location", "/mnjuser/login")
+                    self.end_headers()
+                elif path == "/mnjuser/homepage":
+                    self._reply(200, "text/html", PAGE.format(title="Home | Naukri", body=HOME_BODY))
+                elif path == "/mnjuser/profile":
+                    body = PROFILE_BODY.replace("{headline}", html.escape(fake.headline))
+                    self._reply(200, "text/html", PAGE.format(title="Profile | Naukri", body=body))
+                else:
+                    self._reply(404, "text/plain", "Not found")
+
+            def do_POST(self):
+                self._delay()
+                length = int(self.headers.get("Content-Length") or 0)
+                try:
+                    data = json.loads(self.rfile.read(length) or b"{}")
+                except ValueError:
+                    data = {}
+                status, body, headers = fake.api(urlsplit(self.path).path, data, self._cookies())
+                self._reply(status, "application/json", json.dumps(body), headers)
+
+        return Handler
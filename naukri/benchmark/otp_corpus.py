@@ -0,0 +1,233 @@
+"""
+Sample OTP mails for the extraction benchmark.
+
+Besides synthetic layouts (plain, HTML-only, nested multipart, attachments,
+quoted-printable, decoy numbers and mails without an OTP), the corpus holds
+the real Naukri OTP mail, rebuilt from the bundled Gmail print-out
+"Gmail - Your OTP for logging in Naukri account.pdf".
+"""
+
+import os
+import re
+import html
+import zlib
+import base64
+import random
+from email.message import EmailMessage
+from email.policy import default as default_policy
+
+SAMPLE_PDF = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                          "Gmail - Your OTP for logging in Naukri account.pdf")
+NAUKRI_SENDER = "Naukri <info@naukri.com>"
+
+
+def pdf_text(path):
+    """
+    Text lines of a simple PDF (FlateDecode content streams, Type0 fonts with
+    ToUnicode maps) - enough for the Chrome "Save as PDF" print-out of a mail.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    objects = {int(m.group(1)): m.group(2) for m in re.finditer(rb"(\d+) 0 obj(.*?)endobj", data, re.S)}
+
+    def stream(body):
+        match = re.search(rb"stream\r?\n(.*?)\r?\nendstream", body, re.S)
+        if not match:
+            return None
+        try:
+            return zlib.decompressobj().decompress(match.group(1))
+        except zlib.error:
+            return None
+
+    def to_unicode(obj_id):
+        cmap, text = {}, (stream(objects[obj_id]) or b"").decode("latin-1")
+        for block in re.findall(r"beginbfchar(.*?)endbfchar", text, re.S):
+            for src, dst in re.findall(r"<([0-9A-Fa-f]+)>\s*<([0-9A-Fa-f]+)>", block):
+                cmap[int(src, 16)] = bytes.fromhex(dst).decode("utf-16-be")
+        for block in re.findall(r"beginbfrange(.*?)endbfrange", text, re.S):
+            for lo, hi, dst in re.findall(r"<([0-9A-Fa-f]+)>\s*<([0-9A-Fa-f]+)>\s*<([0-9A-Fa-f]+)>", block):
+                for code in range(int(lo, 16), int(hi, 16) + 1):
+                    cmap[code] = chr(int(dst, 16) + code - int(lo, 16))
+        return cmap
+
+    fonts = {}
+    for body in objects.values():
+        for name, ref in re.findall(rb"/(F\d+) (\d+) 0 R", body):
+            font = objects.get(int(ref), b"")
+            unicode_ref = re.search(rb"/ToUnicode (\d+) 0 R", font)
+            if b"/Type0" in font and unicode_ref:
+                fonts[name.decode()] = to_unicode(int(unicode_ref.group(1)))
+
+    lines = []
+    for body in objects.values():
+        content = stream(body) if b"stream" in body else None
+        if not content or b" Tf" not in content:
+            continue
+        font, line = {}, []
+        ops = r"/(\S+) [\d.]+ Tf|<([0-9A-Fa-f]+)>\s*Tj|\[(.*?)\]\s*TJ|(ET)"
+        for match in re.finditer(ops, content.decode("latin-1"), re.S):
+            if match.group(1):
+                font = fonts.get(match.group(1), {})
+            elif match.group(2) or match.group(3):
+                strings = [match.group(2)] if match.group(2) else re.findall(r"<([0-9A-Fa-f]+)>", match.group(3))
+                for s in strings:
+                    line.append("".join(font.get(int(s[i:i + 4], 16), "") for i in range(0, len(s), 4)))
+            elif line:
+                lines.append("".join(line).strip())
+                line = []
+    return [line for line in lines if line]
+
+
+def naukri_sample_lines():
+    """The body of the Naukri OTP mail in the bundled PDF, from "Dear" to "Naukri Team"."""
+    lines = pdf_text(SAMPLE_PDF)
+    start = next(i for i, line in enumerate(lines) if line.startswith("Dear "))
+    end = next(i for i, line in enumerate(lines) if line == "Naukri Team")
+    otp = next(line for line in lines[start:end] if re.fullmatch(r"\d{6}", line))
+    return lines[start:end + 1], otp
+
+
+def _naukri_html(lines, sample_otp, otp):
+    """Naukri's table layout: greeting, instructions, the code in its own big cell, footer."""
+    cells = []
+    for line in lines:
+        if line == sample_otp:
+            cells.append(f'<tr><td style="font-size:28px;font-weight:bold;letter-spacing:4px">{otp}</td></tr>')
+        else:
+            cells.append(f"<tr><td>{html.escape(line)}</td></tr>")
+    return (
+        "<html><head><style>td{font-family:Arial;color:#404040} .btn{background:#4a90e2}</style></head>"
+        f"<body><table width=\"600\">{''.join(cells)}</table>"
+        "<table><tr><td>Get app</td><td>Applies are a click away on the Naukri app</td></tr></table>"
+        "<p>You have received this mail because your e-mail ID is registered with Naukri.com.</p>"
+        "</body></html>"
+    )
+
+
+def _plain_from(lines, sample_otp, otp):
+    return "\n".join(otp if line == sample_otp else line for line in lines)
+
+
+def _message(subject, sender=NAUKRI_SENDER):
+    msg = EmailMessage(policy=default_policy)
+    msg["From"] = sender
+    msg["To"] = "jobseeker@example.com"
+    msg["Subject"] = subject
+    return msg
+
+
+def _templates():
+    lines, sample_otp = naukri_sample_lines()
+
+    def naukri_html_only(otp):
+        msg = _message("Your OTP for logging in Naukri account")
+        msg.set_content(_naukri_html(lines, sample_otp, otp), subtype="html")
+        return msg
+
+    def naukri_alternative(otp):
+        msg = _message("Your OTP for logging in Naukri account")
+        msg.set_content(_plain_from(lines, sample_otp, otp))
+        msg.add_alternative(_naukri_html(lines, sample_otp, otp), subtype="html")
+        return msg
+
+    def naukri_nested_with_attachment(otp):
+        # mixed > alternative (plain + html), plus a PDF whose bytes hold a decoy code
+        msg = _message("Your OTP for logging in Naukri account")
+        msg.set_content(_plain_from(lines, sample_otp, otp))
+        msg.add_alternative(_naukri_html(lines, sample_otp, otp), subtype="html")
+        msg.add_attachment(b"%PDF-1.4 invoice 482913", maintype="application", subtype="pdf",
+                           filename="invoice.pdf")
+        return msg
+
+    def plain_otp_is(otp):
+        msg = _message("Login verification")
+        msg.set_content(f"Hello,\n\nYour OTP is {otp}. Do not share it with anyone.\n\nTeam")
+        return msg
+
+    def plain_is_your(otp):
+        msg = _message("Login verification")
+        msg.set_content(f"{otp} is your OTP for login. Reference 20260208.")
+        return msg
+
+    def html_verification_code(otp):
+        msg = _message("Verify your email")
+        msg.set_content(f"<p>Order #482913 was placed on 08/02/2026.</p>"
+                        f"<p>Your verification code is <strong>{otp}</strong></p>", subtype="html")
+        return msg
+
+    def html_decoys_in_style(otp):
+        # A colour like #123456 sits in the stylesheet, before the real code
+        msg = _message("Your OTP for logging in Naukri account")
+        msg.set_content(
+            "<html><head><style>.otp{color:#123456;border:1px solid #654321}</style></head>"
+            f"<body><p>Call 1800 102 5557 for help.</p><p class=\"otp\">OTP: {otp}</p></body></html>",
+            subtype="html",
+        )
+        return msg
+
+    def quoted_printable_html(otp):
+        msg = _message("Your OTP for logging in Naukri account")
+        # Long lines get soft line breaks, and "=" becomes "=3D" on the wire
+        body = (f"<div style=\"padding:20px\">{'&nbsp;' * 30}Please use the one-time password "
+                f"below.</div><div style=\"font-size:24px\">OTP is {otp}</div>")
+        msg.set_content(body, subtype="html", cte="quoted-printable")
+        return msg
+
+    def newsletter_without_otp(otp):
+        msg = _message("Jobs matching your profile", sender="Naukri <jobs@naukri.com>")
+        msg.set_content("<p>12 new jobs for you. Salary 650000 - 900000 per annum.</p>"
+                        "<p>Job ID 260208 at Pune.</p>", subtype="html")
+        return msg
+
+    return [
+        ("naukri_html_only", naukri_html_only, True),
+        ("naukri_alternative", naukri_alternative, True),
+        ("naukri_nested_with_attachment", naukri_nested_with_attachment, True),
+        ("plain_otp_is", plain_otp_is, True),
+        ("plain_is_your", plain_is_your, True),
+        ("html_verification_code", html_verification_code, True),
+        ("html_decoys_in_style", html_decoys_in_style, True),
+        ("quoted_printable_html", quoted_printable_html, True),
+        ("newsletter_without_otp", newsletter_without_otp, False),
+    ]
+
+
+def build_corpus(copies=20, seed=0):
+    """
+    Returns:
+        list of (template_name, EmailMessage, expected_otp or None)
+    """
+    rng = random.Random(seed)
+    corpus = []
+    for name, make, has_otp in _templates():
+        for _ in range(copies):
+            otp = f"{rng.randrange(100000, 1000000)}"
+            corpus.append((name, make(otp), otp if has_otp else None))
+    return corpus
+
+
+def to_gmail_message(msg, message_id="sample"):
+    """Convert an EmailMessage into the Gmail API messages.get (format=full) shape."""
+    def part_of(node):
+        part = {
+            "mimeType": node.get_content_type(),
+            "headers": [{"name": k, "value": str(v)} for k, v in node.items()],
+            "body": {},
+        }
+        if node.is_multipart():
+            part["parts"] = [part_of(child) for child in node.iter_parts()]
+        elif node.get_filename():
+            # Gmail returns attachments by ID, not inline
+            part["filename"] = node.get_filename()
+            part["body"] = {"attachmentId": f"{message_id}-{node.get_filename()}"}
+        else:
+            part["body"] = {"data": base64.urlsafe_b64encode(node.get_payload(decode=True)).decode("ascii")}
+        return part
+
+    text_part = msg.get_body(preferencelist=("plain", "html"))
+    text = text_part.get_content() if text_part else ""
+    if text_part is not None and text_part.get_content_subtype() == "html":
+        text = re.sub(r"<(style|head)\b.*?</\1>", " ", text, flags=re.S)
+        text = html.unescape(re.sub(r"<[^>]*>", " ", text))
+    snippet = html.escape(" ".join(text.split())[:200])
+    return {"id": message_id, "internalDate": "0", "snippet": snippet, "payload": part_of(msg)}
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Offline Benchmark
+=================
+Runs update.py end to end against a local fake Naukri site and a fake Gmail
+API (no real OTPs are spent) and reports end-to-end and per-step latency
+percentiles from the run_status.json timelines.
+
+Usage:
+    python3 benchmark/run_benchmark.py --runs 5 --update-baseline   # store a baseline
+    python3 benchmark/run_benchmark.py --runs 5                     # compare against it
+    python3 benchmark/run_benchmark.py --failure-rate 0.2 --latency-ms 400
+
+Exits non-zero if a run ends with an unexpected status, or if the p50/p90 of
+the end-to-end time or of any step regresses past benchmark/baseline.json.
+With --ci (the default when CI=true) a missing baseline, or one recorded for
+another scenario, is a failure too instead of a skipped comparison.
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+
+from fake_gmail import FakeGmail
+from fake_naukri import FakeNaukri
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+UPDATE_SCRIPT = os.path.join(os.path.dirname(BENCH_DIR), "update.py")
+BASELINE_FILE = os.path.join(BENCH_DIR, "baseline.json")
+PERCENTILES = (50, 90, 95)
+EXPECTED_STATUS = {"ok": "SUCCESS", "rate_limit": "RATE_LIMITED"}
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    rank = max(1, int(round(pct / 100.0 * len(ordered))))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def summarize(values):
+    summary = {f"p{pct}": round(percentile(values, pct), 3) for pct in PERCENTILES}
+    summary["max"] = round(max(values), 3)
+    summary["runs"] = len(values)
+    return summary
+
+
+def run_once(index, workdir, naukri, gmail, timeout):
+    """Run update.py once in its own directory and return (status, seconds, timeline)."""
+    run_dir = os.path.join(workdir, f"run_{index:03d}")
+    os.makedirs(run_dir)
+    env = dict(os.environ)
+    env.update({
+        "NAUKRI_BASE_URL": naukri.base_url,
+        "NAUKRI_EMAIL": "bench@example.com",
+        "NAUKRI_PASSWORD": "bench-password",
+        "GMAIL_API_BASE_URL": gmail.base_url,
+        "GMAIL_TOKEN_URI": f"{gmail.base_url}/token",
+        "GMAIL_CLIENT_ID": "bench",
+        "GMAIL_CLIENT_SECRET": "bench",
+        "GMAIL_REFRESH_TOKEN": "bench",
+        "HEADLESS": "true",
+        # Shared across runs, like the workflow's cached files
+        "GMAIL_TOKEN_CACHE": os.path.join(workdir, "gmail_token_cache"),
+        "LOCATOR_CACHE_FILE": os.path.join(workdir, "locators.json"),
+    })
+    env.pop("NAUKRI_SESSION_KEY", None)
+
+    start = time.time()
+    with open(os.path.join(run_dir, "output.log"), "w") as log:
+        try:
+            subprocess.run([sys.executable, UPDATE_SCRIPT], cwd=run_dir, env=env,
+                           stdout=log, stderr=subprocess.STDOUT, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            return "TIMEOUT", time.time() - start, []
+    elapsed = time.time() - start
+
+    status_files = glob.glob(os.path.join(run_dir, "Logs Screenshot", "*", "run_status.json"))
+    if not status_files:
+        return "NO_STATUS", elapsed, []
+    with open(status_files[0]) as f:
+        status = json.load(f)
+    return status["status"], elapsed, status.get("details", {}).get("timeline", [])
+
+
+def compare(results, baseline, tolerance, slack):
+    """Return the list of regressions of results against baseline."""
+    regressions = []
+    metrics = [("end_to_end", results["end_to_end"], baseline.get("end_to_end"))]
+    metrics += [(f"step {name}", summary, baseline.get("steps", {}).get(name))
+                for name, summary in results["steps"].items()]
+    for label, current, reference in metrics:
+        if not reference:
+            continue
+        for key in ("p50", "p90"):
+            limit = reference[key] * (1 + tolerance) + slack
+            if current[key] > limit:
+                regressions.append(f"{label} {key} {current[key]:.3f}s > {limit:.3f}s "
+                                   f"(baseline {reference[key]:.3f}s)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark update.py against local fakes.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--scenario", choices=sorted(EXPECTED_STATUS), default="ok")
+    parser.add_argument("--latency-ms", type=int, default=50, help="Fake Naukri response latency")
+    parser.add_argument("--jitter-ms", type=int, default=0)
+    parser.add_argument("--failure-rate", type=float, default=0.0,
+                        help="Probability that a fake Naukri API call fails")
+    parser.add_argument("--otp-delay", type=float, default=2.0,
+                        help="Seconds between the login click and the OTP mail arriving")
+    parser.add_argument("--gmail-latency-ms", type=int, default=30)
+    parser.add_argument("--timeout", type=int, default=180, help="Per-run timeout in seconds")
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed relative slowdown against the baseline")
+    parser.add_argument("--slack", type=float, default=0.1,
+                        help="Allowed absolute slowdown in seconds (keeps tiny steps from flapping)")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="Store this run's percentiles as the new baseline")
+    parser.add_argument("--ci", action="store_true", default=os.environ.get("CI", "").lower() == "true",
+                        help="Fail when there is no baseline to compare against (default when CI=true)")
+    args = parser.parse_args()
+
+    # A regression gate with nothing to gate on must not pass silently in CI
+    if args.ci and not args.update_baseline and not os.path.exists(args.baseline):
+        print(f"[Bench] ❌ No baseline at {args.baseline} - store one with --update-baseline")
+        sys.exit(1)
+
+    gmail = FakeGmail(latency_ms=args.gmail_latency_ms).start()
+    naukri = FakeNaukri(
+        on_otp=lambda otp, email: gmail.deliver_otp(otp, args.otp_delay, recipient=email),
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        failure_rate=args.failure_rate,
+        scenario=args.scenario,
+    ).start()
+    print(f"[Bench] Fake Naukri at {naukri.base_url}, fake Gmail at {gmail.base_url}")
+
+    workdir = tempfile.mkdtemp(prefix="naukri-bench-")
+    expected = EXPECTED_STATUS[args.scenario]
+    durations, steps, statuses = [], {}, []
+    try:
+        for index in range(args.runs):
+            status, elapsed, timeline = run_once(index, workdir, naukri, gmail, args.timeout)
+            statuses.append(status)
+            print(f"[Bench] Run {index + 1}/{args.runs}: {status} in {elapsed:.2f}s")
+            if status != expected:
+                continue
+            durations.append(elapsed)
+            for span in timeline:
+                if span.get("duration_seconds") is not None:
+                    steps.setdefault(span["name"], []).append(span["duration_seconds"])
+    finally:
+        naukri.stop()
+        gmail.stop()
+
+    failed = sum(1 for s in statuses if s != expected)
+    report = {
+        "scenario": args.scenario,
+        "settings": {k: v for k, v in vars(args).items() if k not in ("baseline", "update_baseline", "ci")},
+        "statuses": statuses,
+        "end_to_end": summarize(durations) if durations else None,
+        "steps": {name: summarize(values) for name, values in sorted(steps.items())},
+        "workdir": workdir,
+    }
+    with open(os.path.join(workdir, "benchmark_report.json"), "w") as f:
+        json.dump(report, f, indent=2)
+
+    print("\n[Bench] Latency (seconds)")
+    print(f"{'step':<24}{'p50':>8}{'p90':>8}{'p95':>8}{'max':>8}")
+    rows = ([("end_to_end", report["end_to_end"])] if durations else []) + list(report["steps"].items())
+    for name, s in rows:
+        print(f"{name:<24}{s['p50']:>8.3f}{s['p90']:>8.3f}{s['p95']:>8.3f}{s['max']:>8.3f}")
+    print(f"[Bench] Logs and report in {workdir}")
+
+    if failed:
+        print(f"[Bench] {'⚠️ ' if args.failure_rate else '❌'} {failed}/{args.runs} run(s) did not end with {expected}")
+        # With failure injection on, failed runs are the point - only an all-fail run is an error
+        if not args.failure_rate or not durations:
+            sys.exit(1)
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump({"scenario": args.scenario, "settings": report["settings"],
+                       "end_to_end": report["end_to_end"], "steps": report["steps"]}, f, indent=2)
+        print(f"[Bench] Baseline written to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print("[Bench] No baseline yet - run with --update-baseline to store one")
+        if args.ci:
+            sys.exit(1)
+        return
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline.get("scenario") != args.scenario:
+        print(f"[Bench] Baseline is for scenario '{baseline.get('scenario')}' - not comparing")
+        if args.ci:
+            sys.exit(1)
+        return
+    regressions = compare(report, baseline, args.tolerance, args.slack)
+    if regressions:
+        print("[Bench] ❌ Regressions against baseline:")
+        for line in regressions:
+            print(f"  - {line}")
+        sys.exit(1)
+    print("[Bench] ✅ Within baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,322 @@
+import os
+import json
+import time
+import shutil
+import asyncio
+import tempfile
+import websockets
+from websockets.exceptions import ConnectionClosed
+from driver_resolver import CHROME_BINARIES
+
+
+class CDPError(Exception):
+    """A DevTools command failed, timed out, or the connection is gone."""
+
+
+class CDPConnection:
+    """
+    One DevTools websocket to the browser. Pages are attached in flat mode,
+    so every page shares this socket and is addressed by its sessionId;
+    responses are matched to commands by id, events go to the page's listener.
+    """
+
+    def __init__(self, ws):
+        self.ws = ws
+        self.next_id = 0
+        self.pending = {}
+        self.listeners = {}
+        self.commands = 0
+        self._reader = asyncio.ensure_future(self._read_loop())
+
+    @classmethod
+    async def connect(cls, url, timeout=10):
+        # Screenshots and page scripts make for multi-MB messages, and Chrome
+        # answers pings itself - no size cap, no keepalive pings
+        ws = await websockets.connect(url, max_size=None, ping_interval=None, compression=None,
+                                      open_timeout=timeout)
+        return cls(ws)
+
+    async def send(self, method, params=None, session_id=None, timeout=30):
+        self.next_id += 1
+        message = {"id": self.next_id, "method": method, "params": params or {}}
+        if session_id:
+            message["sessionId"] = session_id
+        future = asyncio.get_running_loop().create_future()
+        self.pending[self.next_id] = future
+        self.commands += 1
+        try:
+            await self.ws.send(json.dumps(message))
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            raise CDPError(f"{method} timed out after {timeout}s")
+        except ConnectionClosed:
+            raise CDPError("DevTools connection closed")
+        finally:
+            self.pending.pop(message["id"], None)
+
+    async def _read_loop(self):
+        try:
+            async for raw in self.ws:
+                message = json.loads(raw)
+                if "id" in message:
+                    future = self.pending.get(message["id"])
+                    if future is None or future.done():
+                        continue
+                    if "error" in message:
+                        future.set_exception(CDPError(message["error"].get("message", "CDP error")))
+                    else:
+                        future.set_result(message.get("result", {}))
+                else:
+                    listener = self.listeners.get(message.get("sessionId"))
+                    if listener:
+                        listener(message["method"], message.get("params", {}))
+        except ConnectionClosed:
+            pass
+        finally:
+            for future in self.pending.values():
+                if not future.done():
+                    future.set_exception(CDPError("DevTools connection closed"))
+
+    async def close(self):
+        await self.ws.close()
+        self._reader.cancel()
+
+
+class CDPPage:
+    """
+    A tab in its own browser context (separate cookies and storage), driven
+    over the shared connection. call() runs the same in-page scripts the
+    Selenium path passes to execute_script (arguments[0], ... and return).
+    """
+
+    def __init__(self, connection, session_id, target_id, context_id):
+        self.connection = connection
+        self.session_id = session_id
+        self.target_id = target_id
+        self.context_id = context_id
+        self._waiters = []
+        connection.listeners[session_id] = self._on_event
+
+    def _on_event(self, method, params):
+        for waiter in list(self._waiters):
+            name, future = waiter
+            if name == method and not future.done():
+                future.set_result(params)
+                self._waiters.remove(waiter)
+
+    def send(self, method, params=None, timeout=30):
+        return self.connection.send(method, params, session_id=self.session_id, timeout=timeout)
+
+    def expect_event(self, method):
+        """A future for the next event called method - create it before triggering the event."""
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append((method, future))
+        return future
+
+    async def navigate(self, url, timeout=30):
+        loaded = self.expect_event("Page.loadEventFired")
+        result = await self.send("Page.navigate", {"url": url}, timeout=timeout)
+        if result.get("errorText"):
+            raise CDPError(f"Navigation to {url} failed: {result['errorText']}")
+        try:
+            await asyncio.wait_for(loaded, timeout)
+        except asyncio.TimeoutError:
+            print(f"[CDP] Load event for {url} not seen within {timeout}s - continuing")
+
+    async def evaluate(self, expression, await_promise=False, timeout=30):
+        result = await self.send("Runtime.evaluate", {
+            "expression": expression,
+            "returnByValue": True,
+            "awaitPromise": await_promise,
+        }, timeout=timeout)
+        if "exceptionDetails" in result:
+            details = result["exceptionDetails"]
+            raise CDPError(details.get("exception", {}).get("description") or details.get("text", "Script error"))
+        return result["result"].get("value")
+
+    async def call(self, script, *args):
+        """Run an execute_script-style function body with JSON arguments."""
+        return await self.evaluate(script_call(script, *args))
+
+    async def url(self):
+        return await self.evaluate("location.href")
+
+    async def wait_for(self, condition, timeout=20, description="condition"):
+        """
+        Wait until the JS expression condition is truthy, checked in the page
+        on every DOM mutation (and every 100ms) instead of polled from here.
+        A navigation that destroys the page's context just restarts the wait.
+
+        Returns:
+            bool: True if the condition held before the timeout
+        """
+        deadline = time.time() + timeout
+        while True:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                print(f"[CDP] Timed out after {timeout}s waiting for {description}")
+                return False
+            try:
+                if await self.evaluate(wait_expression(condition, remaining), await_promise=True,
+                                       timeout=remaining + 5):
+                    return True
+            except CDPError as e:
+                if "context" not in str(e).lower() and "navigat" not in str(e).lower():
+                    raise
+                await asyncio.sleep(0.05)
+
+    async def click(self, element_expression):
+        """
+        Click an element with real mouse events at its centre (like a
+        WebDriver click). element_expression is JS that yields the element.
+
+        Returns:
+            bool: False if the element was not found
+        """
+        box = await self.evaluate(
+            f"(function() {{ var el = {element_expression}; if (!el) return null;"
+            " el.scrollIntoView({block: 'center'}); var r = el.getBoundingClientRect();"
+            " return {x: r.left + r.width / 2, y: r.top + r.height / 2}; })()")
+        if not box:
+            return False
+        for event in ("mousePressed", "mouseReleased"):
+            await self.send("Input.dispatchMouseEvent", {
+                "type": event, "x": box["x"], "y": box["y"], "button": "left", "clickCount": 1,
+            })
+        return True
+
+    async def close(self):
+        self.connection.listeners.pop(self.session_id, None)
+        try:
+            await self.connection.send("Target.disposeBrowserContext", {"browserContextId": self.context_id})
+        except CDPError:
+            pass
+
+
+def script_call(script, *args):
+    """JS expression running an execute_script-style body with JSON-encoded arguments."""
+    return f"(function() {{ {script} }}).apply(null, {json.dumps(list(args))})"
+
+
+def wait_expression(condition, timeout):
+    """JS promise resolving true once condition holds, false after timeout seconds."""
+    return (
+        "new Promise(function(resolve) {"
+        f" function check() {{ try {{ return !!({condition}); }} catch (e) {{ return false; }} }}"
+        " if (check()) { resolve(true); return; }"
+        " var done = false;"
+        " function finish(value) { if (done) return; done = true; observer.disconnect();"
+        " clearInterval(timer); clearTimeout(limit); resolve(value); }"
+        " var observer = new MutationObserver(function() { if (check()) finish(true); });"
+        " observer.observe(document.documentElement, {childList: true, subtree: true, attributes: true,"
+        " characterData: true});"
+        " var timer = setInterval(function() { if (check()) finish(true); }, 100);"
+        f" var limit = setTimeout(function() {{ finish(false); }}, {int(timeout * 1000)});"
+        "})"
+    )
+
+
+class Chrome:
+    """
+    A Chrome process driven directly over the DevTools protocol (no
+    ChromeDriver), with one browser context per session.
+
+    Configuration (environment variables):
+        CHROME_BINARY   Chrome executable (default: first of CHROME_BINARIES found)
+        HEADLESS        true for headless Chrome (as for the Selenium path)
+    """
+
+    def __init__(self, process, connection, user_data_dir):
+        self.process = process
+        self.connection = connection
+        self.user_data_dir = user_data_dir
+
+    @property
+    def pid(self):
+        return self.process.pid
+
+    @staticmethod
+    def find_binary():
+        candidates = [os.environ["CHROME_BINARY"]] if os.environ.get("CHROME_BINARY") else CHROME_BINARIES
+        for binary in candidates:
+            if os.path.isabs(binary) and os.path.exists(binary):
+                return binary
+            if shutil.which(binary):
+                return shutil.which(binary)
+        raise CDPError("Chrome not found - set CHROME_BINARY")
+
+    @classmethod
+    async def launch(cls, headless=None, user_agent=None, extra_args=None, timeout=30):
+        if headless is None:
+            headless = os.environ.get("HEADLESS", "false").lower() == "true"
+        user_data_dir = tempfile.mkdtemp(prefix="naukri-cdp-")
+        args = [
+            cls.find_binary(),
+            "--remote-debugging-port=0",
+            f"--user-data-dir={user_data_dir}",
+            "--no-first-run",
+            "--no-default-browser-check",
+            "--disable-blink-features=AutomationControlled",
+            "--disable-gpu",
+            "--window-size=1920,1080",
+            "--no-sandbox",
+            "--disable-dev-shm-usage",
+        ]
+        if headless:
+            args.append("--headless=new")
+        if user_agent:
+            args.append(f"--user-agent={user_agent}")
+        args += list(extra_args or []) + ["about:blank"]
+        process = await asyncio.create_subprocess_exec(
+            *args, stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL)
+
+        # Chrome writes the port it picked and the browser endpoint path here
+        port_file = os.path.join(user_data_dir, "DevToolsActivePort")
+        deadline = time.time() + timeout
+        while True:
+            try:
+                with open(port_file) as f:
+                    port, path = f.read().split()[:2]
+                break
+            except (FileNotFoundError, ValueError):
+                if process.returncode is not None or time.time() > deadline:
+                    if process.returncode is None:
+                        process.kill()
+                    shutil.rmtree(user_data_dir, ignore_errors=True)
+                    raise CDPError("Chrome did not open its DevTools port")
+                await asyncio.sleep(0.05)
+        connection = await CDPConnection.connect(f"ws://127.0.0.1:{port}{path}")
+        print(f"[CDP] Chrome started (pid {process.pid}, DevTools port {port})")
+        return cls(process, connection, user_data_dir)
+
+    async def new_page(self, user_agent=None, blocked_urls=None):
+        """Open a tab in a fresh browser context and prepare it like create_driver() does."""
+        context_id = (await self.connection.send("Target.createBrowserContext", {"disposeOnDetach": True}))[
+            "browserContextId"]
+        target_id = (await self.connection.send("Target.createTarget", {
+            "url": "about:blank", "browserContextId": context_id}))["targetId"]
+        session_id = (await self.connection.send("Target.attachToTarget", {
+            "targetId": target_id, "flatten": True}))["sessionId"]
+        page = CDPPage(self.connection, session_id, target_id, context_id)
+        await asyncio.gather(page.send("Page.enable"), page.send("Network.enable"))
+        if user_agent:
+            await page.send("Network.setUserAgentOverride", {"userAgent": user_agent})
+        if blocked_urls:
+            await page.send("Network.setBlockedURLs", {"urls": blocked_urls})
+        await page.send("Page.addScriptToEvaluateOnNewDocument", {
+            "source": "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"})
+        return page
+
+    async def close(self):
+        try:
+            await asyncio.wait_for(self.connection.send("Browser.close"), 5)
+        except (CDPError, asyncio.TimeoutError):
+            pass
+        await self.connection.close()
+        try:
+            await asyncio.wait_for(self.process.wait(), 10)
+        except asyncio.TimeoutError:
+            self.process.kill()
+            await self.process.wait()
+        shutil.rmtree(self.user_data_dir, ignore_errors=True)
+        print("[CDP] Chrome closed")
@@ -0,0 +1,598 @@
+#!/usr/bin/env python3
+"""
+CDP Engine
+==========
+The login -> OTP -> profile -> headline -> save flow of update.py, driven
+over the Chrome DevTools protocol from one asyncio event loop instead of
+blocking Selenium/ChromeDriver calls.
+
+One Chrome process serves every account: each session gets its own browser
+context (separate cookies and storage) and all of them share one DevTools
+websocket. While a session waits for its OTP mail or for the page, the
+loop drives the others, so the number of concurrent sessions is bounded
+by --contexts, not by a thread (and a ChromeDriver) per browser.
+
+The in-page scripts (page classification, OTP control discovery, form
+filling) are the same ones the Selenium path injects, and the run goes
+through the same checkpointed steps (checkpoints.py), with the same retry
+policies and journal, so a run resumes the same way on either engine.
+
+Usage:
+    python3 cdp_engine.py accounts.json --contexts 8
+    python3 fleet.py accounts.json --engine cdp --contexts 8
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import traceback
+from datetime import datetime
+from dotenv import load_dotenv
+from cdp_client import CDPError, Chrome, script_call
+from checkpoints import EDIT_HEADLINE, LOGIN, OPEN_PROFILE, SAVE_HEADLINE, RunCheckpoints
+from fleet import account_log_dir, load_accounts
+from form_fill import FILL_JS
+from gmail_otp_reader import get_otp_from_gmail
+from locator_cache import get_locator_cache
+from otp_discovery import DISCOVER_JS, GENERIC_OTP_SELECTOR, OTP_INPUT_SELECTORS, VERIFY_CANDIDATES
+from otp_inbox import SharedInbox
+from otp_sources import start_otp_source, use_shared_inbox
+from page_state import CLASSIFY_JS, LOGIN_FORM, OTP_INVALID, RATE_LIMITED, RULES, classify_raw
+from resource_blocker import ResourceBlocker
+from run_coordinator import ATTEMPT, RunCoordinator
+from screenshots import ScreenshotPipeline
+from session_store import LOCAL_STORAGE_JS, SessionStore
+from timing import Timeline, metrics_enabled
+from update import (
+    HEADLINE_EDIT_XPATH,
+    HEADLINE_TEXT,
+    INVALID_OTP_KEYWORDS,
+    LOGIN_URL,
+    NAUKRI_BASE_URL,
+    OTP_TEXT_KEYWORDS,
+    PROFILE_URL,
+    RATE_LIMIT_KEYWORDS,
+    SAVE_BUTTON_XPATH,
+    SAVE_CONFIRMED_JS,
+    USER_AGENT,
+    OTPBudgetExhausted,
+    RateLimitedError,
+    make_log_dir,
+    write_budget_status,
+    write_status_summary,
+)
+
+# FILL_JS over [selector, value] pairs - elements cannot cross the DevTools
+# boundary as JSON, so they are looked up in the page
+FILL_SELECTORS_JS = (
+    "var pairs = arguments[0].map(function(p) { return [document.querySelector(p[0]), p[1]]; });"
+    f" return (function() {{ {FILL_JS} }}).apply(null, [pairs]);"
+)
+
+# DISCOVER_JS, reduced to what can be returned by value
+OTP_CONTROLS_JS = (
+    f"var c = (function() {{ {DISCOVER_JS} }}).apply(null, arguments);"
+    " return {inputs: c.inputs.length, input_selector: c.input_selector,"
+    " submit: !!c.submit, submit_selector: c.submit_selector};"
+)
+
+# Discover the OTP inputs and fill the code (one digit per box, or all of it
+# into a single input) in the same pass
+OTP_FILL_JS = (
+    f"var c = (function() {{ {DISCOVER_JS} }}).apply(null, [arguments[0], arguments[1], arguments[2]]);"
+    " var otp = arguments[3];"
+    " if (!c.inputs.length) return {inputs: 0, input_selector: null, value: ''};"
+    " var pairs = c.inputs.length >= 6 && otp.length === 6"
+    " ? c.inputs.slice(0, 6).map(function(el, i) { return [el, otp[i]]; }) : [[c.inputs[0], otp]];"
+    f" var values = (function() {{ {FILL_JS} }}).apply(null, [pairs]);"
+    " return {inputs: c.inputs.length, input_selector: c.input_selector, value: values.join('')};"
+)
+
+
+def xpath_element(xpath):
+    """JS expression for the first element matching xpath (or null)."""
+    return (f"document.evaluate({json.dumps(xpath)}, document, null,"
+            " XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue")
+
+
+def clickable(element_expression):
+    """JS condition: the element exists, is visible and enabled."""
+    return (f"(function() {{ var el = {element_expression};"
+            " return !!el && !el.disabled && !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length);"
+            " })()")
+
+
+def page_text_has(keywords):
+    return (f"{json.dumps(keywords)}.some(function(k) {{ "
+            "return (document.body.innerText || '').toLowerCase().indexOf(k) !== -1; })")
+
+
+async def classify(page):
+    return classify_raw(await page.call(CLASSIFY_JS, RULES))
+
+
+async def page_loaded(page, timeout=20):
+    return await page.wait_for("document.readyState === 'complete'", timeout=timeout, description="page load")
+
+
+async def cdp_login(page, email, password, shots, timeline, coordinator=None, checkpoints=None):
+    """
+    update.login() on a CDPPage. The OTP source is opened for the account
+    (a ticket on the shared inbox when one is in use) and awaited without
+    blocking the loop. Raises RateLimitedError if Naukri refuses to send an
+    OTP, or another exception if the login could not be verified.
+    """
+    locators = get_locator_cache()
+    input_selectors = locators.order("otp_input", OTP_INPUT_SELECTORS)
+    verify_candidates = locators.order("verify_button", VERIFY_CANDIDATES, key=lambda c: c['name'])
+
+    # Step 1: Login
+    step = timeline.begin("login_page")
+    await page.navigate(LOGIN_URL)
+    await shots.capture_async("step_1_login_page")
+    if not await page.wait_for(clickable("document.getElementById('usernameField')") + " && " +
+                               clickable("document.getElementById('passwordField')"),
+                               timeout=20, description="login form"):
+        raise Exception("Login form did not appear")
+    step.end()
+
+    step = timeline.begin("credentials_fill")
+    values = await page.call(FILL_SELECTORS_JS, [["#usernameField", email], ["#passwordField", password]])
+    if values != [email, password]:
+        raise Exception("Credentials did not stick in the login form")
+    print(f"[CDP] {email}: email and password entered")
+    await shots.capture_async("step_1_credentials_filled")
+    step.end()
+
+    step = timeline.begin("login_submit")
+    submit = "document.querySelector(\"button[type='submit']\")"
+    if not await page.wait_for(clickable(submit), timeout=20, description="login button"):
+        raise Exception("Login button did not appear")
+    # Baseline the inbox before the OTP is triggered so only newer mail counts
+    otp_watch = await asyncio.to_thread(start_otp_source, email)
+    try:
+        login_url = await page.url()
+        await page.click(submit)
+        await page.wait_for(
+            f"location.href !== {json.dumps(login_url)} || "
+            "document.querySelector(\"input[maxlength='1']\") !== null || "
+            + page_text_has(OTP_TEXT_KEYWORDS + RATE_LIMIT_KEYWORDS),
+            timeout=20, description="login response")
+        await page_loaded(page)
+        await shots.capture_async("step_1_after_login_click")
+        step.end()
+    except BaseException:
+        # The OTP step below never ran, so release the mailbox (or shared inbox slot) here
+        if otp_watch is not None:
+            await asyncio.to_thread(otp_watch.close)
+        raise
+
+    step = timeline.begin("otp_detect")
+    try:
+        state = await classify(page)
+        print(f"[CDP] {email}: page state after login {state['state']} {state['evidence']}")
+        if state['state'] == RATE_LIMITED:
+            print(f"[OTP] 🚫 {email}: RATE LIMITED - Naukri refused to send an OTP")
+            await shots.capture_async("step_1_otp_rate_limited", failure=True)
+            raise RateLimitedError("Naukri rate limited OTP requests")
+
+        has_otp_text = bool(state['keywords']['otp_required'])
+        controls = {"inputs": 0, "input_selector": None}
+        discover_args = (input_selectors, verify_candidates, GENERIC_OTP_SELECTOR)
+        if has_otp_text or state['otp_inputs']:
+            await page.wait_for(f"({script_call(OTP_CONTROLS_JS, *discover_args)}).inputs > 0",
+                                timeout=10, description="OTP inputs")
+            controls = await page.call(OTP_CONTROLS_JS, *discover_args)
+        otp_required = bool(controls['inputs']) or has_otp_text
+        if otp_required:
+            locators.record("otp_input", controls['input_selector'], input_selectors[0])
+        step.end(otp_required=otp_required)
+
+        if otp_required:
+            if coordinator:
+                await asyncio.to_thread(coordinator.record_otp_request)
+            if checkpoints:
+                await asyncio.to_thread(checkpoints.record_otp_request)
+            print(f"[OTP] ⚠️  {email}: OTP verification required ({controls['inputs']} inputs)")
+            await shots.capture_async("step_1_otp_prompt")
+
+            source_name = otp_watch.name if otp_watch else "gmail_api"
+            step = timeline.begin("otp_wait", source=source_name)
+            if otp_watch:
+                otp_code = await otp_watch.wait_for_otp_async(sender_filter="naukri.com", max_wait_seconds=90)
+            else:
+                otp_code = await asyncio.to_thread(get_otp_from_gmail, sender_filter="naukri.com",
+                                                   max_wait_seconds=90)
+            step.end(status="ok" if otp_code else "timeout")
+            if not otp_code:
+                raise Exception(f"Failed to retrieve OTP via {source_name} - check the OTP source credentials")
+
+            step = timeline.begin("otp_entry")
+            filled = await page.call(OTP_FILL_JS, *discover_args, otp_code)
+            if filled['value'] != otp_code:
+                print(f"[OTP] ⚠️  {email}: OTP did not stick in {filled['inputs']} input(s)")
+            await shots.capture_async("step_1_otp_entered")
+            step.end()
+
+            step = timeline.begin("otp_verify")
+            verify = f"({script_call(DISCOVER_JS, *discover_args)}).submit"
+            await page.wait_for(f"!!{verify}", timeout=3, description="verify button")
+            controls = await page.call(OTP_CONTROLS_JS, *discover_args)
+            locators.record("verify_button", controls['submit_selector'], verify_candidates[0]['name'])
+            if not await page.click(verify):
+                print(f"[OTP] {email}: no verify button found - pressing Enter")
+                for event in ("keyDown", "keyUp"):
+                    await page.send("Input.dispatchKeyEvent", {
+                        "type": event, "key": "Enter", "code": "Enter", "windowsVirtualKeyCode": 13,
+                        "text": "\r" if event == "keyDown" else ""})
+
+            await page.wait_for(
+                "location.href.toLowerCase().indexOf('login') === -1 || " + page_text_has(INVALID_OTP_KEYWORDS),
+                timeout=20, description="OTP verification result")
+            await page_loaded(page)
+            await shots.capture_async("step_1_after_otp_verification")
+            if "login" in (await page.url()).lower():
+                if not await page.wait_for("location.href.toLowerCase().indexOf('login') === -1",
+                                           timeout=5, description="redirect after OTP") \
+                        and (await classify(page))['state'] == OTP_INVALID:
+                    await shots.capture_async("step_1_otp_verification_failed", failure=True)
+                    raise Exception("OTP verification failed - invalid/expired OTP")
+            step.end()
+
+    except RateLimitedError:
+        step.end(status="rate_limited")
+        raise
+    except Exception as otp_error:
+        step.end(status="error", error=type(otp_error).__name__)
+        print(f"[OTP] ❌ {email}: OTP handling error: {otp_error}")
+        await shots.capture_async("step_1_otp_error", failure=True)
+        print("[OTP] Continuing anyway...")
+    finally:
+        if otp_watch is not None:
+            await asyncio.to_thread(otp_watch.close)
+
+    step = timeline.begin("login_verify")
+    await page_loaded(page)
+    state = await classify(page)
+    indicators = state['indicators']
+    if any(indicators.values()) or ("login" not in state['url'].lower() and not state['login_form']):
+        print(f"[✓] {email}: login verified ({[n for n, v in indicators.items() if v] or state['url']})")
+    else:
+        await shots.capture_async("step_1_login_verification_failed", failure=True)
+        raise Exception("Login verification failed - could not confirm successful login")
+    step.end()
+    await shots.capture_async("step_1_login_success")
+
+
+async def cdp_open_profile(page, shots, timeline):
+    """update.open_profile() on a CDPPage."""
+    step = timeline.begin("profile_page")
+    if "mnjuser/profile" not in (await page.url()).lower():
+        await page.navigate(PROFILE_URL)
+        await page_loaded(page)
+    url = await page.url()
+    if "profile" not in url.lower():
+        await shots.capture_async("step_2_not_on_profile", failure=True)
+        step.end(status="error")
+        raise Exception(f"Not on the profile page: {url}")
+    await shots.capture_async("step_2_profile_page")
+    step.end()
+
+
+async def cdp_reload_profile(page):
+    """update.reload_profile() on a CDPPage."""
+    print("[Checkpoint] Reloading the profile page...")
+    await page.navigate(PROFILE_URL)
+    await page_loaded(page)
+
+
+async def cdp_edit_headline(page, shots, timeline, headline=HEADLINE_TEXT):
+    """update.edit_headline() on a CDPPage."""
+    step = timeline.begin("headline_edit")
+    edit_button = xpath_element(HEADLINE_EDIT_XPATH)
+    if not await page.wait_for(clickable(edit_button), timeout=20, description="Resume headline edit"):
+        raise Exception("Resume headline edit button not found")
+    await page.click(edit_button)
+    textarea = "document.getElementById('resumeHeadlineTxt')"
+    if not await page.wait_for(clickable(textarea), timeout=20, description="headline editor"):
+        raise Exception("Resume headline editor did not open")
+    values = await page.call(FILL_SELECTORS_JS, [["#resumeHeadlineTxt", headline]])
+    if values != [headline]:
+        # Same fallback as FORM_FILL_MODE=insert_text: real input events
+        await page.evaluate(f"{textarea}.focus(); {textarea}.select();")
+        await page.send("Input.insertText", {"text": headline})
+    await shots.capture_async("step_4_text_updated")
+    step.end()
+
+
+async def cdp_reopen_editor(page, shots, timeline, headline=HEADLINE_TEXT):
+    """update.reopen_editor() on a CDPPage."""
+    await cdp_reload_profile(page)
+    await cdp_edit_headline(page, shots, timeline, headline)
+
+
+async def cdp_save_headline(page, shots, timeline):
+    """update.save_headline() on a CDPPage."""
+    step = timeline.begin("headline_save")
+    save_button = xpath_element(SAVE_BUTTON_XPATH)
+    if not await page.wait_for(clickable(save_button), timeout=20, description="Save button"):
+        raise Exception("Save button not found")
+    await page.click(save_button)
+    save_confirmed = await page.wait_for(SAVE_CONFIRMED_JS, timeout=10, description="save confirmation")
+    step.end(confirmed=save_confirmed)
+    if not save_confirmed:
+        print("[WARN] ⚠️  Save was not confirmed by the page - check step_5 screenshot")
+        await shots.capture_async("step_5_save_unconfirmed", failure=True)
+    await shots.capture_async("step_5_save_clicked")
+
+
+async def restore_session(chrome, page, session_store):
+    """SessionStore.restore() for a browser context. Returns True if a session was injected."""
+    data = await asyncio.to_thread(session_store.load)
+    if not data:
+        return False
+    cookies, script = session_store.restore_payload(data)
+    await chrome.connection.send("Storage.setCookies", {"cookies": cookies, "browserContextId": page.context_id})
+    if script:
+        await page.send("Page.addScriptToEvaluateOnNewDocument", {"source": script})
+    print(f"[Session] Restored {len(cookies)} cookies into the browser context")
+    return True
+
+
+async def save_session(chrome, page, session_store):
+    try:
+        cookies = (await chrome.connection.send("Storage.getCookies", {
+            "browserContextId": page.context_id})).get("cookies", [])
+        local_storage = {}
+        if (await page.url()).startswith(session_store.origin):
+            local_storage = await page.call(LOCAL_STORAGE_JS) or {}
+        await asyncio.to_thread(session_store.write, cookies, local_storage)
+    except Exception as e:
+        print(f"[Session] Could not save session: {e}")
+
+
+async def session_valid(page, shots):
+    await page.navigate(PROFILE_URL)
+    await page_loaded(page)
+    state = await classify(page)
+    url = state['url'].lower()
+    if "login" in url or "mnjuser/profile" not in url or state['state'] == LOGIN_FORM:
+        print("[Session] ⚠️  Restored session has expired - falling back to full login")
+        return False
+    await shots.capture_async("step_1_session_restored")
+    return True
+
+
+async def run_account_cdp(chrome, email, password, log_dir, headline=HEADLINE_TEXT, coordinator=None):
+    """
+    update.run_account() in its own browser context of chrome, through the
+    same checkpointed steps: retries in place after login, login retried
+    only while no OTP was requested, and resuming an unfinished run.
+
+    Writes run_status.json into log_dir and returns the status string
+    (SUCCESS, RATE_LIMITED, DEFERRED or FAILURE). Never raises for flow errors.
+    """
+    # Spans are opened on this session's timeline directly - the thread-local
+    # active timeline is shared by every session on the loop
+    timeline = Timeline()
+    blocker = ResourceBlocker.from_env(None)
+    page = await chrome.new_page(user_agent=USER_AGENT,
+                                 blocked_urls=blocker.patterns if ResourceBlocker.enabled() else None)
+    shots = ScreenshotPipeline(page, log_dir)
+    session_store = SessionStore.from_env(email, base_url=NAUKRI_BASE_URL)
+    session_restored = False
+    checkpoints = await asyncio.to_thread(RunCheckpoints.from_env, email)
+
+    def run_details(status, **extra):
+        timeline.finish(status.lower())
+        if metrics_enabled():
+            timeline.write_openmetrics(os.path.join(log_dir, "metrics.prom"),
+                                       labels={"account": email, "status": status, "engine": "cdp"})
+        return {"engine": "cdp", "timeline": timeline.to_list(), "checkpoints": checkpoints.finish(status),
+                **extra}
+
+    async def finish(status, message, **details):
+        # The metrics file, the checkpoint journal and the status file are all disk writes
+        await asyncio.to_thread(lambda: write_status_summary(
+            log_dir, status=status, message=message, details=run_details(status, **details), account=email))
+        return status
+
+    resume = checkpoints.resume_point()
+    if resume:
+        print(f"[Checkpoint] {email}: the run of {resume['started_at']} got past login "
+              f"(to {resume['last_step']}) but did not finish - resuming from the saved session")
+
+    try:
+        if session_store and await restore_session(chrome, page, session_store):
+            step = timeline.begin("session_restore")
+            session_restored = await session_valid(page, shots)
+            step.end(valid=session_restored)
+            if not session_restored:
+                await asyncio.to_thread(session_store.clear)
+                await chrome.connection.send("Storage.clearCookies", {"browserContextId": page.context_id})
+
+        if session_restored:
+            await asyncio.to_thread(checkpoints.mark, LOGIN, via="saved_session")
+        else:
+            if coordinator and not coordinator.otp_allowed:
+                raise OTPBudgetExhausted(coordinator.decision["reason"])
+            otp_requests = checkpoints.journal["otp_requests"]
+
+            async def login_verified():
+                # Logged in after all (e.g. only the verification timed out) - no second OTP
+                return otp_requests != checkpoints.journal["otp_requests"] and await session_valid(page, shots)
+
+            await checkpoints.run_async(
+                LOGIN, lambda: cdp_login(page, email, password, shots, timeline,
+                                         coordinator=coordinator, checkpoints=checkpoints),
+                timeline,
+                verify=login_verified,
+                retry_if=lambda: otp_requests == checkpoints.journal["otp_requests"],
+                fatal=(RateLimitedError,),
+            )
+            # Saved right away, so a crash in a later step resumes without a new OTP
+            if session_store:
+                await save_session(chrome, page, session_store)
+
+        if session_restored and checkpoints.done_before(OPEN_PROFILE):
+            # The session check just opened the profile page the last run got past
+            print(f"[Checkpoint] {email}: profile page already open - resuming at the headline edit")
+            await asyncio.to_thread(checkpoints.mark, OPEN_PROFILE, via="resume")
+        else:
+            await checkpoints.run_async(OPEN_PROFILE, lambda: cdp_open_profile(page, shots, timeline), timeline,
+                                        recover=lambda: cdp_reload_profile(page))
+        await checkpoints.run_async(EDIT_HEADLINE, lambda: cdp_edit_headline(page, shots, timeline, headline),
+                                    timeline, recover=lambda: cdp_reload_profile(page))
+        await checkpoints.run_async(SAVE_HEADLINE, lambda: cdp_save_headline(page, shots, timeline), timeline,
+                                    recover=lambda: cdp_reopen_editor(page, shots, timeline, headline))
+        if session_store:
+            await save_session(chrome, page, session_store)
+
+        print(f"[✅] {email}: profile update completed successfully!")
+        return await finish("SUCCESS", "Profile headline updated successfully",
+                            profile_section="Resume Headline", automated=True, session_reused=session_restored)
+
+    except OTPBudgetExhausted as e:
+        print(f"[Budget] ⏸️  {email}: saved session expired and {e} - deferring")
+        return await finish("DEFERRED", "OTP budget used up and the saved session expired. Will retry later.",
+                            budget=coordinator.decision, expected=True)
+
+    except RateLimitedError:
+        if coordinator:
+            await asyncio.to_thread(coordinator.record_rate_limited)
+        return await finish("RATE_LIMITED", "Naukri rate limited OTP requests. Will retry in next scheduled run.",
+                            retry_in="6 hours", expected=True)
+
+    except Exception as e:
+        error_type = type(e).__name__
+        print(f"[ERROR] {email}: {error_type}: {e}")
+        if not isinstance(e, CDPError):
+            print(traceback.format_exc())
+        await shots.capture_async("error_occurred", failure=True)
+        try:
+            url = await page.url()
+        except CDPError:
+            url = None
+        return await finish("FAILURE", f"Script failed: {error_type}", error=str(e), error_type=error_type, url=url)
+
+    finally:
+        timeline.finish("error")
+        await asyncio.to_thread(shots.close)
+        await page.close()
+        await asyncio.to_thread(get_locator_cache().save)
+
+
+async def _run_fleet_cdp(accounts, contexts, run_dir, shared_inbox):
+    results = []
+    inbox = None
+    if shared_inbox and len(accounts) > 1:
+        inbox = await asyncio.to_thread(SharedInbox.open)
+        if inbox is None:
+            print("[CDP] Shared OTP inbox unavailable - each login reads the mailbox itself")
+        else:
+            use_shared_inbox(inbox.start())
+    chrome = None
+    slots = asyncio.Semaphore(contexts)
+
+    async def run_one(account):
+        async with slots:
+            email = account['email']
+            # The run lock, the OTP ledger and the status files are file I/O -
+            # kept off the loop so they never stall the other contexts
+            log_dir = await asyncio.to_thread(account_log_dir, run_dir, email)
+            start = time.time()
+            coordinator = await asyncio.to_thread(RunCoordinator, email)
+            decision = await asyncio.to_thread(coordinator.begin)
+            try:
+                if decision['action'] != ATTEMPT:
+                    status = await asyncio.to_thread(write_budget_status, log_dir, decision, account=email)
+                else:
+                    status = await run_account_cdp(chrome, email, account['password'], log_dir,
+                                                   headline=account.get('headline') or HEADLINE_TEXT,
+                                                   coordinator=coordinator)
+            except Exception as e:
+                print(f"[CDP] {email} crashed: {e}")
+                status = "FAILURE"
+            finally:
+                await asyncio.to_thread(coordinator.finish)
+            duration = time.time() - start
+            print(f"[CDP] {email} -> {status} in {duration:.1f}s")
+            results.append({"email": email, "status": status, "duration_seconds": round(duration, 2),
+                             "log_dir": log_dir})
+
+    try:
+        chrome = await Chrome.launch(user_agent=USER_AGENT)
+        await asyncio.gather(*(run_one(account) for account in accounts))
+    finally:
+        if chrome is not None:
+            await chrome.close()
+        if inbox is not None:
+            use_shared_inbox(None)
+            await asyncio.to_thread(inbox.stop)
+    return results, (inbox.stats() if inbox else None), chrome.connection.commands
+
+
+def run_fleet_cdp(accounts, contexts=8, shared_inbox=True):
+    """
+    Process all accounts on one Chrome with up to contexts concurrent
+    browser contexts, all driven from one event loop.
+
+    Returns:
+        dict: Aggregate summary (also written to fleet_summary.json)
+    """
+    run_dir = make_log_dir()
+    contexts = max(1, min(contexts, len(accounts)))
+    print(f"[CDP] Running {len(accounts)} accounts on {contexts} browser contexts of one Chrome")
+    start = time.time()
+    results, inbox_stats, commands = asyncio.run(_run_fleet_cdp(accounts, contexts, run_dir, shared_inbox))
+    elapsed = time.time() - start
+
+    counts = {}
+    for result in results:
+        counts[result['status']] = counts.get(result['status'], 0) + 1
+
+    summary = {
+        "timestamp": datetime.now().isoformat(),
+        "engine": "cdp",
+        "accounts": len(accounts),
+        "contexts": contexts,
+        "elapsed_seconds": round(elapsed, 2),
+        "accounts_per_minute": round(len(results) / (elapsed / 60), 2) if elapsed > 0 else 0.0,
+        "status_counts": counts,
+        "cdp_commands": commands,
+        "otp_inbox": inbox_stats,
+        "results": results,
+    }
+    summary_file = os.path.join(run_dir, "fleet_summary.json")
+    with open(summary_file, 'w') as f:
+        json.dump(summary, f, indent=2)
+
+    print(f"[CDP] Done: {counts} in {elapsed:.1f}s "
+          f"({summary['accounts_per_minute']} accounts/min) - summary in {summary_file}")
+    return summary
+
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Run the Naukri profile update over CDP for many accounts")
+    parser.add_argument("accounts_file", help="JSON list of {email, password[, headline]} objects")
+    parser.add_argument("--contexts", type=int, default=int(os.environ.get("CDP_CONTEXTS", "8")),
+                        help="Concurrent browser contexts (default: CDP_CONTEXTS or 8)")
+    parser.add_argument("--no-shared-inbox", action="store_true",
+                        help="Let every login read the OTP mailbox on its own")
+    args = parser.parse_args()
+
+    accounts = load_accounts(args.accounts_file)
+    if not accounts:
+        print("[CDP] No valid accounts to run")
+        sys.exit(1)
+
+    summary = run_fleet_cdp(accounts, contexts=args.contexts, shared_inbox=not args.no_shared_inbox)
+    sys.exit(1 if summary['status_counts'].get("FAILURE") else 0)
+
+
+if __name__ == '__main__':
+    main()
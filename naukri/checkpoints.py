@@ -0,0 +1,310 @@
+import os
+import json
+import time
+import random
+import asyncio
+import hashlib
+from datetime import datetime
+from timing import span
+
+
+class StepPolicy:
+    """
+    How often a step may run before the run fails, and how long to wait
+    between attempts (exponential backoff with jitter).
+    """
+
+    def __init__(self, attempts=1, backoff_seconds=2.0, max_backoff_seconds=15.0):
+        self.attempts = max(1, int(attempts))
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+
+    def delay(self, attempt):
+        """Seconds to wait after the given (1-based) failed attempt."""
+        return min(self.max_backoff_seconds, self.backoff_seconds * 2 ** (attempt - 1)) * random.uniform(0.8, 1.2)
+
+
+# Steps of a run, in order. Login is only retried while no OTP has been
+# requested; the steps after it retry in place on the logged-in browser.
+LOGIN = "login"
+OPEN_PROFILE = "open_profile"
+EDIT_HEADLINE = "edit_headline"
+SAVE_HEADLINE = "save_headline"
+STEPS = (LOGIN, OPEN_PROFILE, EDIT_HEADLINE, SAVE_HEADLINE)
+
+DEFAULT_POLICIES = {
+    LOGIN: StepPolicy(attempts=2, backoff_seconds=3.0),
+    OPEN_PROFILE: StepPolicy(attempts=3, backoff_seconds=1.0),
+    EDIT_HEADLINE: StepPolicy(attempts=3, backoff_seconds=2.0),
+    SAVE_HEADLINE: StepPolicy(attempts=3, backoff_seconds=2.0),
+}
+
+
+class RunCheckpoints:
+    """
+    Step checkpoints of one account's run, so a failure after login does not
+    cost another OTP.
+
+    run() executes a step under its StepPolicy: a failed attempt is
+    recorded, the step's recover() puts the (still logged-in) browser back
+    into a state the step can start from, and the step is tried again.
+    Every transition is written to a per-account journal, so when a run
+    dies half way the next run knows how far it got. Resuming skips the
+    steps whose outcome survives the browser: login (via the saved session,
+    SessionStore) and opening the profile (the session check lands on it).
+    Editing and saving the headline live in the dead browser's page, so
+    they run again. The journal is removed when a run succeeds; the
+    checkpoints go into run_status.json.
+
+    Configuration (environment variables):
+        STEP_RETRIES                Attempts for each step after login (default 3)
+        CHECKPOINT_MAX_AGE_HOURS    Ignore unfinished journals older than this (default 24)
+        OTP_STATE_DIR               Journal directory (default .naukri_otp)
+    """
+
+    def __init__(self, path, policies=None, max_age_hours=24):
+        self.path = path
+        self.policies = dict(DEFAULT_POLICIES, **(policies or {}))
+        self.max_age_seconds = max_age_hours * 3600
+        self.previous = self._load_previous()
+        self.journal = {
+            "started_at": time.time(),
+            "status": "running",
+            # OTPs requested since the last successful update, carried over from unfinished runs
+            "otp_requests": (self.previous or {}).get("otp_requests", 0),
+            "steps": [],
+        }
+
+    @classmethod
+    def from_env(cls, email):
+        state_dir = os.environ.get("OTP_STATE_DIR", ".naukri_otp")
+        # Named by a hash so the email is not on disk in clear text
+        account_id = hashlib.sha256(email.lower().encode('utf-8')).hexdigest()[:16]
+        policies = {}
+        if os.environ.get("STEP_RETRIES"):
+            attempts = int(os.environ["STEP_RETRIES"])
+            policies = {name: StepPolicy(attempts, p.backoff_seconds, p.max_backoff_seconds)
+                        for name, p in DEFAULT_POLICIES.items() if name != LOGIN}
+        return cls(os.path.join(state_dir, f"{account_id}.checkpoints.json"), policies=policies,
+                   max_age_hours=float(os.environ.get("CHECKPOINT_MAX_AGE_HOURS", "24")))
+
+    def _load_previous(self):
+        """The journal of an earlier run that did not finish, or None."""
+        try:
+            with open(self.path) as f:
+                journal = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        if time.time() - journal.get("started_at", 0) > self.max_age_seconds:
+            return None
+        return journal
+
+    def _save(self):
+        self._write(json.dumps(self.journal, indent=2))
+
+    async def _save_async(self):
+        # Serialised on the loop (the journal is only changed there), written off it
+        await asyncio.to_thread(self._write, json.dumps(self.journal, indent=2))
+
+    def _write(self, data):
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, 'w') as f:
+                f.write(data)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"[Checkpoint] Could not save the checkpoint journal: {e}")
+
+    # -- resume -------------------------------------------------------------
+
+    def completed(self, journal=None):
+        """Names of the steps that completed in journal (default: this run)."""
+        journal = journal or self.journal
+        return [s["name"] for s in journal["steps"] if s["status"] in ("ok", "verified", "resumed")]
+
+    def resume_point(self):
+        """
+        What the last unfinished run got through, if it got past login.
+
+        Returns:
+            dict or None: {'last_step', 'started_at', 'status', 'otp_requests'}
+        """
+        if not self.previous:
+            return None
+        completed = self.completed(self.previous)
+        if LOGIN not in completed:
+            return None
+        return {
+            "last_step": completed[-1],
+            "started_at": datetime.fromtimestamp(self.previous["started_at"]).isoformat(),
+            "status": self.previous.get("status"),
+            "otp_requests": self.previous.get("otp_requests", 0),
+        }
+
+    def done_before(self, name):
+        """True if the unfinished run being resumed (see resume_point()) completed step name."""
+        return self.resume_point() is not None and name in self.completed(self.previous)
+
+    # -- steps --------------------------------------------------------------
+
+    def record_otp_request(self):
+        self.journal["otp_requests"] += 1
+        self._save()
+
+    def mark(self, name, status="resumed", **attrs):
+        """Record a step as satisfied without running it (e.g. login via a restored session)."""
+        self.journal["steps"].append({"name": name, "status": status, "attempts": 0,
+                                      "at": datetime.now().isoformat(), **attrs})
+        self._save()
+
+    def run(self, name, step, recover=None, verify=None, retry_if=None, fatal=()):
+        """
+        Run step() under the policy for name and checkpoint the outcome.
+
+        Args:
+            name: Step name (one of STEPS)
+            step: Callable doing the step; raises on failure
+            recover: Called before each retry to get the browser back to
+                where the step starts (e.g. reload the profile page)
+            verify: Called after a failed attempt; if it returns True the
+                step counts as done anyway (e.g. a login whose verification
+                timed out but whose session turns out to be valid)
+            retry_if: Called after a failed attempt; a retry only happens
+                if it returns True (e.g. login: only if no OTP was requested)
+            fatal: Exception types that are never retried
+
+        Returns:
+            Whatever step() returned (None if verify() satisfied the step)
+        """
+        entry, policy = self._begin(name)
+        start = time.time()
+        try:
+            while True:
+                entry["attempts"] += 1
+                self._save()
+                try:
+                    with span(name, attempt=entry["attempts"]):
+                        result = step()
+                    entry["status"] = "ok"
+                    return result
+                except fatal:
+                    entry["status"] = "failed"
+                    raise
+                except Exception as e:
+                    entry["errors"].append(f"{type(e).__name__}: {e}"[:300])
+                    if verify and self._safely(verify, name, "verify"):
+                        return self._verified(entry, name)
+                    backoff = self._backoff(entry, policy, name, e, retry_if)
+                    if backoff is None:
+                        raise
+                    time.sleep(backoff)
+                    if recover:
+                        self._safely(recover, name, "recover")
+        finally:
+            entry["duration_seconds"] = round(time.time() - start, 3)
+            self._save()
+
+    async def run_async(self, name, step, timeline, recover=None, verify=None, retry_if=None, fatal=()):
+        """
+        run() on an event loop (the CDP engine): step, recover and verify are
+        coroutine functions, the backoff does not block the loop and the
+        journal is written from a worker thread. Spans go on timeline, as
+        the sessions sharing a loop cannot use the thread's active timeline.
+        """
+        entry, policy = self._begin(name)
+        start = time.time()
+        try:
+            while True:
+                entry["attempts"] += 1
+                await self._save_async()
+                attempt = timeline.begin(name, attempt=entry["attempts"])
+                try:
+                    result = await step()
+                    attempt.end()
+                    entry["status"] = "ok"
+                    return result
+                except fatal as e:
+                    attempt.end(status="error", error=type(e).__name__)
+                    entry["status"] = "failed"
+                    raise
+                except Exception as e:
+                    attempt.end(status="error", error=type(e).__name__)
+                    entry["errors"].append(f"{type(e).__name__}: {e}"[:300])
+                    if verify and await self._safely_async(verify, name, "verify", timeline):
+                        return self._verified(entry, name)
+                    backoff = self._backoff(entry, policy, name, e, retry_if)
+                    if backoff is None:
+                        raise
+                    await asyncio.sleep(backoff)
+                    if recover:
+                        await self._safely_async(recover, name, "recover", timeline)
+        finally:
+            entry["duration_seconds"] = round(time.time() - start, 3)
+            await self._save_async()
+
+    def _begin(self, name):
+        entry = {"name": name, "status": "running", "attempts": 0,
+                 "at": datetime.now().isoformat(), "errors": []}
+        self.journal["steps"].append(entry)
+        return entry, self.policies.get(name, StepPolicy())
+
+    @staticmethod
+    def _verified(entry, name):
+        print(f"[Checkpoint] {name} failed but its outcome checks out - continuing")
+        entry["status"] = "verified"
+        return None
+
+    @staticmethod
+    def _backoff(entry, policy, name, error, retry_if):
+        """Seconds to wait before the next attempt, or None (step marked failed) to give up."""
+        if entry["attempts"] >= policy.attempts or (retry_if and not retry_if()):
+            entry["status"] = "failed"
+            return None
+        backoff = policy.delay(entry["attempts"])
+        print(f"[Checkpoint] {name} failed (attempt {entry['attempts']}/{policy.attempts}): {error}"
+              f" - retrying in {backoff:.1f}s")
+        return backoff
+
+    @staticmethod
+    def _safely(action, name, kind):
+        try:
+            with span(f"{name}_{kind}"):
+                return action()
+        except Exception as e:
+            print(f"[Checkpoint] Could not {kind} {name}: {e}")
+            return False
+
+    @staticmethod
+    async def _safely_async(action, name, kind, timeline):
+        current = timeline.begin(f"{name}_{kind}")
+        try:
+            result = await action()
+            current.end()
+            return result
+        except Exception as e:
+            current.end(status="error", error=type(e).__name__)
+            print(f"[Checkpoint] Could not {kind} {name}: {e}")
+            return False
+
+    def finish(self, status):
+        """
+        Close the journal: a successful run deletes it, any other outcome
+        leaves it for the next run to resume from.
+
+        Returns:
+            dict: the checkpoint details for run_status.json
+        """
+        self.journal["status"] = status
+        if status == "SUCCESS":
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+        else:
+            self._save()
+        return {
+            "steps": self.journal["steps"],
+            "otp_requests": self.journal["otp_requests"],
+            "resumed_from": self.resume_point(),
+        }
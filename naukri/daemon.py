@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Daemon Mode
+===========
+Keeps one warm Chrome (and its logged-in Naukri session) alive and refreshes
+the headline on an internal schedule, instead of cold-starting Chrome and
+logging in on every run. A refresh only logs in again when the session
+health probe finds the session gone.
+
+Usage:
+    python3 update.py --daemon --interval-hours 4
+    python3 daemon.py --interval-hours 4 --max-rss-mb 1500
+
+Stop it with SIGTERM or Ctrl+C; a refresh in progress is allowed to finish.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import signal
+import argparse
+import threading
+from datetime import datetime, timedelta
+from dotenv import load_dotenv
+from startup import StartupPipeline
+from update import (
+    HEADLINE_TEXT,
+    create_driver,
+    make_log_dir,
+    run_account,
+    validate_credentials,
+    write_budget_status,
+)
+from run_coordinator import ATTEMPT, SKIP, RunCoordinator
+
+
+def process_tree_rss_mb(root_pid):
+    """
+    Resident memory of root_pid and all its descendants, in MB (Linux /proc).
+
+    Returns:
+        float or None if /proc is not available
+    """
+    if not os.path.isdir("/proc"):
+        return None
+    parents = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # The process name may contain spaces - the ppid follows its closing paren
+                parents[int(entry)] = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+
+    tree, frontier = {root_pid}, [root_pid]
+    while frontier:
+        pid = frontier.pop()
+        for child, parent in parents.items():
+            if parent == pid and child not in tree:
+                tree.add(child)
+                frontier.append(child)
+
+    total_kb = 0
+    for pid in tree:
+        try:
+            with open(f"/proc/{pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total_kb += int(line.split()[1])
+                        break
+        except OSError:
+            continue
+    return total_kb / 1024.0
+
+
+class ProfileDaemon:
+    """
+    Resident headline refresher for one account.
+
+    The browser is relaunched after max_runs_per_browser refreshes, when the
+    ChromeDriver/Chrome process tree grows past max_rss_mb, or after a failed
+    refresh (so a wedged browser never lingers).
+    """
+
+    def __init__(self, email, password, headline=HEADLINE_TEXT, interval_hours=4.0,
+                 jitter_minutes=10, retry_minutes=30, max_runs_per_browser=50, max_rss_mb=1500):
+        self.email = email
+        self.password = password
+        self.headline = headline
+        self.interval = interval_hours * 3600
+        self.jitter = jitter_minutes * 60
+        self.retry = retry_minutes * 60
+        self.max_runs_per_browser = max_runs_per_browser
+        self.max_rss_mb = max_rss_mb
+        self.driver = None
+        self.otp_watch = None
+        self.startup_timings = None
+        self.runs_on_driver = 0
+        self.history = []
+        self.stop_event = threading.Event()
+
+    def request_stop(self, signum=None, frame=None):
+        if not self.stop_event.is_set():
+            print("[Daemon] Shutdown requested - finishing the current refresh")
+        self.stop_event.set()
+
+    def _launch_browser(self):
+        self._quit_browser()
+        pipeline = StartupPipeline(launch_browser=create_driver, otp_account=self.email)
+        self.driver, self.otp_watch = pipeline.run()
+        self.startup_timings = pipeline.timings
+        self.runs_on_driver = 0
+
+    def _quit_browser(self):
+        if self.driver is not None:
+            try:
+                self.driver.quit()
+            except Exception:
+                pass
+            print("[Daemon] Browser closed")
+        self.driver = None
+
+    def _browser_rss_mb(self):
+        try:
+            return process_tree_rss_mb(self.driver.service.process.pid)
+        except Exception:
+            return None
+
+    def _ensure_browser(self):
+        """Launch Chrome if needed, or relaunch it when a leak guard trips."""
+        if self.driver is None:
+            self._launch_browser()
+            return
+        if self.runs_on_driver >= self.max_runs_per_browser:
+            print(f"[Daemon] {self.runs_on_driver} refreshes on this browser - relaunching")
+            self._launch_browser()
+            return
+        rss = self._browser_rss_mb()
+        if rss is not None and rss > self.max_rss_mb:
+            print(f"[Daemon] Browser RSS {rss:.0f} MB > {self.max_rss_mb} MB - relaunching")
+            self._launch_browser()
+
+    def refresh(self):
+        """
+        One headline refresh on the warm browser.
+
+        Returns:
+            str: SUCCESS, RATE_LIMITED, DEFERRED, SKIPPED or FAILURE
+        """
+        start = time.time()
+        log_dir = make_log_dir()
+        coordinator = RunCoordinator(self.email)
+        decision = coordinator.begin()
+        if decision["action"] == SKIP:
+            return write_budget_status(log_dir, decision, account=self.email)
+        # Deferred runs still go ahead here: the warm browser's session needs no OTP
+        if decision["action"] != ATTEMPT:
+            coordinator.decision = dict(decision, otp_allowed=False)
+        try:
+            self._ensure_browser()
+            status = run_account(
+                self.driver, self.email, self.password, log_dir, headline=self.headline,
+                otp_watch=self.otp_watch, startup_timings=self.startup_timings,
+                probe_live_session=True, coordinator=coordinator,
+            )
+        except Exception as e:
+            # Browser launch failures land here; run_account handles flow errors itself
+            print(f"[Daemon] Refresh crashed: {e}")
+            status = "FAILURE"
+        finally:
+            coordinator.finish()
+        # The warm-up results belong to the first refresh after a launch only
+        if self.otp_watch is not None:
+            self.otp_watch.close()
+        self.otp_watch = None
+        self.startup_timings = None
+        self.runs_on_driver += 1
+        if status == "FAILURE":
+            self._quit_browser()
+
+        duration = time.time() - start
+        rss = self._browser_rss_mb() if self.driver else None
+        print(f"[Daemon] Refresh -> {status} in {duration:.1f}s"
+              + (f" (browser RSS {rss:.0f} MB)" if rss is not None else ""))
+        self.history.append({
+            "timestamp": datetime.now().isoformat(),
+            "status": status,
+            "duration_seconds": round(duration, 2),
+            "browser_rss_mb": round(rss, 1) if rss is not None else None,
+        })
+        self.history = self.history[-100:]
+        return status
+
+    def _write_state(self, next_run):
+        state = {
+            "pid": os.getpid(),
+            "updated": datetime.now().isoformat(),
+            "next_run": next_run.isoformat(),
+            "runs_on_browser": self.runs_on_driver,
+            "recent": self.history[-10:],
+        }
+        try:
+            with open("daemon_state.json", "w") as f:
+                json.dump(state, f, indent=2)
+        except Exception as e:
+            print(f"[Daemon] Could not write daemon_state.json: {e}")
+
+    def run_forever(self):
+        """Refresh now, then on schedule, until a stop is requested."""
+        print(f"[Daemon] Started (every {self.interval / 3600:g}h ± {self.jitter / 60:g}min)")
+        try:
+            while not self.stop_event.is_set():
+                status = self.refresh()
+                delay = self.retry if status == "FAILURE" else self.interval
+                delay += random.uniform(-self.jitter, self.jitter)
+                delay = max(60.0, delay)
+                next_run = datetime.now() + timedelta(seconds=delay)
+                self._write_state(next_run)
+                print(f"[Daemon] Next refresh at {next_run:%Y-%m-%d %H:%M:%S}")
+                self.stop_event.wait(delay)
+        finally:
+            self._quit_browser()
+            print("[Daemon] Stopped")
+
+
+def run_daemon(email, password, **kwargs):
+    """Run a ProfileDaemon in the foreground with SIGTERM/SIGINT wired to a graceful stop."""
+    daemon = ProfileDaemon(email, password, **kwargs)
+    signal.signal(signal.SIGTERM, daemon.request_stop)
+    signal.signal(signal.SIGINT, daemon.request_stop)
+    daemon.run_forever()
+
+
+def add_daemon_arguments(parser):
+    """Scheduler and leak-guard options shared by update.py --daemon and this script."""
+    parser.add_argument("--interval-hours", type=float,
+                        default=float(os.environ.get("DAEMON_INTERVAL_HOURS", "4")),
+                        help="Hours between refreshes (default: DAEMON_INTERVAL_HOURS or 4)")
+    parser.add_argument("--jitter-minutes", type=float, default=10,
+                        help="Random +/- offset added to every interval")
+    parser.add_argument("--retry-minutes", type=float, default=30,
+                        help="Delay before retrying after a failed refresh")
+    parser.add_argument("--max-runs-per-browser", type=int, default=50,
+                        help="Relaunch Chrome after this many refreshes")
+    parser.add_argument("--max-rss-mb", type=float,
+                        default=float(os.environ.get("DAEMON_MAX_RSS_MB", "1500")),
+                        help="Relaunch Chrome when its process tree uses more memory than this")
+
+
+def daemon_options(args):
+    return {
+        "interval_hours": args.interval_hours,
+        "jitter_minutes": args.jitter_minutes,
+        "retry_minutes": args.retry_minutes,
+        "max_runs_per_browser": args.max_runs_per_browser,
+        "max_rss_mb": args.max_rss_mb,
+    }
+
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Keep a warm browser and refresh the Naukri headline on a schedule")
+    add_daemon_arguments(parser)
+    args = parser.parse_args()
+
+    email = os.environ.get("NAUKRI_EMAIL")
+    password = os.environ.get("NAUKRI_PASSWORD")
+    error = validate_credentials(email, password)
+    if error:
+        print(f"[ERROR] {error}!")
+        sys.exit(1)
+    run_daemon(email, password, **daemon_options(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+import os
+import re
+import json
+import time
+import shutil
+import subprocess
+from datetime import datetime
+from webdriver_manager.chrome import ChromeDriverManager
+
+# Binaries tried (in order) to find the installed Chrome version
+CHROME_BINARIES = [
+    "google-chrome",
+    "google-chrome-stable",
+    "chromium",
+    "chromium-browser",
+    "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
+]
+
+
+class DriverResolver:
+    """
+    Resolves a ChromeDriver binary matching the installed Chrome major version.
+
+    Resolved drivers are recorded in a small manifest so a warm cache needs no
+    network at all. Configuration (environment variables):
+
+        CHROMEDRIVER_PATH       Use this binary as-is (no lookup)
+        CHROMEDRIVER_VERSION    Pin an exact driver version to download
+        CHROMEDRIVER_OFFLINE    'true' = never touch the network (air-gapped hosts)
+        CHROMEDRIVER_CACHE_DIR  Manifest/cache location (default ~/.cache/naukri-bot)
+        CHROME_BINARY           Chrome executable used for version detection
+    """
+
+    def __init__(self, cache_dir=None, pinned_version=None, offline=None):
+        self.cache_dir = cache_dir or os.environ.get(
+            "CHROMEDRIVER_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "naukri-bot"))
+        self.pinned_version = pinned_version or os.environ.get("CHROMEDRIVER_VERSION") or None
+        if offline is None:
+            offline = os.environ.get("CHROMEDRIVER_OFFLINE", "false").lower() == "true"
+        self.offline = offline
+        self.manifest_path = os.path.join(self.cache_dir, "chromedriver_manifest.json")
+        # Filled in by resolve(): {"seconds", "source", "chrome_major", "path"}
+        self.last_resolution = None
+
+    def chrome_major_version(self):
+        """Return the installed Chrome major version as a string, or None if unknown."""
+        binaries = [os.environ["CHROME_BINARY"]] if os.environ.get("CHROME_BINARY") else CHROME_BINARIES
+        for binary in binaries:
+            if not (os.path.isabs(binary) and os.path.exists(binary)) and not shutil.which(binary):
+                continue
+            try:
+                output = subprocess.run(
+                    [binary, "--version"], capture_output=True, text=True, timeout=10
+                ).stdout
+            except (OSError, subprocess.SubprocessError):
+                continue
+            match = re.search(r'(\d+)\.\d+\.\d+\.\d+', output)
+            if match:
+                return match.group(1)
+        return None
+
+    def _load_manifest(self):
+        try:
+            with open(self.manifest_path) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _save_manifest(self, manifest):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _cached_path(self, manifest, key):
+        entry = manifest.get(key)
+        if entry and os.path.exists(entry.get("path", "")):
+            return entry["path"]
+        return None
+
+    def resolve(self):
+        """
+        Return the path of a ChromeDriver binary to use.
+
+        Raises:
+            RuntimeError: In offline mode when no cached driver is available
+        """
+        start = time.time()
+        chrome_major = None
+
+        explicit = os.environ.get("CHROMEDRIVER_PATH")
+        if explicit:
+            path, source = explicit, "explicit"
+        else:
+            chrome_major = self.chrome_major_version()
+            manifest = self._load_manifest()
+            # Pinned versions are cached under their own key so a pin always wins
+            key = f"pin:{self.pinned_version}" if self.pinned_version else (chrome_major or "unknown")
+            path = self._cached_path(manifest, key)
+            source = "cache"
+
+            if not path and self.offline:
+                # Unknown Chrome version on an air-gapped host: fall back to the newest cached driver
+                candidates = sorted(
+                    (e for e in manifest.values() if os.path.exists(e.get("path", ""))),
+                    key=lambda e: e.get("resolved_at", ""),
+                    reverse=True,
+                )
+                if chrome_major is None and candidates:
+                    path = candidates[0]["path"]
+                else:
+                    raise RuntimeError(
+                        f"Offline mode: no cached ChromeDriver for Chrome {chrome_major or '(unknown)'} "
+                        f"in {self.manifest_path}. Run once online or set CHROMEDRIVER_PATH."
+                    )
+
+            if not path:
+                path = ChromeDriverManager(driver_version=self.pinned_version).install()
+                source = "download"
+                manifest[key] = {
+                    "path": path,
+                    "chrome_major": chrome_major,
+                    "pinned_version": self.pinned_version,
+                    "resolved_at": datetime.now().isoformat(),
+                }
+                try:
+                    self._save_manifest(manifest)
+                except OSError as e:
+                    print(f"[Driver] Could not write manifest: {e}")
+
+        self.last_resolution = {
+            "seconds": round(time.time() - start, 3),
+            "source": source,
+            "chrome_major": chrome_major,
+            "path": path,
+        }
+        print(f"[Driver] ChromeDriver from {source} in {self.last_resolution['seconds']:.2f}s: {path}")
+        return path
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Fleet Runner
+============
+Runs the Naukri login/update flow for many accounts on a bounded pool of
+Chrome workers. Each worker keeps its browser alive between accounts and
+resets cookies/storage instead of relaunching Chrome. OTP mails for all
+accounts are read by one shared inbox watcher and routed by recipient
+address (otp_inbox.py).
+
+Usage:
+    python3 fleet.py accounts.json --workers 3
+    python3 fleet.py accounts.json --engine cdp --contexts 8   # one Chrome, asyncio (cdp_engine.py)
+
+accounts.json:
+    [
+        {"email": "first@example.com", "password": "..."},
+        {"email": "second@example.com", "password": "...", "headline": "Custom headline"}
+    ]
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import queue
+import argparse
+import threading
+from datetime import datetime
+from dotenv import load_dotenv
+from driver_resolver import DriverResolver
+from otp_inbox import SharedInbox
+from otp_sources import use_shared_inbox
+from run_coordinator import ATTEMPT, RunCoordinator
+from update import (
+    HEADLINE_TEXT,
+    create_driver,
+    make_log_dir,
+    reset_browser_context,
+    write_budget_status,
+    run_account,
+    validate_credentials,
+)
+
+
+def load_accounts(path):
+    """Read and validate the accounts file. Invalid entries are skipped with a warning."""
+    with open(path) as f:
+        entries = json.load(f)
+
+    accounts = []
+    for i, entry in enumerate(entries):
+        error = validate_credentials(entry.get('email'), entry.get('password'))
+        if error:
+            print(f"[Fleet] Skipping account #{i + 1}: {error}")
+            continue
+        accounts.append(entry)
+    return accounts
+
+
+def account_log_dir(run_dir, email):
+    """Per-account folder for screenshots and run_status.json."""
+    slug = re.sub(r'[^A-Za-z0-9._-]', '_', email.lower())
+    path = os.path.join(run_dir, slug)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+class BrowserWorker(threading.Thread):
+    """
+    One Chrome instance that processes accounts from a shared queue.
+
+    The browser is reused across accounts and only relaunched when a context
+    reset fails or after max_runs accounts (to bound memory growth).
+    """
+
+    def __init__(self, worker_id, jobs, results, run_dir, driver_path, max_runs=25):
+        super().__init__(name=f"fleet-worker-{worker_id}", daemon=True)
+        self.worker_id = worker_id
+        self.jobs = jobs
+        self.results = results
+        self.run_dir = run_dir
+        self.driver_path = driver_path
+        self.max_runs = max_runs
+        self.driver = None
+        self.runs_on_driver = 0
+
+    def _ensure_driver(self):
+        if self.driver is not None and self.runs_on_driver < self.max_runs:
+            try:
+                reset_browser_context(self.driver)
+                return
+            except Exception as e:
+                print(f"[Fleet] Worker {self.worker_id}: context reset failed ({e}) - relaunching Chrome")
+        self._quit_driver()
+        self.driver = create_driver(driver_path=self.driver_path)
+        self.runs_on_driver = 0
+
+    def _quit_driver(self):
+        if self.driver is not None:
+            try:
+                self.driver.quit()
+            except Exception:
+                pass
+            self.driver = None
+
+    def run(self):
+        try:
+            while True:
+                try:
+                    account = self.jobs.get_nowait()
+                except queue.Empty:
+                    return
+
+                email = account['email']
+                log_dir = account_log_dir(self.run_dir, email)
+                start = time.time()
+                coordinator = RunCoordinator(email)
+                decision = coordinator.begin()
+                if decision['action'] != ATTEMPT:
+                    status = write_budget_status(log_dir, decision, account=email)
+                    coordinator.finish()
+                else:
+                    try:
+                        self._ensure_driver()
+                        status = run_account(
+                            self.driver, email, account['password'], log_dir,
+                            headline=account.get('headline') or HEADLINE_TEXT,
+                            coordinator=coordinator,
+                        )
+                    except Exception as e:
+                        # Browser launch failures land here; run_account handles flow errors itself
+                        print(f"[Fleet] Worker {self.worker_id}: {email} crashed: {e}")
+                        self._quit_driver()
+                        status = "FAILURE"
+                    finally:
+                        coordinator.finish()
+                    self.runs_on_driver += 1
+
+                duration = time.time() - start
+                print(f"[Fleet] Worker {self.worker_id}: {email} -> {status} in {duration:.1f}s")
+                self.results.append({
+                    "email": email,
+                    "status": status,
+                    "duration_seconds": round(duration, 2),
+                    "log_dir": log_dir,
+                    "worker": self.worker_id,
+                })
+                self.jobs.task_done()
+        finally:
+            self._quit_driver()
+
+
+def run_fleet(accounts, workers=2, max_runs_per_browser=25, shared_inbox=True):
+    """
+    Process all accounts with a pool of browser workers.
+
+    With shared_inbox, one watcher reads the configured OTP mailbox for all
+    workers and hands each OTP to the login it is addressed to, instead of
+    every login polling the mailbox on its own.
+
+    Returns:
+        dict: Aggregate summary (also written to fleet_summary.json)
+    """
+    run_dir = make_log_dir()
+    resolver = DriverResolver()
+    driver_path = resolver.resolve()
+
+    jobs = queue.Queue()
+    for account in accounts:
+        jobs.put(account)
+    results = []
+
+    workers = max(1, min(workers, len(accounts)))
+    inbox = None
+    if shared_inbox and len(accounts) > 1:
+        inbox = SharedInbox.open()
+        if inbox is None:
+            print("[Fleet] Shared OTP inbox unavailable - each login reads the mailbox itself")
+        else:
+            use_shared_inbox(inbox.start())
+    print(f"[Fleet] Running {len(accounts)} accounts on {workers} browser workers")
+    start = time.time()
+    try:
+        pool = [
+            BrowserWorker(i + 1, jobs, results, run_dir, driver_path, max_runs=max_runs_per_browser)
+            for i in range(workers)
+        ]
+        for worker in pool:
+            worker.start()
+        for worker in pool:
+            worker.join()
+    finally:
+        if inbox is not None:
+            use_shared_inbox(None)
+            inbox.stop()
+    elapsed = time.time() - start
+
+    counts = {}
+    for result in results:
+        counts[result['status']] = counts.get(result['status'], 0) + 1
+
+    summary = {
+        "timestamp": datetime.now().isoformat(),
+        "accounts": len(accounts),
+        "workers": workers,
+        "driver_resolution": resolver.last_resolution,
+        "elapsed_seconds": round(elapsed, 2),
+        "accounts_per_minute": round(len(results) / (elapsed / 60), 2) if elapsed > 0 else 0.0,
+        "status_counts": counts,
+        "otp_inbox": inbox.stats() if inbox else None,
+        "results": results,
+    }
+    summary_file = os.path.join(run_dir, "fleet_summary.json")
+    with open(summary_file, 'w') as f:
+        json.dump(summary, f, indent=2)
+
+    print(f"[Fleet] Done: {counts} in {elapsed:.1f}s "
+          f"({summary['accounts_per_minute']} accounts/min) - summary in {summary_file}")
+    return summary
+
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Run the Naukri profile update for many accounts")
+    parser.add_argument("accounts_file", help="JSON list of {email, password[, headline]} objects")
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("FLEET_WORKERS", "2")),
+                        help="Concurrent browser workers (default: FLEET_WORKERS or 2)")
+    parser.add_argument("--max-runs-per-browser", type=int, default=25,
+                        help="Relaunch a worker's Chrome after this many accounts")
+    parser.add_argument("--no-shared-inbox", action="store_true",
+                        help="Let every login read the OTP mailbox on its own")
+    parser.add_argument("--engine", choices=("selenium", "cdp"), default=os.environ.get("FLEET_ENGINE", "selenium"),
+                        help="selenium: a Chrome + ChromeDriver per worker; cdp: browser contexts of one "
+                             "Chrome driven over DevTools from one event loop (default: FLEET_ENGINE or selenium)")
+    parser.add_argument("--contexts", type=int, default=int(os.environ.get("CDP_CONTEXTS", "8")),
+                        help="Concurrent browser contexts with --engine cdp (default: CDP_CONTEXTS or 8)")
+    args = parser.parse_args()
+
+    accounts = load_accounts(args.accounts_file)
+    if not accounts:
+        print("[Fleet] No valid accounts to run")
+        sys.exit(1)
+
+    if args.engine == "cdp":
+        # cdp_engine builds on this module, so it is imported only when needed here
+        from cdp_engine import run_fleet_cdp
+        summary = run_fleet_cdp(accounts, contexts=args.contexts, shared_inbox=not args.no_shared_inbox)
+    else:
+        summary = run_fleet(accounts, workers=args.workers, max_runs_per_browser=args.max_runs_per_browser,
+                            shared_inbox=not args.no_shared_inbox)
+    sys.exit(1 if summary['status_counts'].get("FAILURE") else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+import os
+
+MODES = ("script", "insert_text", "keys")
+
+# Sets each value through the native setter (so React/Angular see the change)
+# and fires the events the site listens for. Returns the resulting values.
+FILL_JS = """
+var pairs = arguments[0];
+return pairs.map(function(pair) {
+    var el = pair[0], value = pair[1];
+    var proto = el.tagName === 'TEXTAREA' ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;
+    el.focus();
+    Object.getOwnPropertyDescriptor(proto, 'value').set.call(el, value);
+    el.dispatchEvent(new Event('input', {bubbles: true}));
+    el.dispatchEvent(new KeyboardEvent('keyup', {bubbles: true}));
+    el.dispatchEvent(new Event('change', {bubbles: true}));
+    el.blur();
+    return el.value;
+});
+"""
+
+FOCUS_AND_SELECT_JS = "arguments[0].focus(); arguments[0].select();"
+
+
+def fill_fields(driver, fields, mode=None):
+    """
+    Fill several form fields at once.
+
+    Args:
+        driver: WebDriver
+        fields: List of (WebElement, value) pairs, filled in order
+        mode: 'script'      - one execute_script for all fields (default)
+              'insert_text' - CDP Input.insertText per field (real input events)
+              'keys'        - click/clear/send_keys per field (slowest, most human-like)
+              Defaults to the FORM_FILL_MODE env var.
+
+    Fields whose value did not stick are retried with send_keys.
+    """
+    mode = (mode or os.environ.get("FORM_FILL_MODE", "script")).lower()
+    if mode not in MODES:
+        print(f"[Form] Unknown FORM_FILL_MODE '{mode}', using 'script'")
+        mode = "script"
+
+    if mode == "keys":
+        _type_fields(fields)
+        return
+
+    if mode == "script":
+        values = driver.execute_script(FILL_JS, [[el, value] for el, value in fields])
+    else:
+        values = []
+        for el, value in fields:
+            driver.execute_script(FOCUS_AND_SELECT_JS, el)
+            driver.execute_cdp_cmd("Input.insertText", {"text": value})
+            values.append(el.get_attribute("value"))
+
+    missed = [(el, value) for (el, value), actual in zip(fields, values) if actual != value]
+    if missed:
+        print(f"[Form] {len(missed)} field(s) did not take the value - typing them instead")
+        _type_fields(missed)
+
+
+def _type_fields(fields):
+    """Keystroke-by-keystroke fallback."""
+    for el, value in fields:
+        el.click()
+        el.clear()
+        el.send_keys(value)
@@ -0,0 +1,147 @@
+import os
+import json
+import base64
+import hashlib
+import threading
+from datetime import datetime
+import httplib2
+import google_auth_httplib2
+from cryptography.fernet import Fernet, InvalidToken
+from google.oauth2.credentials import Credentials
+from google.auth.transport.requests import Request
+from googleapiclient.discovery import build_from_document
+
+SCOPES = ['https://www.googleapis.com/auth/gmail.readonly']
+# Both can be overridden to run against a stand-in (see benchmark/fake_gmail.py)
+TOKEN_URI = os.environ.get('GMAIL_TOKEN_URI', 'https://oauth2.googleapis.com/token')
+API_BASE_URL = os.environ.get('GMAIL_API_BASE_URL')
+
+# Trimmed copy of the Gmail v1 discovery document with only the methods the
+# OTP reader calls (users.getProfile, users.history.list, users.messages.list/get)
+DISCOVERY_DOC_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gmail_discovery_v1.json')
+
+_creds_lock = threading.Lock()
+_creds = None
+_discovery_doc = None
+# httplib2.Http is not thread-safe, so each thread gets its own authorized session
+_local = threading.local()
+
+
+class TokenCache:
+    """
+    Keeps the short-lived OAuth access token and its expiry on disk between
+    runs, encrypted with a key derived from the client secret and refresh
+    token (so only someone who already holds those can read it).
+    """
+
+    def __init__(self, path, client_secret, refresh_token):
+        self.path = path
+        secret = f"{client_secret}:{refresh_token}".encode('utf-8')
+        self.fernet = Fernet(base64.urlsafe_b64encode(hashlib.sha256(secret).digest()))
+
+    def load(self):
+        """Return (token, expiry) or (None, None) if there is no usable cached token."""
+        try:
+            with open(self.path, 'rb') as f:
+                data = json.loads(self.fernet.decrypt(f.read()).decode('utf-8'))
+            return data['token'], datetime.fromisoformat(data['expiry'])
+        except FileNotFoundError:
+            return None, None
+        except (InvalidToken, ValueError, KeyError) as e:
+            print(f"[Gmail] Ignoring unreadable token cache: {type(e).__name__}")
+            return None, None
+
+    def save(self, creds):
+        """Write the current access token and expiry (best effort)."""
+        if not creds.token or not creds.expiry:
+            return
+        try:
+            payload = json.dumps({'token': creds.token, 'expiry': creds.expiry.isoformat()}).encode('utf-8')
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(self.fernet.encrypt(payload))
+        except Exception as e:
+            print(f"[Gmail] Could not write token cache: {e}")
+
+
+def _load_discovery_doc():
+    global _discovery_doc
+    if _discovery_doc is None:
+        with open(DISCOVERY_DOC_PATH) as f:
+            _discovery_doc = json.load(f)
+        if API_BASE_URL:
+            # rootUrl also decides where batch requests go
+            root = API_BASE_URL.rstrip('/') + '/'
+            _discovery_doc.update({'rootUrl': root, 'baseUrl': root})
+    return _discovery_doc
+
+
+def get_credentials():
+    """
+    Return process-wide Gmail credentials, using a cached access token when it
+    is still valid and refreshing (and re-caching) it otherwise.
+    """
+    global _creds
+    with _creds_lock:
+        if _creds is not None and _creds.valid:
+            return _creds
+
+        # Get credentials from environment
+        client_id = os.environ.get('GMAIL_CLIENT_ID')
+        client_secret = os.environ.get('GMAIL_CLIENT_SECRET')
+        refresh_token = os.environ.get('GMAIL_REFRESH_TOKEN')
+
+        if not all([client_id, client_secret, refresh_token]):
+            raise ValueError(
+                "Missing Gmail credentials! Required: "
+                "GMAIL_CLIENT_ID, GMAIL_CLIENT_SECRET, GMAIL_REFRESH_TOKEN"
+            )
+
+        cache = TokenCache(
+            os.environ.get('GMAIL_TOKEN_CACHE', '.gmail_token_cache'),
+            client_secret,
+            refresh_token,
+        )
+        token, expiry = cache.load()
+
+        creds = Credentials(
+            token=token,
+            refresh_token=refresh_token,
+            token_uri=TOKEN_URI,
+            client_id=client_id,
+            client_secret=client_secret,
+            scopes=SCOPES,
+            expiry=expiry,
+        )
+
+        # Refresh only when the cached token is missing or about to expire
+        if not creds.valid:
+            creds.refresh(Request())
+            cache.save(creds)
+            print("[Gmail] Access token refreshed")
+        else:
+            print("[Gmail] Reusing cached access token")
+
+        _creds = creds
+        return creds
+
+
+def get_gmail_service():
+    """
+    Return a Gmail API service for the calling thread.
+
+    The service is built once per thread from the bundled discovery document
+    (no network fetch, small document to parse) on top of one persistent
+    authorized HTTP session, and reused for every later call.
+    """
+    creds = get_credentials()
+    service = getattr(_local, 'service', None)
+    if service is not None and getattr(_local, 'creds', None) is creds:
+        return service
+
+    http = google_auth_httplib2.AuthorizedHttp(creds, http=httplib2.Http(timeout=30))
+    service = build_from_document(_load_discovery_doc(), http=http)
+    _local.service = service
+    _local.creds = creds
+    return service
@@ -1,10 +1,23 @@
-import os
-import re
 import time
-import base64
-from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
-from google.auth.transport.requests import Request
+import threading
+from collections import OrderedDict
+from googleapiclient.errors import HttpError
+from gmail_client import get_credentials, get_gmail_service
+from timing import span
+from otp_extractor import MIN_CONFIDENCE, otp_from_gmail_message
+from otp_sources import recipients_of
+
+# Only what OTP extraction needs: date, headers and the body/part data
+MESSAGE_FIELDS = (
+    'id,internalDate,snippet,'
+    'payload(mimeType,headers(name,value),body/data,'
+    'parts(mimeType,body/data,parts(mimeType,body/data,parts(mimeType,body/data))))'
+)
+# Gmail recommends at most 50 requests per batch
+BATCH_SIZE = 50
+# Messages kept in the parsed-message cache and the consumed-ID record
+MAX_CACHED_MESSAGES = 500
+
 
 class GmailOTPReader:
     """
@@ -12,40 +25,30 @@ class GmailOTPReader:
     Requires OAuth2 credentials stored as environment variables.
     """
     
+    # Shared by all readers in this process (fleet workers, the shared inbox),
+    # so they are only touched under _cache_lock and capped at
+    # MAX_CACHED_MESSAGES, oldest first, for long-running daemons.
+    # Message IDs an OTP was already taken from
+    consumed_message_ids = OrderedDict()
+    # Parsed messages keyed by ID, so each message is downloaded at most once
+    parsed_messages = OrderedDict()
+    _cache_lock = threading.Lock()
+    
     def __init__(self):
         self.creds = None
         self.service = None
+        self.baseline_history_id = None
+        self.baseline_time_ms = 0
+        # IDs the history cursor has moved past that have not been fetched yet
+        self.pending_message_ids = []
+        # internalDate of the mail the last OTP was taken from
+        self.last_otp_time_ms = None
         self._setup_credentials()
     
     def _setup_credentials(self):
-        """Setup Gmail API credentials from environment variables."""
-        # Get credentials from environment
-        client_id = os.environ.get('GMAIL_CLIENT_ID')
-        client_secret = os.environ.get('GMAIL_CLIENT_SECRET')
-        refresh_token = os.environ.get('GMAIL_REFRESH_TOKEN')
-        
-        if not all([client_id, client_secret, refresh_token]):
-            raise ValueError(
-                "Missing Gmail credentials! Required: "
-                "GMAIL_CLIENT_ID, GMAIL_CLIENT_SECRET, GMAIL_REFRESH_TOKEN"
-            )
-        
-        # Create credentials object
-        self.creds = Credentials(
-            token=None,
-            refresh_token=refresh_token,
-            token_uri='https://oauth2.googleapis.com/token',
-            client_id=client_id,
-            client_secret=client_secret,
-            scopes=['https://www.googleapis.com/auth/gmail.readonly']
-        )
-        
-        # Refresh the token if needed
-        if self.creds.expired or not self.creds.valid:
-            self.creds.refresh(Request())
-        
-        # Build the Gmail service
-        self.service = build('gmail', 'v1', credentials=self.creds)
+        """Get the shared Gmail API client (cached token, bundled discovery doc)."""
+        self.service = get_gmail_service()
+        self.creds = get_credentials()
         print("[Gmail] Successfully connected to Gmail API")
     
     def get_latest_otp(self, sender_filter="naukri.com", max_wait_seconds=60):
@@ -67,11 +70,13 @@ class GmailOTPReader:
             try:
                 # Search for recent emails from Naukri
                 query = f'from:@{sender_filter} newer_than:2m'
-                results = self.service.users().messages().list(
-                    userId='me',
-                    q=query,
-                    maxResults=5
-                ).execute()
+                with span("gmail_poll", method="messages.list") as poll:
+                    results = self.service.users().messages().list(
+                        userId='me',
+                        q=query,
+                        maxResults=5
+                    ).execute()
+                    poll.end(new_messages=len(results.get('messages', [])))
                 
                 messages = results.get('messages', [])
                 
@@ -80,24 +85,17 @@ class GmailOTPReader:
                     time.sleep(5)
                     continue
                 
-                # Check each message for OTP
-                for message in messages:
-                    msg_id = message['id']
-                    msg = self.service.users().messages().get(
-                        userId='me',
-                        id=msg_id,
-                        format='full'
-                    ).execute()
-                    
-                    # Get email body
-                    body = self._get_email_body(msg)
-                    
-                    # Extract OTP using regex patterns
-                    otp = self._extract_otp(body)
+                # Check each message for OTP (fetched in one batch, parsed once)
+                msg_ids = [m['id'] for m in messages if not self._consumed(m['id'])]
+                for info in self._fetch_messages(msg_ids):
+                    # Skip mail that predates the OTP request (stale OTPs)
+                    if info['internal_date'] < self.baseline_time_ms:
+                        continue
                     
-                    if otp:
-                        print(f"[Gmail] ✓ Found OTP: {otp}")
-                        return otp
+                    if info['otp'] and self._claim(info['id']):
+                        print(f"[Gmail] ✓ Found OTP: {info['otp']}")
+                        self.last_otp_time_ms = info['internal_date']
+                        return info['otp']
                 
                 print("[Gmail] OTP not found in recent emails, waiting...")
                 time.sleep(5)
@@ -109,67 +107,183 @@ class GmailOTPReader:
         print("[Gmail] ✗ Timeout waiting for OTP")
         return None
     
-    def _get_email_body(self, message):
-        """Extract email body from message."""
-        try:
-            # Try to get the plain text body
-            if 'parts' in message['payload']:
-                parts = message['payload']['parts']
-                for part in parts:
-                    if part['mimeType'] == 'text/plain':
-                        data = part['body'].get('data')
-                        if data:
-                            return base64.urlsafe_b64decode(data).decode('utf-8')
-            
-            # If no parts, try direct body
-            if 'body' in message['payload'] and 'data' in message['payload']['body']:
-                data = message['payload']['body']['data']
-                return base64.urlsafe_b64decode(data).decode('utf-8')
-            
-            # Try snippet as fallback
-            return message.get('snippet', '')
-            
-        except Exception as e:
-            print(f"[Gmail] Error extracting body: {str(e)}")
-            return message.get('snippet', '')
+    def capture_baseline(self):
+        """
+        Record the mailbox historyId and current time just before an OTP is
+        requested. wait_for_otp() then only considers mail that arrives after it.
+        """
+        profile = self.service.users().getProfile(userId='me').execute()
+        self.baseline_history_id = profile['historyId']
+        self.baseline_time_ms = int(time.time() * 1000)
+        self.pending_message_ids = []
+        print(f"[Gmail] OTP baseline captured (historyId {self.baseline_history_id})")
     
-    def _extract_otp(self, text):
+    def wait_for_otp(self, sender_filter="naukri.com", max_wait_seconds=60,
+                     min_interval=0.5, max_interval=3.0):
         """
-        Extract OTP code from email text using various patterns.
+        Wait for an OTP mail that arrived after capture_baseline().
         
-        Common patterns:
-        - "OTP is 123456"
-        - "Your OTP: 123456"
-        - "verification code is 123456"
-        - "123456 is your OTP"
-        """
-        if not text:
-            return None
+        Polls history.list deltas from the baseline historyId, starting with a
+        short interval that backs off while nothing changes. Messages already
+        used for an OTP are never returned again.
         
-        # List of regex patterns to try
-        patterns = [
-            r'OTP\s*(?:is|:)?\s*(\d{4,6})',  # OTP is 123456
-            r'(?:verification|confirm(?:ation)?)\s*code\s*(?:is|:)?\s*(\d{4,6})',  # verification code is 123456
-            r'(\d{4,6})\s*is\s*your\s*(?:OTP|code)',  # 123456 is your OTP
-            r'code\s*(?:is|:)?\s*(\d{4,6})',  # code: 123456
-            r'(?:one[- ]time|temporary)\s*(?:password|code)\s*(?:is|:)?\s*(\d{4,6})',  # one-time password is 123456
-        ]
+        Returns:
+            str: The OTP code, or None if not found
+        """
+        if self.baseline_history_id is None:
+            self.capture_baseline()
         
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                otp = match.group(1)
-                # Security: Validate OTP is exactly 4-6 digits
-                if len(otp) >= 4 and len(otp) <= 6 and otp.isdigit():
-                    return otp
+        print(f"[Gmail] Watching mailbox for OTP email from {sender_filter}...")
+        start_time = time.time()
+        interval = min_interval
         
-        # Last resort: find any 6-digit number (be careful with this)
-        # Only return if it's actually 6 digits and not part of a longer number
-        match = re.search(r'(?<!\d)(\d{6})(?!\d)', text)
-        if match:
-            return match.group(1)
+        while time.time() - start_time < max_wait_seconds:
+            try:
+                with span("gmail_poll", method="history.list") as poll:
+                    message_ids = self._new_message_ids()
+                    poll.end(new_messages=len(message_ids))
+            except HttpError as e:
+                if e.resp.status == 404:
+                    # Baseline too old for history sync - fall back to a fresh list query
+                    print("[Gmail] History baseline expired, falling back to message list")
+                    return self.get_latest_otp(sender_filter, max_wait_seconds - (time.time() - start_time))
+                print(f"[Gmail] Error reading history: {str(e)}")
+                message_ids = []
+            except Exception as e:
+                print(f"[Gmail] Error reading history: {str(e)}")
+                message_ids = []
+            
+            try:
+                for info in self._fetch_pending(message_ids):
+                    if info['internal_date'] < self.baseline_time_ms:
+                        continue
+                    if sender_filter.lower() not in info['sender'].lower():
+                        continue
+                    if info['otp'] and self._claim(info['id']):
+                        self.last_otp_time_ms = info['internal_date']
+                        elapsed = time.time() - start_time
+                        print(f"[Gmail] ✓ Found OTP: {info['otp']} ({elapsed:.1f}s after watch started)")
+                        return info['otp']
+            except Exception as e:
+                # The messages stay pending and are fetched again on the next poll
+                print(f"[Gmail] Error fetching messages: {str(e)}")
+            
+            # New activity means the OTP mail may be right behind it - poll fast again
+            interval = min_interval if message_ids else min(interval * 1.5, max_interval)
+            time.sleep(interval)
         
+        print("[Gmail] ✗ Timeout waiting for OTP")
         return None
+    
+    def _new_message_ids(self):
+        """Return IDs of messages added since the last history sync and advance the cursor."""
+        message_ids = []
+        page_token = None
+        while True:
+            kwargs = {
+                'userId': 'me',
+                'startHistoryId': self.baseline_history_id,
+                'historyTypes': ['messageAdded'],
+            }
+            if page_token:
+                kwargs['pageToken'] = page_token
+            response = self.service.users().history().list(**kwargs).execute()
+            for record in response.get('history', []):
+                for added in record.get('messagesAdded', []):
+                    msg_id = added['message']['id']
+                    if not self._consumed(msg_id) and msg_id not in message_ids:
+                        message_ids.append(msg_id)
+            page_token = response.get('nextPageToken')
+            if not page_token:
+                # historyId of the response is the cursor for the next delta
+                self.baseline_history_id = response.get('historyId', self.baseline_history_id)
+                return message_ids
+    
+    def _fetch_pending(self, message_ids):
+        """
+        Add message_ids (from _new_message_ids()) to the pending messages and
+        fetch all of them. The history cursor has already moved past them, so
+        a message whose fetch failed stays pending for the next call instead
+        of being lost.
+        
+        Returns:
+            list: Parsed message info of the messages fetched by this call
+        """
+        self.pending_message_ids += [m for m in message_ids if m not in self.pending_message_ids]
+        infos = self._fetch_messages(self.pending_message_ids)
+        fetched = {info['id'] for info in infos}
+        self.pending_message_ids = [m for m in self.pending_message_ids if m not in fetched]
+        return infos
+    
+    def _fetch_messages(self, msg_ids):
+        """
+        Return parsed message info for msg_ids, in the same order.
+        
+        Only messages not seen before are downloaded, in Gmail batch requests
+        with a fields mask, and each is parsed once into
+        {id, internal_date, sender, recipients, otp} in the process-wide cache
+        (the most recent MAX_CACHED_MESSAGES messages).
+        """
+        with self._cache_lock:
+            missing = [m for m in msg_ids if m not in self.parsed_messages]
+        for i in range(0, len(missing), BATCH_SIZE):
+            batch = self.service.new_batch_http_request(callback=self._on_message_fetched)
+            for msg_id in missing[i:i + BATCH_SIZE]:
+                batch.add(
+                    self.service.users().messages().get(
+                        userId='me',
+                        id=msg_id,
+                        format='full',
+                        fields=MESSAGE_FIELDS
+                    ),
+                    request_id=msg_id
+                )
+            batch.execute()
+        with self._cache_lock:
+            return [self.parsed_messages[m] for m in msg_ids if m in self.parsed_messages]
+
+    @classmethod
+    def _consumed(cls, msg_id):
+        with cls._cache_lock:
+            return msg_id in cls.consumed_message_ids
+
+    @classmethod
+    def _claim(cls, msg_id):
+        """Mark msg_id as used for an OTP. False if another reader already took it."""
+        with cls._cache_lock:
+            if msg_id in cls.consumed_message_ids:
+                return False
+            cls._remember(cls.consumed_message_ids, msg_id, True)
+            return True
+
+    @staticmethod
+    def _remember(cache, key, value):
+        # Caller holds _cache_lock
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > MAX_CACHED_MESSAGES:
+            cache.popitem(last=False)
+    
+    def _on_message_fetched(self, request_id, response, exception):
+        """Batch callback: parse one message into the cache."""
+        if exception is not None:
+            print(f"[Gmail] Error fetching message {request_id} (will retry): {str(exception)}")
+            return
+        headers = response.get('payload', {}).get('headers', [])
+        otp, confidence = otp_from_gmail_message(response)
+        if otp and confidence < MIN_CONFIDENCE:
+            print(f"[Gmail] Message {request_id}: ignoring low-confidence number ({confidence:.2f})")
+            otp = None
+        info = {
+            'id': request_id,
+            'internal_date': int(response.get('internalDate', 0)),
+            'sender': next((h['value'] for h in headers if h['name'].lower() == 'from'), ''),
+            'recipients': recipients_of({h['name'].title(): h['value'] for h in headers}),
+            'otp': otp,
+            'otp_confidence': confidence,
+        }
+        with self._cache_lock:
+            self._remember(self.parsed_messages, request_id, info)
 
 
 # Convenience function for easy import
@@ -187,3 +301,19 @@ def get_otp_from_gmail(sender_filter="naukri.com", max_wait_seconds=60):
         print(f"[Gmail] Failed to get OTP: {str(e)}")
         return None
 
+
+def start_otp_watch():
+    """
+    Connect to Gmail and capture an OTP baseline. Call just before the login
+    button is clicked, then use reader.wait_for_otp().
+    
+    Returns:
+        GmailOTPReader, or None if Gmail could not be reached
+    """
+    try:
+        reader = GmailOTPReader()
+        reader.capture_baseline()
+        return reader
+    except Exception as e:
+        print(f"[Gmail] Could not start OTP watch: {str(e)}")
+        return None
@@ -0,0 +1,130 @@
+import os
+import json
+import time
+import tempfile
+import threading
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+class LocatorCache:
+    """
+    Remembers which selector worked for each logical element (e.g. the OTP
+    inputs or the verify button) across runs, so the last-known-good locator
+    is tried first next time.
+
+    Entries that have not matched for max_age_days, or that missed
+    max_misses times in a row, age out - which is what happens when Naukri
+    changes its markup. The per-run hit rate (a cached locator was tried
+    first and matched) shows when that is going on.
+    """
+
+    def __init__(self, path, max_age_days=14, max_misses=3):
+        self.path = path
+        self.max_age_seconds = max_age_days * 86400
+        self.max_misses = max_misses
+        self.entries = self._load()
+        self.lookups = 0
+        self.cached = 0
+        self.hits = 0
+        self._lock = threading.Lock()
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def order(self, element, candidates, key=None):
+        """
+        Return candidates with the cached winner(s) for element moved to the
+        front (most recent success first), the rest in their original order.
+        """
+        key = key or (lambda c: c)
+        now = time.time()
+        with self._lock:
+            known = self.entries.get(element, {})
+            for selector in list(known):
+                if now - known[selector]["last_success"] > self.max_age_seconds:
+                    del known[selector]
+            ranked = sorted(
+                (c for c in candidates if key(c) in known),
+                key=lambda c: known[key(c)]["last_success"],
+                reverse=True,
+            )
+        return ranked + [c for c in candidates if key(c) not in known]
+
+    def record(self, element, winner, first_tried):
+        """
+        Record the selector that matched (or None if nothing did).
+
+        Args:
+            element: Logical element name
+            winner: Selector that matched, or None
+            first_tried: Selector that was tried first (from order())
+        """
+        now = time.time()
+        with self._lock:
+            self.lookups += 1
+            known = self.entries.setdefault(element, {})
+            # Only a lookup the cache decided counts towards the hit rate -
+            # with nothing cached the first candidate is just the default
+            if first_tried in known:
+                self.cached += 1
+                if winner == first_tried:
+                    self.hits += 1
+            # The cached favourite missed - after enough misses it is dropped
+            if first_tried in known and winner != first_tried:
+                known[first_tried]["misses"] = known[first_tried].get("misses", 0) + 1
+                if known[first_tried]["misses"] >= self.max_misses:
+                    print(f"[Locator] Dropping stale locator for {element}: {first_tried}")
+                    del known[first_tried]
+            if winner is not None:
+                entry = known.setdefault(winner, {"hits": 0, "first_seen": now})
+                entry["hits"] += 1
+                entry["last_success"] = now
+                entry["misses"] = 0
+
+    def stats(self):
+        """
+        Hit rate of this process: of the lookups that started with a cached
+        locator ('cached'), the share where it matched. None on a cold cache.
+        """
+        with self._lock:
+            return {
+                "lookups": self.lookups,
+                "cached": self.cached,
+                "hits": self.hits,
+                "hit_rate": round(self.hits / self.cached, 3) if self.cached else None,
+            }
+
+    def save(self):
+        """Persist the entries (best effort)."""
+        with self._lock:
+            data = json.dumps(self.entries, indent=2)
+        try:
+            directory = os.path.dirname(self.path) or '.'
+            os.makedirs(directory, exist_ok=True)
+            # A temp file of its own, so concurrent savers never write into each other's
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(self.path) + ".",
+                                            suffix=".tmp")
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    f.write(data)
+                os.replace(tmp_path, self.path)
+            except OSError:
+                os.remove(tmp_path)
+                raise
+        except OSError as e:
+            print(f"[Locator] Could not save locator cache: {e}")
+
+
+def get_locator_cache():
+    """Process-wide LocatorCache configured from LOCATOR_CACHE_FILE."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = LocatorCache(os.environ.get("LOCATOR_CACHE_FILE", ".naukri_locators.json"))
+        return _cache
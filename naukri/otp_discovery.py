@@ -0,0 +1,93 @@
+import time
+from selenium.common.exceptions import WebDriverException
+
+# Common OTP field patterns, most specific first
+OTP_INPUT_SELECTORS = [
+    "input[type='text'][maxlength='1']",  # Individual digit boxes
+    "input[type='tel'][maxlength='1']",    # Tel input with maxlength 1
+    "input[placeholder*='OTP' i]",         # OTP placeholder
+    "input[id*='otp' i]",                  # OTP in ID
+    "input[name*='otp' i]",                # OTP in name
+    "input[class*='otp' i]",               # OTP in class
+]
+# Last resort when no selector matches: any visible one-character text/tel input
+GENERIC_OTP_SELECTOR = "generic:maxlength=1"
+
+# Verify/submit controls in priority order. 'text' entries match a button by
+# its (case-insensitive) text, 'css' entries by selector.
+VERIFY_CANDIDATES = [
+    {"name": "text:verify", "text": "verify"},
+    {"name": "text:submit", "text": "submit"},
+    {"name": "text:continue", "text": "continue"},
+    {"name": "css:button[type=submit]", "css": "button[type='submit']"},
+    {"name": "css:input[type=submit]", "css": "input[type='submit']"},
+]
+
+# Evaluates every candidate in one pass and returns the winners
+DISCOVER_JS = """
+var inputSelectors = arguments[0], verifyCandidates = arguments[1];
+function visible(el) { return !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length); }
+function all(selector) { return Array.prototype.slice.call(document.querySelectorAll(selector)); }
+
+var inputs = [], inputSelector = null;
+for (var i = 0; i < inputSelectors.length && !inputs.length; i++) {
+    inputs = all(inputSelectors[i]).filter(visible);
+    if (inputs.length) inputSelector = inputSelectors[i];
+}
+if (!inputs.length) {
+    inputs = all("input[type='text'], input[type='tel']").filter(function(el) {
+        return visible(el) && el.getAttribute('maxlength') === '1';
+    });
+    if (inputs.length) inputSelector = arguments[2];
+}
+
+var submit = null, submitName = null;
+var buttons = all('button').filter(function(b) { return visible(b) && !b.disabled; });
+for (var j = 0; j < verifyCandidates.length && !submit; j++) {
+    var c = verifyCandidates[j];
+    var found = c.text
+        ? buttons.filter(function(b) { return b.textContent.toLowerCase().indexOf(c.text) !== -1; })
+        : all(c.css).filter(function(b) { return visible(b) && !b.disabled; });
+    if (found.length) { submit = found[0]; submitName = c.name; }
+}
+return {inputs: inputs, input_selector: inputSelector, submit: submit, submit_selector: submitName};
+"""
+
+
+def discover_otp_controls(driver, input_selectors=None, verify_candidates=None):
+    """
+    Find the visible OTP inputs (in document order) and the best verify/submit
+    control with one script, instead of one find_elements + is_displayed per
+    selector and a separate WebDriverWait per verify XPath.
+
+    Returns:
+        dict: {'inputs': [WebElement], 'input_selector': str or None,
+               'submit': WebElement or None, 'submit_selector': str or None}
+    """
+    return driver.execute_script(
+        DISCOVER_JS,
+        input_selectors or OTP_INPUT_SELECTORS,
+        verify_candidates or VERIFY_CANDIDATES,
+        GENERIC_OTP_SELECTOR,
+    )
+
+
+def wait_for_otp_controls(driver, timeout=10, need_inputs=True, need_submit=False,
+                          poll_frequency=0.1, **kwargs):
+    """
+    Poll discover_otp_controls() until the required controls (OTP inputs
+    and/or a submit control) are present, or the timeout expires.
+
+    Always returns the last discovery result; timeout=0 means a single pass.
+    """
+    deadline = time.time() + timeout
+    while True:
+        try:
+            controls = discover_otp_controls(driver, **kwargs)
+        except WebDriverException:
+            controls = {'inputs': [], 'input_selector': None, 'submit': None, 'submit_selector': None}
+        if (controls['inputs'] or not need_inputs) and (controls['submit'] or not need_submit):
+            return controls
+        if time.time() >= deadline:
+            return controls
+        time.sleep(poll_frequency)
@@ -0,0 +1,151 @@
+import re
+import html
+import base64
+
+# (rule, confidence), strongest first. Each rule is one alternative of
+# OTP_PATTERN and names the group that captures the code.
+RULES = (
+    # "OTP is 123456", "Your OTP: 123456"
+    ("otp_is", 0.95, r"\bOTP\s*(?:is|:|-)\s*(?P<otp_is>\d{4,6})(?!\d)"),
+    # "123456 is your OTP"
+    ("is_your", 0.95, r"(?<!\d)(?P<is_your>\d{4,6})\s*is\s*your\s*"
+                      r"(?:OTP|(?:verification\s*|login\s*)?code|one[- ]time\s*password)"),
+    # "verification code is 123456", "one-time password: 123456"
+    ("code_is", 0.9, r"(?:verification|confirmation|login|one[- ]time|temporary)\s*"
+                     r"(?:code|password|pin)\s*(?:is|:)?\s*(?P<code_is>\d{4,6})(?!\d)"),
+    # Naukri's layout: "Please enter below OTP ... valid for the next 30 minutes. 711070"
+    ("otp_near", 0.8, r"\bOTP\b(?:(?!\d{4}).){0,200}?(?<!\d)(?P<otp_near>\d{6})(?!\d)"),
+    # "code: 123456"
+    ("code", 0.7, r"\bcode\s*(?:is|:)\s*(?P<code>\d{4,6})(?!\d)"),
+    # Last resort: any standalone 6-digit number
+    ("bare", 0.3, r"(?<!\d)(?P<bare>\d{6})(?!\d)"),
+)
+CONFIDENCE = {name: confidence for name, confidence, _ in RULES}
+OTP_PATTERN = re.compile("|".join(pattern for _, _, pattern in RULES), re.IGNORECASE | re.DOTALL)
+
+# A match at least this good ends the search; weaker ones keep looking in other parts
+CONFIDENT = 0.8
+# Below this a candidate is only a bare number (a salary, a job ID) and is not used
+MIN_CONFIDENCE = 0.5
+# Bigger text parts are newsletters, not OTP mails
+MAX_PART_BYTES = 256 * 1024
+# Gmail cuts snippets at about 200 characters, possibly mid-code
+SNIPPET_CUT_LENGTH = 150
+
+NO_MATCH = (None, 0.0)
+
+_HIDDEN_HTML = re.compile(r"<(style|script|head)\b.*?</\1\s*>", re.IGNORECASE | re.DOTALL)
+_TAG = re.compile(r"<[^>]*>")
+_SPACE = re.compile(r"\s+")
+
+
+def html_to_text(markup):
+    """Cheap HTML to text: drop style/script/head, replace tags by spaces, unescape."""
+    text = _TAG.sub(" ", _HIDDEN_HTML.sub(" ", markup))
+    return _SPACE.sub(" ", html.unescape(text))
+
+
+def extract_otp(text):
+    """
+    Find the OTP in text with a single scan of the combined pattern.
+
+    Returns:
+        tuple: (otp, confidence) - the best-scoring match, (None, 0.0) if none
+    """
+    best = NO_MATCH
+    if not text:
+        return best
+    for match in OTP_PATTERN.finditer(text):
+        confidence = CONFIDENCE[match.lastgroup]
+        if confidence > best[1]:
+            best = (match.group(match.lastgroup), confidence)
+            if confidence >= CONFIDENCE["otp_is"]:
+                break
+    return best
+
+
+def _scan_parts(parts):
+    """
+    Extract from (mime_type, decode) leaf parts in document order.
+
+    text/plain parts are tried as they come; text/html parts are only decoded
+    (and stripped) if no plain part gave a confident match.
+    """
+    best = NO_MATCH
+    html_parts = []
+    for mime_type, decode in parts:
+        if mime_type == "text/plain":
+            found = extract_otp(decode())
+            if found[1] > best[1]:
+                best = found
+            if best[1] >= CONFIDENT:
+                return best
+        elif mime_type == "text/html":
+            html_parts.append(decode)
+    for decode in html_parts:
+        found = extract_otp(html_to_text(decode()))
+        if found[1] > best[1]:
+            best = found
+        if best[1] >= CONFIDENT:
+            return best
+    return best
+
+
+def _gmail_parts(payload):
+    """Yield (mime_type, decode) for the inline text leaves of a Gmail API payload."""
+    stack = [payload]
+    while stack:
+        part = stack.pop()
+        mime_type = part.get("mimeType", "").lower()
+        if mime_type.startswith("multipart/"):
+            stack.extend(reversed(part.get("parts", [])))
+            continue
+        data = part.get("body", {}).get("data")
+        if not data or not mime_type.startswith("text/") or len(data) > MAX_PART_BYTES * 4 // 3:
+            continue
+        yield mime_type, lambda data=data: base64.urlsafe_b64decode(data).decode("utf-8", "replace")
+
+
+def _email_parts(message):
+    """Yield (mime_type, decode) for the inline text leaves of an email.message.Message."""
+    for part in message.walk():
+        if part.is_multipart() or part.get_content_maintype() != "text":
+            continue
+        if part.get_filename() or part.get("Content-Disposition", "").lower().startswith("attachment"):
+            continue
+
+        def decode(part=part):
+            payload = part.get_payload(decode=True) or b""
+            return payload[:MAX_PART_BYTES].decode(part.get_content_charset() or "utf-8", "replace")
+        yield part.get_content_type(), decode
+
+
+def otp_from_gmail_message(message):
+    """
+    Extract the OTP from a Gmail API message (format=full).
+
+    The snippet is tried first - it is already plain text and usually holds
+    the code - and the MIME tree is only decoded if it was not conclusive.
+
+    Returns:
+        tuple: (otp, confidence)
+    """
+    snippet = html.unescape(message.get("snippet", ""))
+    if len(snippet) >= SNIPPET_CUT_LENGTH:
+        # The last word may be a cut-off code - leave it to the full body
+        snippet = snippet.rsplit(None, 1)[0]
+    best = extract_otp(snippet)
+    if best[1] >= CONFIDENT:
+        return best
+    found = _scan_parts(_gmail_parts(message.get("payload", {})))
+    return found if found[1] > best[1] else best
+
+
+def otp_from_email_message(message):
+    """
+    Extract the OTP from an email.message.Message (IMAP, Maildir, .eml files).
+
+    Returns:
+        tuple: (otp, confidence)
+    """
+    return _scan_parts(_email_parts(message))
@@ -0,0 +1,344 @@
+import os
+import time
+import asyncio
+import random
+import threading
+from collections import OrderedDict
+from concurrent.futures import CancelledError, Future, TimeoutError as FutureTimeout
+from otp_sources import OTPSource, open_otp_source, source_name_for
+
+# Mail stamped up to this long before a login's request still counts for it
+# (IMAP INTERNALDATE has one-second resolution, clocks drift)
+CLOCK_SKEW_SECONDS = 2.0
+# Message IDs the watcher remembers as already read, oldest dropped first
+MAX_CACHED_MESSAGES = 500
+
+
+class QuotaBudget:
+    """
+    Client-side token bucket over API quota units: polls and fetches spend
+    units, which refill at units_per_second up to burst. Spending more than
+    is left puts the bucket in debt; delay() says how long to wait it off.
+    """
+
+    def __init__(self, units_per_second, burst):
+        self.rate = float(units_per_second)
+        self.burst = float(burst)
+        self.units = float(burst)
+        self.spent = 0
+        self._updated = time.time()
+
+    @classmethod
+    def from_env(cls):
+        rate = float(os.environ.get("OTP_INBOX_QUOTA_UNITS_PER_SECOND", "25"))
+        return cls(rate, float(os.environ.get("OTP_INBOX_QUOTA_BURST", str(rate * 4))))
+
+    def _refill(self):
+        now = time.time()
+        self.units = min(self.burst, self.units + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def spend(self, units):
+        self._refill()
+        self.units -= units
+        self.spent += units
+
+    def delay(self, units=0):
+        """Seconds until units more can be spent without going into debt."""
+        self._refill()
+        missing = units - self.units
+        return missing / self.rate if missing > 0 and self.rate > 0 else 0.0
+
+
+class _Waiter:
+    def __init__(self, address, requested_at):
+        self.address = address
+        self.requested_at = requested_at
+        self.future = Future()
+
+
+class InboxTicket(OTPSource):
+    """
+    One login's share of a SharedInbox. Behaves like any OTPSource: the
+    baseline registers the login's address and request time with the inbox,
+    and wait_for_otp() waits on the future the inbox resolves.
+    """
+
+    def __init__(self, inbox, account):
+        super().__init__()
+        self.inbox = inbox
+        self.account = account
+        self.name = inbox.source.name
+        self.tag = inbox.source.tag
+        self.waiter = None
+
+    def capture_baseline(self):
+        self.close()
+        self.waiter = self.inbox.register(self.account)
+        self.baseline_time = self.waiter.requested_at
+
+    def poll_mail(self, timeout):
+        """
+        The OTP mail the inbox routed to this login, once it has arrived
+        (the same one on every later call), waiting at most timeout seconds.
+        """
+        try:
+            otp, mail_time = self.waiter.future.result(timeout=max(0.0, timeout))
+        except (FutureTimeout, CancelledError):
+            return []
+        return [{"id": None, "time": mail_time, "sender": self.inbox.sender_filter,
+                 "recipients": [self.waiter.address], "otp": otp, "confidence": None}]
+
+    def _wait(self, sender_filter, deadline):
+        print(f"[{self.tag}] Waiting for OTP email to {self.waiter.address} (shared inbox)...")
+        try:
+            otp, mail_time = self.waiter.future.result(timeout=max(0.0, deadline - time.time()))
+        except FutureTimeout:
+            print(f"[{self.tag}] ✗ Timeout waiting for OTP")
+            return None
+        except CancelledError:
+            # The inbox dropped the request (stopped, or it went stale)
+            print(f"[{self.tag}] ✗ Shared inbox stopped waiting for this OTP")
+            return None
+        finally:
+            self.inbox.unregister(self.waiter)
+        self.last_mail_time = mail_time
+        print(f"[{self.tag}] ✓ Found OTP: {otp}")
+        return otp
+
+    async def wait_for_otp_async(self, sender_filter="naukri.com", max_wait_seconds=60):
+        """Await the inbox's routing on the event loop - no thread per waiting login."""
+        if self.waiter is None:
+            self.capture_baseline()
+        self.last_mail_time = None
+        waiter = self.waiter
+        print(f"[{self.tag}] Waiting for OTP email to {waiter.address} (shared inbox)...")
+        try:
+            otp, mail_time = await asyncio.wait_for(asyncio.wrap_future(waiter.future), max_wait_seconds)
+        except asyncio.TimeoutError:
+            print(f"[{self.tag}] ✗ Timeout waiting for OTP")
+            return None
+        except asyncio.CancelledError:
+            # The inbox dropped the request (stopped, or it went stale)
+            if not waiter.future.cancelled():
+                raise
+            print(f"[{self.tag}] ✗ Shared inbox stopped waiting for this OTP")
+            return None
+        finally:
+            self.inbox.unregister(waiter)
+        self.last_mail_time = mail_time
+        print(f"[{self.tag}] ✓ Found OTP: {otp}")
+        self._report()
+        return otp
+
+    def close(self):
+        if self.waiter is not None:
+            self.inbox.unregister(self.waiter)
+            self.waiter = None
+
+
+class SharedInbox:
+    """
+    One watcher per mailbox for many concurrent logins whose OTP mails land
+    in the same inbox (aliases, plus-addressing, forwarding).
+
+    A single thread reads new mail from the underlying OTPSource once and
+    hands each OTP to the login it belongs to: the pending request for the
+    mail's recipient address made most recently before the mail arrived.
+    Mail for nobody waiting is dropped, so one account can never pick up
+    another's OTP. Polling only runs while someone is waiting, is paced by
+    a client-side quota budget (Gmail API) and backs off on errors, so API
+    calls grow with mail arrivals, not with logins x poll iterations.
+
+        inbox = SharedInbox(open_otp_source(name="gmail_api")).start()
+        ticket = inbox.ticket("me+naukri1@gmail.com")   # an OTPSource
+        ticket.capture_baseline()                        # just before the login click
+        otp = ticket.wait_for_otp(max_wait_seconds=90)
+    """
+
+    def __init__(self, source, sender_filter="naukri.com", budget=None,
+                 min_interval=0.5, max_interval=3.0, max_backoff=60.0, idle_chunk=5.0,
+                 max_wait=300.0):
+        """
+        Args:
+            source: Connected OTPSource for the mailbox (not yet baselined)
+            sender_filter: Only mail whose From contains this is routed
+            budget: QuotaBudget for the source's poll/mail costs (default: from env)
+            min_interval, max_interval: Poll pacing for non-push sources; the
+                interval grows while nothing arrives and resets on new mail
+            max_backoff: Upper bound of the error backoff in seconds
+            idle_chunk: Longest single blocking poll (IMAP IDLE), so the
+                watcher notices when everyone stopped waiting
+            max_wait: Requests older than this are dropped, in case a login
+                died without closing its ticket
+        """
+        self.source = source
+        self.sender_filter = sender_filter.lower()
+        self.budget = budget or QuotaBudget.from_env()
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.max_backoff = max_backoff
+        self.idle_chunk = idle_chunk
+        self.max_wait = max_wait
+        self.waiters = []
+        self.registrations = 0
+        self.seen = OrderedDict()
+        self.counters = {"polls": 0, "mails": 0, "routed": 0, "unrouted": 0, "errors": 0}
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._baselining = False
+        self._thread = None
+
+    @classmethod
+    def open(cls, name=None, **kwargs):
+        """Open the configured OTP source and wrap it, or None if it cannot be opened."""
+        source = open_otp_source(name=name or source_name_for(None))
+        return cls(source, **kwargs) if source else None
+
+    def start(self):
+        self.source.capture_baseline()
+        self._thread = threading.Thread(target=self._run, name=f"otp-inbox-{self.source.name}", daemon=True)
+        self._thread.start()
+        print(f"[Inbox] Shared {self.source.name} inbox watcher started")
+        return self
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+            for waiter in self.waiters:
+                waiter.future.cancel()
+            self.waiters = []
+        if self._thread is not None:
+            self._thread.join(timeout=self.idle_chunk + 5)
+        self.source.close()
+
+    def ticket(self, account):
+        return InboxTicket(self, account)
+
+    def register(self, address):
+        with self._cond:
+            # An idle re-baseline in flight could be taken after this login's
+            # OTP mail arrived and skip it - let it finish before the login
+            # goes ahead (the caller clicks login once this returns)
+            while self._baselining and not self._stopped:
+                self._cond.wait()
+            waiter = _Waiter(address.strip().lower(), time.time())
+            self.waiters.append(waiter)
+            self.registrations += 1
+            self._cond.notify_all()
+        return waiter
+
+    def unregister(self, waiter):
+        with self._cond:
+            if waiter in self.waiters:
+                self.waiters.remove(waiter)
+        waiter.future.cancel()
+
+    def stats(self):
+        with self._cond:
+            return dict(self.counters, waiting=len(self.waiters), quota_units=self.budget.spent)
+
+    # -- watcher ------------------------------------------------------------
+
+    def _route(self, mail):
+        """Resolve the waiter an OTP mail belongs to. Returns True if one was found."""
+        arrived = mail["time"] or time.time()
+        with self._cond:
+            candidates = [w for w in self.waiters
+                          if w.address in mail["recipients"]
+                          and w.requested_at - CLOCK_SKEW_SECONDS <= arrived
+                          and not w.future.done()]
+            if not candidates:
+                return False
+            # A retried login re-registers: the newest request owns the new mail
+            waiter = max(candidates, key=lambda w: w.requested_at)
+            self.waiters.remove(waiter)
+        waiter.future.set_result((mail["otp"], mail["time"]))
+        return True
+
+    def _run(self):
+        interval = self.min_interval
+        failures = 0
+        registrations = 0
+        while True:
+            with self._cond:
+                stale = [w for w in self.waiters if time.time() - w.requested_at > self.max_wait]
+                for waiter in stale:
+                    self.waiters.remove(waiter)
+                    waiter.future.cancel()
+                if self.registrations != registrations:
+                    # A login is about to trigger an OTP - poll fast again
+                    registrations = self.registrations
+                    interval = self.min_interval
+                if self._stopped:
+                    return
+                idle = not self.waiters
+                self._baselining = idle
+
+            if idle:
+                # Nobody waiting: re-baseline, so mail that arrives while idle
+                # is not fetched, then sleep until a login registers. The
+                # baseline is a mailbox round trip, so it runs outside the lock;
+                # only a register() that comes in meanwhile waits for it
+                try:
+                    self.source.capture_baseline()
+                except Exception as e:
+                    print(f"[Inbox] Could not re-baseline: {e}")
+                with self._cond:
+                    self._baselining = False
+                    self._cond.notify_all()
+                    while not self.waiters and not self._stopped:
+                        self._cond.wait()
+                    if self._stopped:
+                        return
+                    registrations = self.registrations
+                    interval = self.min_interval
+
+            wait = self.budget.delay(self.source.poll_cost)
+            if wait:
+                time.sleep(wait)
+            try:
+                mails = self.source.poll_mail(self.idle_chunk)
+            except Exception as e:
+                failures += 1
+                backoff = min(self.max_backoff, self.min_interval * 2 ** failures) * random.uniform(0.8, 1.2)
+                with self._cond:
+                    self.counters["errors"] += 1
+                print(f"[Inbox] Poll failed ({e}) - retrying in {backoff:.1f}s")
+                self._sleep(backoff)
+                continue
+            failures = 0
+            self.budget.spend(self.source.poll_cost + self.source.mail_cost * len(mails))
+
+            routed = 0
+            for mail in mails:
+                if mail["id"] in self.seen:
+                    continue
+                self.seen[mail["id"]] = True
+                if len(self.seen) > MAX_CACHED_MESSAGES:
+                    self.seen.popitem(last=False)
+                if not mail["otp"] or self.sender_filter not in mail["sender"].lower():
+                    continue
+                if self._route(mail):
+                    routed += 1
+                else:
+                    print(f"[Inbox] OTP mail for {', '.join(mail['recipients']) or 'no recipient'} "
+                          f"matches no waiting login - ignored")
+                    with self._cond:
+                        self.counters["unrouted"] += 1
+            with self._cond:
+                self.counters["polls"] += 1
+                self.counters["mails"] += len(mails)
+                self.counters["routed"] += routed
+
+            if self.source.push:
+                continue
+            interval = self.min_interval if mails else min(interval * 1.5, self.max_interval)
+            self._sleep(interval)
+
+    def _sleep(self, seconds):
+        """Sleep, waking early when a new login registers or the inbox stops."""
+        with self._cond:
+            registrations = self.registrations
+            self._cond.wait_for(lambda: self._stopped or self.registrations != registrations, timeout=seconds)
@@ -0,0 +1,606 @@
+import os
+import json
+import time
+import asyncio
+import email
+import socket
+import hashlib
+import imaplib
+import threading
+from abc import ABC, abstractmethod
+from email.policy import default as default_policy
+from email.utils import getaddresses, parsedate_to_datetime
+from otp_extractor import MIN_CONFIDENCE, otp_from_email_message
+
+
+class OTPSource(ABC):
+    """
+    Where update.py gets OTPs from. A source is connected once, baselined
+    just before the login button is clicked, and then asked for the first
+    OTP mail that arrives after the baseline:
+
+        source.connect()
+        source.capture_baseline()
+        otp = source.wait_for_otp(sender_filter="naukri.com", max_wait_seconds=90)
+
+    wait_for_otp() records the time-to-OTP of every successful wait, so
+    OTP_SOURCE=auto can pick the fastest source per account.
+
+    poll_mail() is the lower-level interface otp_inbox.SharedInbox builds on:
+    it returns every new mail once, whoever it is addressed to.
+
+    capture_baseline() and poll_mail() are abstract, so a backend missing
+    one fails when it is constructed, not half way through a login.
+    """
+
+    name = None
+    tag = "OTP"
+    # True if poll_mail() blocks until the server reports new mail (no pacing needed)
+    push = False
+    # Client-side quota units a poll_mail() call and each mail it returns cost
+    poll_cost = 0
+    mail_cost = 0
+
+    def __init__(self):
+        self.account = None
+        self.baseline_time = None
+        # Arrival time (epoch seconds) of the mail the last OTP came from, if known
+        self.last_mail_time = None
+
+    def connect(self):
+        pass
+
+    @abstractmethod
+    def capture_baseline(self):
+        """Mark now as the point after which mail counts (just before the login click)."""
+
+    @abstractmethod
+    def poll_mail(self, timeout):
+        """
+        Return the mail that arrived since the last call (or the baseline),
+        waiting at most timeout seconds for some to arrive.
+
+        Returns:
+            list of dict: {id, time, sender, recipients, otp, confidence} - otp is
+            None below MIN_CONFIDENCE, time the arrival in epoch seconds
+        """
+
+    def _wait(self, sender_filter, deadline):
+        """Return the first OTP from sender_filter that arrives after the baseline, or None."""
+        print(f"[{self.tag}] Waiting for OTP email from {sender_filter}...")
+        while time.time() < deadline:
+            for mail in self.poll_mail(deadline - time.time()):
+                if mail["otp"] and sender_filter.lower() in mail["sender"].lower():
+                    self.last_mail_time = mail["time"]
+                    print(f"[{self.tag}] ✓ Found OTP: {mail['otp']}")
+                    return mail["otp"]
+        print(f"[{self.tag}] ✗ Timeout waiting for OTP")
+        return None
+
+    def close(self):
+        pass
+
+    def wait_for_otp(self, sender_filter="naukri.com", max_wait_seconds=60):
+        if self.baseline_time is None:
+            self.capture_baseline()
+        self.last_mail_time = None
+        otp = self._wait(sender_filter, time.time() + max_wait_seconds)
+        if otp:
+            self._report()
+        return otp
+
+    async def wait_for_otp_async(self, sender_filter="naukri.com", max_wait_seconds=60):
+        """wait_for_otp() for asyncio callers; blocking sources wait on a worker thread."""
+        return await asyncio.to_thread(self.wait_for_otp, sender_filter, max_wait_seconds)
+
+    def _report(self):
+        """Log the time-to-OTP of a successful wait and record it for OTP_SOURCE=auto."""
+        found_at = time.time()
+        detect = found_at - self.last_mail_time if self.last_mail_time else None
+        print(f"[OTP] {self.name}: OTP {found_at - self.baseline_time:.1f}s after the baseline"
+              + (f", {detect:.2f}s after the mail arrived" if detect is not None else ""))
+        if self.account:
+            OTPSourceStats.from_env().record(self.account, self.name, found_at - self.baseline_time, detect)
+
+
+def mail_info(mail_id, message, arrived):
+    """The poll_mail() dict for an email.message.Message."""
+    otp, confidence = otp_from_email_message(message)
+    return {
+        "id": mail_id,
+        "time": arrived,
+        "sender": str(message.get("From", "")),
+        "recipients": recipients_of(message),
+        "otp": otp if confidence >= MIN_CONFIDENCE else None,
+        "confidence": confidence,
+    }
+
+
+def recipients_of(message):
+    """
+    Lower-cased addresses a message was delivered to: To and Cc, plus the
+    Delivered-To / X-Original-To headers forwarding and aliases leave behind.
+    Works for email.message.Message and for a {name: value} header dict.
+    """
+    values = []
+    for header in ("To", "Cc", "Delivered-To", "X-Original-To"):
+        if hasattr(message, "get_all"):
+            values.extend(str(v) for v in message.get_all(header, []))
+        elif message.get(header):
+            values.append(message[header])
+    return sorted({address.strip().lower() for _, address in getaddresses(values) if "@" in address})
+
+
+class GmailAPISource(OTPSource):
+    """Gmail API history polling (GmailOTPReader)."""
+
+    name = "gmail_api"
+    tag = "Gmail"
+    # Gmail API quota units: history.list 2, messages.get 5
+    poll_cost = 2
+    mail_cost = 5
+
+    @classmethod
+    def from_env(cls):
+        if not os.environ.get("GMAIL_REFRESH_TOKEN"):
+            raise ValueError("GMAIL_CLIENT_ID, GMAIL_CLIENT_SECRET and GMAIL_REFRESH_TOKEN are not set")
+        return cls()
+
+    def connect(self):
+        # Imported here so the other sources work without the Google client libraries
+        from gmail_otp_reader import GmailOTPReader
+        self.reader = GmailOTPReader()
+
+    def capture_baseline(self):
+        self.reader.capture_baseline()
+        self.baseline_time = time.time()
+
+    def _wait(self, sender_filter, deadline):
+        otp = self.reader.wait_for_otp(sender_filter=sender_filter,
+                                       max_wait_seconds=max(0.0, deadline - time.time()))
+        if otp and self.reader.last_otp_time_ms:
+            self.last_mail_time = self.reader.last_otp_time_ms / 1000.0
+        return otp
+
+    def poll_mail(self, timeout):
+        from googleapiclient.errors import HttpError
+
+        # One history sync, no waiting - the caller paces the polls
+        try:
+            message_ids = self.reader._new_message_ids()
+        except HttpError as e:
+            if e.resp.status != 404:
+                raise
+            print("[Gmail] History baseline expired - capturing a new one")
+            self.reader.capture_baseline()
+            return []
+        return [{
+            "id": info["id"],
+            "time": info["internal_date"] / 1000.0,
+            "sender": info["sender"],
+            "recipients": info["recipients"],
+            "otp": info["otp"],
+            "confidence": info["otp_confidence"],
+        } for info in self.reader._fetch_pending(message_ids)]
+
+
+class IMAPIdleSource(OTPSource):
+    """
+    IMAP with IDLE: the server pushes new-mail notifications, so the OTP is
+    picked up as soon as it lands instead of on the next poll. The mailbox is
+    opened read-only and messages are fetched with BODY.PEEK (nothing is
+    marked as read).
+
+    Configuration (environment variables):
+        IMAP_HOST, IMAP_USER, IMAP_PASSWORD  Server and login (Gmail: an app password)
+        IMAP_PORT                            Default 993, or 143 without SSL
+        IMAP_SSL                             Default true
+        IMAP_MAILBOX                         Default INBOX
+    """
+
+    name = "imap"
+    tag = "IMAP"
+    push = True
+    # How long the server gets to answer a command (or DONE) before the connection counts as dead
+    ANSWER_GRACE_SECONDS = 10
+
+    def __init__(self, host, user, password, port=None, use_ssl=True, mailbox="INBOX"):
+        super().__init__()
+        self.host = host
+        self.user = user
+        self.password = password
+        self.use_ssl = use_ssl
+        self.port = port or (993 if use_ssl else 143)
+        self.mailbox = mailbox
+        self.imap = None
+        self.baseline_uid = 0
+        self._tags = 0
+
+    @classmethod
+    def from_env(cls):
+        host = os.environ.get("IMAP_HOST")
+        if not host:
+            raise ValueError("IMAP_HOST is not set")
+        port = os.environ.get("IMAP_PORT")
+        return cls(
+            host,
+            os.environ.get("IMAP_USER", ""),
+            os.environ.get("IMAP_PASSWORD", ""),
+            port=int(port) if port else None,
+            use_ssl=os.environ.get("IMAP_SSL", "true").lower() != "false",
+            mailbox=os.environ.get("IMAP_MAILBOX", "INBOX"),
+        )
+
+    def connect(self, timeout=None):
+        imap_class = imaplib.IMAP4_SSL if self.use_ssl else imaplib.IMAP4
+        self.imap = imap_class(self.host, self.port, timeout=timeout)
+        # IDLE/DONE are tiny writes - don't let Nagle hold them back
+        self.imap.socket().setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.imap.login(self.user, self.password)
+        # poll_mail() bounds its own reads; a connect timeout must not outlive the connect
+        self.imap.socket().settimeout(None)
+        if "IDLE" not in self.imap.capabilities:
+            print("[IMAP] Server does not advertise IDLE - will poll instead")
+        print(f"[IMAP] Connected to {self.host}")
+
+    def _select(self):
+        typ, _ = self.imap.select(self.mailbox, readonly=True)
+        if typ != "OK":
+            raise RuntimeError(f"Could not open mailbox {self.mailbox}")
+
+    def capture_baseline(self):
+        # A fresh SELECT reports UIDNEXT - everything at or above it is new
+        self._select()
+        _, data = self.imap.response("UIDNEXT")
+        if data and data[0]:
+            self.baseline_uid = int(data[0]) - 1
+        else:
+            # No UIDNEXT in the SELECT response - "*" is the newest message
+            _, data = self.imap.uid("SEARCH", None, "UID *")
+            uids = data[0].split() if data and data[0] else []
+            self.baseline_uid = int(uids[-1]) if uids else 0
+        self.baseline_time = time.time()
+        print(f"[IMAP] OTP baseline captured (UID {self.baseline_uid})")
+
+    def close(self):
+        if self.imap is not None:
+            try:
+                self.imap.logout()
+            except Exception:
+                pass
+            self.imap = None
+
+    def _new_uids(self):
+        typ, data = self.imap.uid("SEARCH", None, f"UID {self.baseline_uid + 1}:*")
+        if typ != "OK" or not data or not data[0]:
+            return []
+        # n:* always matches the newest message, even when its UID is below n
+        return [uid for uid in (int(u) for u in data[0].split()) if uid > self.baseline_uid]
+
+    def _fetch(self, uid):
+        typ, data = self.imap.uid("FETCH", str(uid), "(INTERNALDATE BODY.PEEK[])")
+        for item in data or []:
+            if isinstance(item, tuple):
+                arrived = imaplib.Internaldate2tuple(item[0])
+                return (email.message_from_bytes(item[1], policy=default_policy),
+                        time.mktime(arrived) if arrived else None)
+        return None, None
+
+    def _next_tag(self):
+        # A tag space of our own for the raw IDLE exchange (imaplib's tags are upper case)
+        self._tags += 1
+        return b"idle%d" % self._tags
+
+    def _readline(self):
+        line = self.imap.readline()
+        if not line:
+            raise imaplib.IMAP4.abort("connection closed by the server")
+        return line
+
+    def _idle(self, timeout):
+        """Block in IDLE until the server reports new mail or timeout passes."""
+        tag = self._next_tag()
+        self.imap.send(tag + b" IDLE\r\n")
+        line = self._readline()
+        if not line.startswith(b"+"):
+            # No IDLE support - a short sleep makes this a plain poll
+            if not line.startswith(tag):
+                self._read_until(tag)
+            time.sleep(min(max(timeout, 0.0), 1.0))
+            return
+
+        # IDLE ends when we send DONE: on new mail, or from a timer at the
+        # deadline. The lock makes sure DONE goes out once.
+        lock = threading.Lock()
+        done_sent = []
+
+        def send_done():
+            with lock:
+                if not done_sent:
+                    done_sent.append(True)
+                    self.imap.send(b"DONE\r\n")
+
+        timer = threading.Timer(max(timeout, 0.0), send_done)
+        timer.daemon = True
+        timer.start()
+        try:
+            while True:
+                line = self._readline()
+                if line.startswith(tag):
+                    return
+                if b"EXISTS" in line.upper():
+                    send_done()
+        finally:
+            timer.cancel()
+
+    def _read_until(self, tag):
+        while not self._readline().startswith(tag):
+            pass
+
+    def _poll(self, timeout):
+        uids = self._new_uids()
+        if not uids:
+            self._idle(timeout)
+            uids = self._new_uids()
+        mails = []
+        for uid in uids:
+            self.baseline_uid = max(self.baseline_uid, uid)
+            message, arrived = self._fetch(uid)
+            if message is not None:
+                mails.append(mail_info(str(uid), message, arrived))
+        return mails
+
+    def _reconnect(self, timeout):
+        """Open a new connection on the same mailbox, keeping the baseline UID."""
+        if self.imap is not None:
+            # No LOGOUT - the old connection may not answer any more
+            try:
+                self.imap.shutdown()
+            except Exception:
+                pass
+            self.imap = None
+        self.connect(timeout=timeout)
+        self._select()
+
+    def poll_mail(self, timeout):
+        timeout = max(timeout, 0.0)
+        # Every read of this poll is bounded: past the deadline (plus time for
+        # the server to answer DONE) a silent connection counts as dead. A
+        # timed-out socket cannot be read again, so that means reconnecting.
+        self.imap.socket().settimeout(timeout + self.ANSWER_GRACE_SECONDS)
+        try:
+            mails = self._poll(timeout)
+        except (imaplib.IMAP4.abort, OSError) as e:
+            print(f"[IMAP] Connection lost ({e}) - reconnecting")
+            # If this fails too the wait gives up with the error
+            self._reconnect(self.ANSWER_GRACE_SECONDS)
+            return []
+        self.imap.socket().settimeout(None)
+        return mails
+
+
+class MaildirSource(OTPSource):
+    """
+    A local Maildir (new/ and cur/) or a plain directory of .eml files, for
+    self-hosted mail delivered by fetchmail/procmail and for tests. Files
+    must appear atomically (Maildir delivers via tmp/ and a rename).
+
+    Configuration (environment variables):
+        MAILDIR_PATH   The Maildir or directory to watch
+    """
+
+    name = "maildir"
+    tag = "Maildir"
+
+    def __init__(self, path, poll_interval=0.05):
+        super().__init__()
+        self.path = path
+        self.poll_interval = poll_interval
+        self.seen = set()
+
+    @classmethod
+    def from_env(cls):
+        path = os.environ.get("MAILDIR_PATH")
+        if not path:
+            raise ValueError("MAILDIR_PATH is not set")
+        return cls(os.path.expanduser(path))
+
+    def connect(self):
+        if not os.path.isdir(self.path):
+            raise ValueError(f"{self.path} is not a directory")
+
+    @staticmethod
+    def _key(path):
+        # Maildir moves read messages from new/ to cur/ and appends flags
+        # after ":" - the unique part of the name stays the same
+        return os.path.basename(path).split(":", 1)[0]
+
+    def _files(self):
+        folders = [os.path.join(self.path, sub) for sub in ("new", "cur")]
+        folders = [f for f in folders if os.path.isdir(f)] or [self.path]
+        for folder in folders:
+            for entry in os.scandir(folder):
+                if entry.is_file() and not entry.name.startswith("."):
+                    yield entry.path
+
+    def capture_baseline(self):
+        self.seen = {self._key(p) for p in self._files()}
+        self.baseline_time = time.time()
+
+    def poll_mail(self, timeout):
+        mails = []
+        new_files = [p for p in self._files() if self._key(p) not in self.seen]
+        for path in sorted(new_files, key=os.path.getmtime):
+            key = self._key(path)
+            self.seen.add(key)
+            try:
+                with open(path, "rb") as f:
+                    message = email.message_from_binary_file(f, policy=default_policy)
+                arrived = os.path.getmtime(path)
+            except FileNotFoundError:
+                # Moved to cur/ meanwhile - picked up under its new name
+                self.seen.discard(key)
+                continue
+            try:
+                # A file copied in late can be old mail - trust its Date header
+                if parsedate_to_datetime(message["Date"]).timestamp() < self.baseline_time - 60:
+                    continue
+            except (TypeError, ValueError):
+                pass
+            mails.append(mail_info(key, message, arrived))
+        if not mails:
+            time.sleep(min(self.poll_interval, max(timeout, 0.0)))
+        return mails
+
+
+SOURCES = {
+    GmailAPISource.name: GmailAPISource,
+    IMAPIdleSource.name: IMAPIdleSource,
+    MaildirSource.name: MaildirSource,
+}
+
+
+class OTPSourceStats:
+    """
+    Recent time-to-OTP samples per account and source, used by OTP_SOURCE=auto.
+
+    Configuration (environment variables):
+        OTP_SOURCE_STATS   Stats file (default .naukri_otp/sources.json)
+    """
+
+    KEEP = 20
+    _lock = threading.Lock()
+
+    def __init__(self, path):
+        self.path = path
+
+    @classmethod
+    def from_env(cls):
+        return cls(os.environ.get("OTP_SOURCE_STATS", os.path.join(".naukri_otp", "sources.json")))
+
+    @staticmethod
+    def _account_id(account):
+        return hashlib.sha256(account.lower().encode("utf-8")).hexdigest()[:16]
+
+    def load(self):
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def record(self, account, source, time_to_otp, detect_seconds=None):
+        with self._lock:
+            data = self.load()
+            samples = data.setdefault(self._account_id(account), {}).setdefault(source, [])
+            samples.append({
+                "at": round(time.time()),
+                "time_to_otp": round(time_to_otp, 3),
+                "detect_seconds": round(detect_seconds, 3) if detect_seconds is not None else None,
+            })
+            del samples[:-self.KEEP]
+            try:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                tmp_path = self.path + ".tmp"
+                with open(tmp_path, "w") as f:
+                    json.dump(data, f, indent=2)
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                print(f"[OTP] Could not save source stats: {e}")
+
+    def fastest(self, account, candidates):
+        """
+        The candidate with the lowest median time-to-OTP for account; a
+        candidate without samples yet is returned first so it gets measured.
+        """
+        recorded = self.load().get(self._account_id(account), {})
+        medians = {}
+        for name in candidates:
+            values = sorted(s["time_to_otp"] for s in recorded.get(name, []))
+            if not values:
+                return name
+            medians[name] = values[len(values) // 2]
+        return min(medians, key=medians.get) if medians else None
+
+
+def configured_sources():
+    """Names of the sources whose settings are present in the environment."""
+    names = []
+    for name, source_class in SOURCES.items():
+        try:
+            source_class.from_env()
+        except ValueError:
+            continue
+        names.append(name)
+    return names
+
+
+def source_name_for(account=None):
+    """
+    The OTP source to use: OTP_SOURCE (gmail_api, imap, maildir or auto,
+    default gmail_api). auto picks the fastest configured source for account.
+    """
+    name = os.environ.get("OTP_SOURCE", GmailAPISource.name).strip().lower()
+    if name != "auto":
+        return name
+    candidates = configured_sources()
+    if account and candidates:
+        return OTPSourceStats.from_env().fastest(account, candidates)
+    return candidates[0] if candidates else GmailAPISource.name
+
+
+# otp_inbox.SharedInbox serving every login in this process (see use_shared_inbox)
+_shared_inbox = None
+
+
+def use_shared_inbox(inbox):
+    """
+    Route the OTPs of all logins in this process through inbox (an
+    otp_inbox.SharedInbox), or back to one source per login with None.
+    """
+    global _shared_inbox
+    _shared_inbox = inbox
+
+
+def open_otp_source(account=None, name=None):
+    """
+    Create and connect the configured OTP source (not yet baselined). While
+    a shared inbox is in use, a login's source is a ticket on that inbox.
+
+    Returns:
+        OTPSource, or None if it could not be set up
+    """
+    if _shared_inbox is not None and account and name is None:
+        return _shared_inbox.ticket(account)
+    name = name or source_name_for(account)
+    try:
+        if name not in SOURCES:
+            raise ValueError(f"unknown OTP_SOURCE '{name}' (choose from {', '.join(SOURCES)} or auto)")
+        source = SOURCES[name].from_env()
+        source.account = account
+        source.connect()
+        return source
+    except Exception as e:
+        print(f"[OTP] Could not open the {name} OTP source: {e}")
+        return None
+
+
+def start_otp_source(account=None, name=None):
+    """
+    Open the configured OTP source and capture its baseline. Call just
+    before the login button is clicked, then use source.wait_for_otp().
+
+    Returns:
+        OTPSource, or None if it could not be set up
+    """
+    source = open_otp_source(account, name)
+    if source is None:
+        return None
+    try:
+        source.capture_baseline()
+    except Exception as e:
+        print(f"[OTP] Could not capture the {source.name} baseline: {e}")
+        source.close()
+        return None
+    print(f"[OTP] Using the {source.name} OTP source")
+    return source
@@ -0,0 +1,123 @@
+# Page text the login flow reacts to (lowercase). These lists are the rule
+# table of classify_page(): each is matched against the page HTML in-browser.
+RATE_LIMIT_KEYWORDS = [
+    'max limit to generate otp',
+    'reached max limit',
+    'try after 24 hours',
+    'too many otp requests',
+    'otp limit exceeded'
+]
+OTP_TEXT_KEYWORDS = ['enter the otp', 'enter otp', 'otp sent', 'verification code', 'otp to login']
+INVALID_OTP_KEYWORDS = ['invalid otp', 'incorrect otp', 'otp expired', 'otp is invalid']
+
+# Named logged-in indicators, each true if any of its keywords is present
+LOGGED_IN_INDICATORS = {
+    'naukri360': ['naukri360'],
+    'my_naukri': ['my naukri', 'mynaukri'],
+    'profile_link': ['/mnjuser/profile', '/mnjuser/homepage'],
+}
+
+OTP_INPUT_SELECTOR = "input[type='text'][maxlength='1'], input[type='tel'][maxlength='1']"
+
+# Page states, in the priority classify_page() applies them
+RATE_LIMITED = "rate_limited"
+OTP_INVALID = "otp_invalid"
+OTP_REQUIRED = "otp_required"
+PROFILE_LOADED = "profile_loaded"
+LOGGED_IN = "logged_in"
+LOGIN_FORM = "login_form"
+UNKNOWN = "unknown"
+
+# Runs entirely in the page and returns only the keyword hits and a few counts
+CLASSIFY_JS = """
+var rules = arguments[0];
+var html = document.documentElement.outerHTML.toLowerCase();
+function hits(list) { return list.filter(function(k) { return html.indexOf(k) !== -1; }); }
+function visible(el) { return !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length); }
+var keywords = {};
+for (var name in rules.keywords) keywords[name] = hits(rules.keywords[name]);
+var indicators = {};
+for (var name in rules.indicators) indicators[name] = hits(rules.indicators[name]);
+return {
+    url: location.href,
+    title: document.title,
+    keywords: keywords,
+    indicators: indicators,
+    otp_inputs: Array.prototype.filter.call(document.querySelectorAll(rules.otp_selector), visible).length,
+    login_buttons: Array.prototype.filter.call(document.querySelectorAll('button'), function(b) {
+        return b.textContent.toLowerCase().indexOf('login') !== -1; }).length,
+    email_fields: document.querySelectorAll("input[placeholder*='email' i]").length,
+    password_fields: document.querySelectorAll("input[type='password']").length,
+    resume_headline: html.indexOf('resume headline') !== -1
+};
+"""
+
+RULES = {
+    'keywords': {
+        RATE_LIMITED: RATE_LIMIT_KEYWORDS,
+        OTP_INVALID: INVALID_OTP_KEYWORDS,
+        OTP_REQUIRED: OTP_TEXT_KEYWORDS,
+    },
+    'indicators': LOGGED_IN_INDICATORS,
+    'otp_selector': OTP_INPUT_SELECTOR,
+}
+
+
+def classify_page(driver):
+    """
+    Classify the current page with one injected script instead of pulling
+    driver.page_source over WebDriver and scanning it in Python.
+
+    Returns:
+        dict: {
+            'state': one of the state constants above,
+            'evidence': the keywords/indicators/counts that decided it,
+            'url', 'title',
+            'keywords': {state: [matched keywords]},
+            'indicators': {name: bool} for LOGGED_IN_INDICATORS,
+            'otp_inputs': number of visible one-digit OTP inputs,
+            'login_form': True if the login form is still on the page,
+        }
+    """
+    return classify_raw(driver.execute_script(CLASSIFY_JS, RULES))
+
+
+def classify_raw(raw):
+    """
+    Turn the result of CLASSIFY_JS into the classification classify_page()
+    returns (shared with the CDP engine, which runs the script itself).
+    """
+    keywords = raw['keywords']
+    indicators = {name: bool(found) for name, found in raw['indicators'].items()}
+    login_form = bool((raw['login_buttons'] and raw['email_fields']) or raw['password_fields'])
+    url = raw['url'].lower()
+
+    if keywords[RATE_LIMITED]:
+        state, evidence = RATE_LIMITED, {'keywords': keywords[RATE_LIMITED]}
+    elif keywords[OTP_INVALID]:
+        state, evidence = OTP_INVALID, {'keywords': keywords[OTP_INVALID]}
+    elif keywords[OTP_REQUIRED] or raw['otp_inputs']:
+        state, evidence = OTP_REQUIRED, {'keywords': keywords[OTP_REQUIRED], 'otp_inputs': raw['otp_inputs']}
+    elif 'mnjuser/profile' in url and raw['resume_headline']:
+        state, evidence = PROFILE_LOADED, {'url': raw['url'], 'resume_headline': True}
+    elif any(indicators.values()):
+        state, evidence = LOGGED_IN, {'indicators': [n for n, v in indicators.items() if v]}
+    elif login_form:
+        state, evidence = LOGIN_FORM, {
+            'login_buttons': raw['login_buttons'],
+            'email_fields': raw['email_fields'],
+            'password_fields': raw['password_fields'],
+        }
+    else:
+        state, evidence = UNKNOWN, {}
+
+    return {
+        'state': state,
+        'evidence': evidence,
+        'url': raw['url'],
+        'title': raw['title'],
+        'keywords': keywords,
+        'indicators': indicators,
+        'otp_inputs': raw['otp_inputs'],
+        'login_form': login_form,
+    }
@@ -0,0 +1,169 @@
+import os
+import json
+from urllib.parse import urlsplit
+
+# Static assets the flow never looks at
+BLOCKED_EXTENSIONS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.mp4", "*.webm", "*.mp3",
+]
+# Ads, analytics beacons and other third-party scripts
+BLOCKED_DOMAINS = [
+    "*google-analytics.com*",
+    "*googletagmanager.com*",
+    "*googleadservices.com*",
+    "*googlesyndication.com*",
+    "*doubleclick.net*",
+    "*connect.facebook.net*",
+    "*facebook.com/tr*",
+    "*hotjar.com*",
+    "*clarity.ms*",
+    "*bat.bing.com*",
+    "*px.ads.linkedin.com*",
+    "*snap.licdn.com*",
+    "*moengage.com*",
+    "*taboola.com*",
+    "*criteo.com*",
+    "*adnxs.com*",
+    "*scorecardresearch.com*",
+    "*nr-data.net*",
+    "*js-agent.newrelic.com*",
+]
+# Typical transfer size of one request per CDP resource type, for estimating
+# what blocked requests would have downloaded when the run loaded none of the
+# same type to average over
+TYPICAL_BYTES = {
+    "Image": 15 * 1024,
+    "Font": 30 * 1024,
+    "Media": 250 * 1024,
+    "Script": 25 * 1024,
+    "Stylesheet": 10 * 1024,
+}
+DEFAULT_TYPICAL_BYTES = 5 * 1024
+
+
+class ResourceBlocker:
+    """
+    Lean page-load mode: Chrome is told (via CDP Network.setBlockedURLs) not to
+    fetch images, fonts, media, ads and analytics, which the login form, the
+    OTP inputs and the headline editor don't need.
+
+    Configuration (environment variables):
+        LEAN_MODE   true to enable (default false)
+        LEAN_ALLOW  Comma-separated substrings; any block pattern containing
+                    one is not applied (e.g. "svg,moengage" if the site breaks)
+        LEAN_BLOCK  Comma-separated extra URL patterns to block
+        NETWORK_REPORT  true to collect the report with LEAN_MODE off too, as
+                    a baseline (default false)
+
+    report() reads Chrome's performance log and returns requests, blocked
+    requests, bytes downloaded and an estimate of the bytes blocking saved,
+    per page. The log makes Chrome buffer every network event, so it is only
+    turned on in lean mode or with NETWORK_REPORT.
+    """
+
+    def __init__(self, driver, allow=None, extra_block=None):
+        self.driver = driver
+        self.allow = allow or []
+        self.patterns = [
+            pattern for pattern in BLOCKED_EXTENSIONS + BLOCKED_DOMAINS + (extra_block or [])
+            if not any(a in pattern for a in self.allow)
+        ]
+
+    @staticmethod
+    def enabled():
+        return os.environ.get("LEAN_MODE", "false").lower() == "true"
+
+    @classmethod
+    def reporting(cls):
+        return cls.enabled() or os.environ.get("NETWORK_REPORT", "false").lower() == "true"
+
+    @classmethod
+    def configure_options(cls, options):
+        """Turn on the performance log that report() reads (before Chrome starts), if wanted."""
+        if cls.reporting():
+            options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+
+    @classmethod
+    def from_env(cls, driver):
+        """Build a blocker from LEAN_ALLOW/LEAN_BLOCK."""
+        def split(name):
+            return [p.strip() for p in os.environ.get(name, "").split(",") if p.strip()]
+        return cls(driver, allow=split("LEAN_ALLOW"), extra_block=split("LEAN_BLOCK"))
+
+    def install(self):
+        """Apply the block list to every page this driver loads."""
+        self.driver.execute_cdp_cmd("Network.enable", {})
+        self.driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": self.patterns})
+        print(f"[Lean] Blocking {len(self.patterns)} URL patterns (images, fonts, ads, analytics)")
+
+    def report(self):
+        """
+        Summarise the network activity since the last report, per page.
+
+        Blocked requests download nothing, so the bytes they saved are
+        estimated: the average size of the requests of the same resource type
+        that did load in this report, else TYPICAL_BYTES for the type.
+
+        Returns:
+            dict: {'lean_mode': bool, 'pages': {page: {'requests', 'blocked', 'bytes', 'blocked_bytes_estimate'}},
+                   'requests': total, 'blocked': total, 'bytes': total, 'blocked_bytes_estimate': total},
+                  or {} when reporting is off
+        """
+        if not self.reporting():
+            return {}
+        try:
+            entries = self.driver.get_log("performance")
+        except Exception as e:
+            print(f"[Lean] Performance log unavailable: {e}")
+            return {}
+
+        page_of = {}
+        type_of = {}
+        pages = {}
+        # Resource type -> [bytes, requests] of what did load, and blocked requests by page and type
+        loaded = {}
+        blocked = []
+        for entry in entries:
+            message = json.loads(entry["message"])["message"]
+            method, params = message.get("method"), message.get("params", {})
+            if method == "Network.requestWillBeSent":
+                document = urlsplit(params.get("documentURL", ""))
+                page = f"{document.netloc}{document.path}" or "(unknown)"
+                page_of[params["requestId"]] = page
+                type_of[params["requestId"]] = params.get("type", "Other")
+                stats = pages.setdefault(page, {"requests": 0, "blocked": 0, "bytes": 0})
+                # Redirects reuse the request id - count the request once
+                if "redirectResponse" not in params:
+                    stats["requests"] += 1
+            elif method == "Network.loadingFinished" and params.get("requestId") in page_of:
+                size = int(params.get("encodedDataLength", 0))
+                pages[page_of[params["requestId"]]]["bytes"] += size
+                totals = loaded.setdefault(type_of[params["requestId"]], [0, 0])
+                totals[0] += size
+                totals[1] += 1
+            elif method == "Network.loadingFailed" and params.get("requestId") in page_of:
+                if params.get("blockedReason") == "inspector":
+                    pages[page_of[params["requestId"]]]["blocked"] += 1
+                    blocked.append((page_of[params["requestId"]], params.get("type") or type_of[params["requestId"]]))
+
+        for stats in pages.values():
+            stats["blocked_bytes_estimate"] = 0
+        for page, resource_type in blocked:
+            size, count = loaded.get(resource_type, (0, 0))
+            pages[page]["blocked_bytes_estimate"] += (
+                size // count if count else TYPICAL_BYTES.get(resource_type, DEFAULT_TYPICAL_BYTES))
+
+        for page, stats in pages.items():
+            print(f"[Lean] {page}: {stats['requests']} requests, {stats['blocked']} blocked, "
+                  f"{stats['bytes'] / 1024:.0f} KB downloaded, "
+                  f"~{stats['blocked_bytes_estimate'] / 1024:.0f} KB saved")
+        return {
+            "lean_mode": self.enabled(),
+            "pages": pages,
+            "requests": sum(s["requests"] for s in pages.values()),
+            "blocked": sum(s["blocked"] for s in pages.values()),
+            "bytes": sum(s["bytes"] for s in pages.values()),
+            "blocked_bytes_estimate": sum(s["blocked_bytes_estimate"] for s in pages.values()),
+        }
@@ -0,0 +1,218 @@
+import os
+import json
+import time
+import hashlib
+from datetime import datetime
+from session_store import SessionStore
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+WINDOW_SECONDS = 24 * 3600
+
+ATTEMPT = "attempt"
+DEFER = "defer"
+SKIP = "skip"
+
+
+class RunLock:
+    """
+    Exclusive, non-blocking per-account lock file, so overlapping runs (cron
+    plus a manual dispatch, a fleet next to the daemon) never log the same
+    account in at the same time. flock locks die with the process; on
+    platforms without fcntl the lock file is created exclusively instead.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._fd = None
+
+    def acquire(self):
+        """Return True if the lock was taken, False if another run holds it."""
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        if fcntl is not None:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                os.close(fd)
+                return False
+            os.ftruncate(fd, 0)
+            os.write(fd, str(os.getpid()).encode('ascii'))
+        else:
+            try:
+                fd = os.open(self.path, os.O_RDWR | os.O_CREAT | os.O_EXCL, 0o600)
+            except FileExistsError:
+                return False
+            os.write(fd, str(os.getpid()).encode('ascii'))
+        self._fd = fd
+        return True
+
+    def release(self):
+        if self._fd is None:
+            return
+        if fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+        else:
+            os.close(self._fd)
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+        self._fd = None
+
+
+class OTPLedger:
+    """
+    Persistent record of the OTPs requested for one account, used to estimate
+    what is left of Naukri's rolling daily OTP allowance.
+
+    A RATE_LIMITED response means the estimate was too optimistic (OTPs were
+    also requested elsewhere), so the account is blocked for the cooldown
+    Naukri announces instead of trusting the count.
+    """
+
+    def __init__(self, path, daily_limit=5, cooldown_hours=24):
+        self.path = path
+        self.daily_limit = daily_limit
+        self.cooldown_seconds = cooldown_hours * 3600
+        self.data = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            data = {}
+        data.setdefault("otp_requests", [])
+        data.setdefault("blocked_until", 0)
+        return data
+
+    def save(self):
+        now = time.time()
+        # Keep a few days of history for debugging, not forever
+        self.data["otp_requests"] = [t for t in self.data["otp_requests"] if now - t < 3 * WINDOW_SECONDS]
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(self.data, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"[Budget] Could not save OTP ledger: {e}")
+
+    def used(self, now=None):
+        now = now or time.time()
+        return sum(1 for t in self.data["otp_requests"] if now - t < WINDOW_SECONDS)
+
+    def remaining(self, now=None):
+        now = now or time.time()
+        if self.data["blocked_until"] > now:
+            return 0
+        return max(0, self.daily_limit - self.used(now))
+
+    def next_available(self, now=None):
+        """Epoch time at which another OTP is expected to be allowed."""
+        now = now or time.time()
+        if self.data["blocked_until"] > now:
+            return self.data["blocked_until"]
+        window = sorted(t for t in self.data["otp_requests"] if now - t < WINDOW_SECONDS)
+        if len(window) < self.daily_limit:
+            return now
+        # The oldest request that has to age out before the count drops below the limit
+        return window[len(window) - self.daily_limit] + WINDOW_SECONDS
+
+    def record_otp_request(self):
+        self.data["otp_requests"].append(time.time())
+        self.save()
+
+    def record_rate_limited(self):
+        self.data["blocked_until"] = time.time() + self.cooldown_seconds
+        self.data["rate_limited_at"] = time.time()
+        self.save()
+
+
+class RunCoordinator:
+    """
+    Decides, before any browser is launched, whether a run for an account
+    should go ahead, and keeps the OTP ledger up to date while it runs.
+
+    begin() takes the account's run lock and returns a decision:
+        attempt - go ahead; otp_allowed says whether a fresh login (which
+                  costs an OTP) is within budget, or only the saved session
+                  may be used
+        defer   - no OTP budget left and no saved session to fall back on
+        skip    - another run for this account holds the lock
+
+    Configuration (environment variables):
+        OTP_DAILY_LIMIT              OTPs Naukri allows per rolling 24h (default 5)
+        OTP_RESERVE                  OTPs to leave for manual logins (default 0)
+        OTP_RATE_LIMIT_COOLDOWN_HOURS  Block after a RATE_LIMITED run (default 24)
+        OTP_STATE_DIR                Ledger and lock directory (default .naukri_otp)
+    """
+
+    def __init__(self, email, state_dir=None, daily_limit=None, reserve=None, cooldown_hours=None):
+        self.email = email
+        state_dir = state_dir or os.environ.get("OTP_STATE_DIR", ".naukri_otp")
+        daily_limit = int(daily_limit if daily_limit is not None else os.environ.get("OTP_DAILY_LIMIT", "5"))
+        self.reserve = int(reserve if reserve is not None else os.environ.get("OTP_RESERVE", "0"))
+        cooldown_hours = float(cooldown_hours if cooldown_hours is not None
+                               else os.environ.get("OTP_RATE_LIMIT_COOLDOWN_HOURS", "24"))
+        # Named by a hash so the email is not on disk in clear text
+        account_id = hashlib.sha256(email.lower().encode('utf-8')).hexdigest()[:16]
+        self.ledger = OTPLedger(os.path.join(state_dir, f"{account_id}.json"),
+                                daily_limit=daily_limit, cooldown_hours=cooldown_hours)
+        self.lock = RunLock(os.path.join(state_dir, f"{account_id}.lock"))
+        self.decision = None
+
+    @property
+    def otp_allowed(self):
+        return bool(self.decision and self.decision["otp_allowed"])
+
+    def begin(self):
+        """Take the run lock and decide whether to attempt, defer or skip."""
+        if not self.lock.acquire():
+            self.decision = {"action": SKIP, "otp_allowed": False,
+                             "reason": "another run for this account is in progress"}
+            print(f"[Budget] ⏭️  Skipping: {self.decision['reason']}")
+            return self.decision
+
+        # Re-read under the lock - the previous holder may have just written it
+        self.ledger.data = self.ledger._load()
+        now = time.time()
+        remaining = self.ledger.remaining(now) - self.reserve
+        decision = {
+            "otp_used_24h": self.ledger.used(now),
+            "otp_remaining": max(0, remaining),
+            "otp_allowed": remaining > 0,
+        }
+        if remaining > 0:
+            decision.update(action=ATTEMPT, reason=f"{remaining} OTP(s) left in the rolling 24h budget")
+        else:
+            retry_at = datetime.fromtimestamp(self.ledger.next_available(now)).isoformat()
+            store = SessionStore.from_env(self.email)
+            if store and store.load() is not None:
+                decision.update(action=ATTEMPT, retry_at=retry_at,
+                                reason="OTP budget used up - saved session only, no fresh login")
+            else:
+                decision.update(action=DEFER, retry_at=retry_at,
+                                reason="OTP budget used up and no saved session")
+        self.decision = decision
+        print(f"[Budget] {decision['action']}: {decision['reason']} "
+              f"({decision['otp_used_24h']} used in the last 24h)")
+        return decision
+
+    def record_otp_request(self):
+        """Call when Naukri has sent (or was asked to send) an OTP."""
+        self.ledger.record_otp_request()
+
+    def record_rate_limited(self):
+        """Call when Naukri refused to send an OTP."""
+        self.ledger.record_rate_limited()
+
+    def finish(self):
+        """Release the run lock (call after every begin(), whatever it decided)."""
+        self.lock.release()
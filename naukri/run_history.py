@@ -0,0 +1,212 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from datetime import datetime
+
+PERCENTILES = (50, 90, 95)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    account TEXT NOT NULL,
+    recorded_at REAL NOT NULL,
+    status TEXT NOT NULL,
+    duration REAL,
+    otp_requests INTEGER NOT NULL DEFAULT 0,
+    session_reused INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS runs_recorded_at ON runs (recorded_at);
+CREATE INDEX IF NOT EXISTS runs_duration ON runs (status, duration);
+
+CREATE TABLE IF NOT EXISTS steps (
+    run_id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    duration REAL NOT NULL,
+    recorded_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS steps_name_duration ON steps (name, duration);
+
+-- Running per-day counters, updated as each run is recorded
+CREATE TABLE IF NOT EXISTS daily (
+    day TEXT NOT NULL,
+    account TEXT NOT NULL,
+    runs INTEGER NOT NULL DEFAULT 0,
+    success INTEGER NOT NULL DEFAULT 0,
+    rate_limited INTEGER NOT NULL DEFAULT 0,
+    deferred INTEGER NOT NULL DEFAULT 0,
+    failure INTEGER NOT NULL DEFAULT 0,
+    otp_requests INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, account)
+);
+"""
+
+# run status -> daily counter column
+STATUS_COLUMNS = {
+    "SUCCESS": "success",
+    "RATE_LIMITED": "rate_limited",
+    "DEFERRED": "deferred",
+    "SKIPPED": "deferred",
+}
+
+
+class RunHistory:
+    """
+    Long-lived record of every run (status, OTPs used, step timings) in a
+    small SQLite database, which outlives the 7-day screenshot artifacts.
+
+    Per-day counters are kept up to date as runs are recorded, and step
+    durations are indexed by name, so export_stats() stays cheap however
+    long the history gets. Accounts are stored as a hash of the email.
+
+    Configuration (environment variables):
+        RUN_HISTORY_DB   Database file (default .naukri_history/history.db)
+        RUN_STATS_FILE   Stats JSON for the dashboard (default .naukri_history/stats.json)
+    """
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.executescript(SCHEMA)
+
+    @classmethod
+    def from_env(cls):
+        return cls(os.environ.get("RUN_HISTORY_DB", os.path.join(".naukri_history", "history.db")))
+
+    def close(self):
+        self.db.close()
+
+    def record(self, account, status, details=None, recorded_at=None):
+        """
+        Add one run.
+
+        Args:
+            account: Account email (stored hashed)
+            status: SUCCESS, RATE_LIMITED, DEFERRED, SKIPPED or FAILURE
+            details: The run_status.json details (timeline, session_reused, ...)
+        """
+        details = details or {}
+        recorded_at = recorded_at or time.time()
+        account_id = hashlib.sha256(account.lower().encode('utf-8')).hexdigest()[:16]
+        timeline = [s for s in details.get("timeline", []) if s.get("duration_seconds") is not None]
+        duration = None
+        if timeline:
+            duration = (max(s["start_offset_seconds"] + s["duration_seconds"] for s in timeline)
+                        - min(s["start_offset_seconds"] for s in timeline))
+        # One otp_wait span per OTP prompt Naukri showed
+        otp_requests = sum(1 for s in timeline if s["name"] == "otp_wait")
+        day = datetime.fromtimestamp(recorded_at).strftime("%Y-%m-%d")
+        column = STATUS_COLUMNS.get(status, "failure")
+
+        with self.db:
+            cursor = self.db.execute(
+                "INSERT INTO runs (account, recorded_at, status, duration, otp_requests, session_reused)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (account_id, recorded_at, status, duration, otp_requests,
+                 int(bool(details.get("session_reused")))),
+            )
+            self.db.executemany(
+                "INSERT INTO steps (run_id, name, duration, recorded_at) VALUES (?, ?, ?, ?)",
+                [(cursor.lastrowid, s["name"], s["duration_seconds"], recorded_at) for s in timeline],
+            )
+            self.db.execute(
+                "INSERT OR IGNORE INTO daily (day, account) VALUES (?, ?)", (day, account_id))
+            self.db.execute(
+                f"UPDATE daily SET runs = runs + 1, {column} = {column} + 1,"
+                " otp_requests = otp_requests + ? WHERE day = ? AND account = ?",
+                (otp_requests, day, account_id),
+            )
+
+    def _percentiles(self, table, where, params):
+        count = self.db.execute(f"SELECT COUNT(*) FROM {table} WHERE {where}", params).fetchone()[0]
+        if not count:
+            return None
+        result = {"count": count}
+        for pct in PERCENTILES:
+            # Nearest rank, read straight from the index order
+            offset = max(1, int(round(pct / 100.0 * count))) - 1
+            row = self.db.execute(
+                f"SELECT duration FROM {table} WHERE {where} ORDER BY duration LIMIT 1 OFFSET ?",
+                params + (offset,),
+            ).fetchone()
+            result[f"p{pct}"] = round(row[0], 3)
+        return result
+
+    def stats(self, days=30, now=None):
+        """Aggregate stats for the dashboard over the last `days` days."""
+        now = now or time.time()
+        since = now - days * 86400
+        first_day = datetime.fromtimestamp(since).strftime("%Y-%m-%d")
+
+        daily = [
+            dict(zip(("day", "runs", "success", "rate_limited", "deferred", "failure", "otp_requests"), row))
+            for row in self.db.execute(
+                "SELECT day, SUM(runs), SUM(success), SUM(rate_limited), SUM(deferred), SUM(failure),"
+                " SUM(otp_requests) FROM daily WHERE day >= ? GROUP BY day ORDER BY day", (first_day,))
+        ]
+        totals = {key: sum(d[key] for d in daily)
+                  for key in ("runs", "success", "rate_limited", "deferred", "failure", "otp_requests")}
+        attempted = totals["runs"] - totals["deferred"]
+        totals["success_rate"] = round(totals["success"] / attempted, 3) if attempted else None
+        totals["rate_limit_frequency"] = round(totals["rate_limited"] / attempted, 3) if attempted else None
+
+        last_24h = self.db.execute(
+            "SELECT COUNT(*), COALESCE(SUM(otp_requests), 0), COALESCE(SUM(session_reused), 0)"
+            " FROM runs WHERE recorded_at >= ?", (now - 86400,)).fetchone()
+        last_run = self.db.execute(
+            "SELECT recorded_at, status, duration FROM runs ORDER BY recorded_at DESC LIMIT 1").fetchone()
+
+        step_names = [row[0] for row in self.db.execute(
+            "SELECT DISTINCT name FROM steps WHERE recorded_at >= ?", (since,))]
+        return {
+            "generated_at": datetime.fromtimestamp(now).isoformat(),
+            "window_days": days,
+            "totals": totals,
+            "last_24h": {"runs": last_24h[0], "otp_requests": last_24h[1], "session_reused": last_24h[2]},
+            "last_run": {
+                "recorded_at": datetime.fromtimestamp(last_run[0]).isoformat(),
+                "status": last_run[1],
+                "duration_seconds": round(last_run[2], 3) if last_run[2] is not None else None,
+            } if last_run else None,
+            "daily": daily,
+            "latency": {
+                "run": self._percentiles("runs", "status = 'SUCCESS' AND recorded_at >= ?", (since,)),
+                "steps": {name: self._percentiles("steps", "name = ? AND recorded_at >= ?", (name, since))
+                          for name in sorted(step_names)},
+            },
+        }
+
+    def export_stats(self, path, days=30):
+        """Write stats() as a compact JSON file (atomically)."""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.stats(days=days), f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+
+# Fleet workers finish concurrently; one writer at a time keeps the stats file whole
+_record_lock = threading.Lock()
+
+
+def record_run(account, status, details=None):
+    """Append a run to the history and refresh the stats file (best effort)."""
+    try:
+        with _record_lock:
+            _record(account, status, details)
+    except Exception as e:
+        print(f"[History] Could not record run: {e}")
+
+
+def _record(account, status, details):
+    history = RunHistory.from_env()
+    try:
+        history.record(account, status, details)
+        stats_file = os.environ.get("RUN_STATS_FILE", os.path.join(".naukri_history", "stats.json"))
+        history.export_stats(stats_file)
+        print(f"[History] Run recorded - stats written to {stats_file}")
+    finally:
+        history.close()
@@ -0,0 +1,147 @@
+import os
+import json
+import base64
+import queue
+import hashlib
+import threading
+from datetime import datetime
+
+LEVELS = ("all", "failure", "off")
+FORMAT_EXTENSIONS = {"png": "png", "jpeg": "jpg", "webp": "webp"}
+
+
+class ScreenshotPipeline:
+    """
+    Step screenshots without the cost of driver.save_screenshot.
+
+    Frames are captured through CDP Page.captureScreenshot, which encodes in
+    the browser at the configured format/quality/scale. Decoding, duplicate
+    detection and the file write happen on a background thread, and an index
+    of every frame is written to screenshots.json in the log directory.
+
+    Configuration (environment variables):
+        SCREENSHOT_LEVEL    all (every step, default) | failure (errors only) | off
+        SCREENSHOT_FORMAT   png (default) | jpeg | webp - jpeg/webp are smaller and faster
+        SCREENSHOT_QUALITY  1-100 for jpeg/webp (default 70)
+        SCREENSHOT_SCALE    Downscale factor, e.g. 0.5 (default 1.0)
+    """
+
+    def __init__(self, driver, log_dir, level=None, fmt=None, quality=None, scale=None):
+        self.driver = driver
+        self.log_dir = log_dir
+        self.level = (level or os.environ.get("SCREENSHOT_LEVEL", "all")).lower()
+        if self.level not in LEVELS:
+            print(f"[Screenshot] Unknown SCREENSHOT_LEVEL '{self.level}', using 'all'")
+            self.level = "all"
+        self.format = (fmt or os.environ.get("SCREENSHOT_FORMAT", "png")).lower()
+        if self.format not in FORMAT_EXTENSIONS:
+            print(f"[Screenshot] Unknown SCREENSHOT_FORMAT '{self.format}', using 'png'")
+            self.format = "png"
+        self.quality = int(quality or os.environ.get("SCREENSHOT_QUALITY", "70"))
+        self.scale = float(scale or os.environ.get("SCREENSHOT_SCALE", "1.0"))
+
+        self.manifest = []
+        self._last_digest = None
+        self._last_file = None
+        self._queue = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name="screenshot-writer", daemon=True)
+        self._writer.start()
+
+    def capture(self, name, failure=False):
+        """
+        Capture the current page as <name>.<ext>.
+
+        Step shots are skipped unless the level is 'all'; failure shots are
+        skipped only when the level is 'off'. Never raises.
+        """
+        if not self._wanted(failure):
+            return
+        try:
+            metrics = self.driver.execute_cdp_cmd("Page.getLayoutMetrics", {}) if self.scale != 1.0 else None
+            data = self.driver.execute_cdp_cmd("Page.captureScreenshot", self._params(metrics))["data"]
+        except Exception as e:
+            print(f"[Screenshot] Could not capture {name}: {e}")
+            return
+        self._queue.put((name, failure, datetime.now().isoformat(), data))
+
+    async def capture_async(self, name, failure=False):
+        """capture() for a cdp_client.CDPPage in place of the driver, awaited on its event loop."""
+        if not self._wanted(failure):
+            return
+        try:
+            metrics = await self.driver.send("Page.getLayoutMetrics") if self.scale != 1.0 else None
+            data = (await self.driver.send("Page.captureScreenshot", self._params(metrics)))["data"]
+        except Exception as e:
+            print(f"[Screenshot] Could not capture {name}: {e}")
+            return
+        self._queue.put((name, failure, datetime.now().isoformat(), data))
+
+    def _wanted(self, failure):
+        return self.level != "off" and (self.level != "failure" or failure)
+
+    def _params(self, layout_metrics=None):
+        params = {"format": self.format, "captureBeyondViewport": False}
+        if self.format != "png":
+            params["quality"] = self.quality
+        if layout_metrics:
+            viewport = layout_metrics["cssVisualViewport"]
+            params["clip"] = {
+                "x": viewport["pageX"],
+                "y": viewport["pageY"],
+                "width": viewport["clientWidth"],
+                "height": viewport["clientHeight"],
+                "scale": self.scale,
+            }
+        return params
+
+    def _write_loop(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            name, failure, taken_at, data = item
+            try:
+                self._write(name, failure, taken_at, data)
+            except Exception as e:
+                print(f"[Screenshot] Could not write {name}: {e}")
+
+    def _write(self, name, failure, taken_at, data):
+        image = base64.b64decode(data)
+        digest = hashlib.sha1(image).hexdigest()
+        entry = {"name": name, "taken_at": taken_at, "failure": failure, "sha1": digest}
+
+        if digest == self._last_digest:
+            # Same pixels as the previous frame - index it but don't store it again
+            entry["duplicate_of"] = self._last_file
+        else:
+            filename = f"{name}.{FORMAT_EXTENSIONS[self.format]}"
+            with open(os.path.join(self.log_dir, filename), "wb") as f:
+                f.write(image)
+            entry["file"] = filename
+            entry["bytes"] = len(image)
+            self._last_digest = digest
+            self._last_file = filename
+        self.manifest.append(entry)
+
+    def close(self, timeout=10):
+        """Flush pending frames and write screenshots.json."""
+        self._queue.put(None)
+        self._writer.join(timeout)
+        if not self.manifest:
+            return
+        manifest_file = os.path.join(self.log_dir, "screenshots.json")
+        stored = [e for e in self.manifest if "file" in e]
+        try:
+            with open(manifest_file, "w") as f:
+                json.dump({
+                    "level": self.level,
+                    "format": self.format,
+                    "quality": self.quality,
+                    "scale": self.scale,
+                    "frames": len(self.manifest),
+                    "stored": len(stored),
+                    "bytes": sum(e["bytes"] for e in stored),
+                    "screenshots": self.manifest,
+                }, f, indent=2)
+        except Exception as e:
+            print(f"[Screenshot] Could not write manifest: {e}")
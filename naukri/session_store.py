@@ -0,0 +1,241 @@
+import os
+import json
+import time
+import base64
+import hashlib
+from urllib.parse import urlsplit
+from cryptography.fernet import Fernet, InvalidToken
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+
+NAUKRI_BASE_URL = "https://www.naukri.com"
+# PBKDF2-HMAC-SHA256 work factor for turning the passphrase into the Fernet key
+KDF_ITERATIONS = 480000
+
+# execute_script body returning the page's localStorage as a dict
+LOCAL_STORAGE_JS = (
+    "var d = {}; for (var i = 0; i < localStorage.length; i++) {"
+    " var k = localStorage.key(i); d[k] = localStorage.getItem(k); } return d;"
+)
+
+
+class SessionStore:
+    """
+    Persists an authenticated Naukri browser session (cookies + localStorage)
+    to an encrypted file so the next run can skip the login/OTP flow.
+
+    The file is encrypted with a key derived from NAUKRI_SESSION_KEY (PBKDF2
+    with a random salt kept in a .salt file next to it), so it can be cached
+    between CI runs (or copied to another host) without exposing the session
+    cookies.
+
+    Only cookies and localStorage of the site at base_url are kept, so a run
+    against another site (NAUKRI_BASE_URL, e.g. the benchmark's fake Naukri)
+    saves and restores its own session.
+    """
+
+    def __init__(self, path, passphrase, base_url=NAUKRI_BASE_URL, max_age_hours=72):
+        self.path = path
+        self.salt_path = path + '.salt'
+        self.passphrase = passphrase
+        self.max_age_seconds = max_age_hours * 3600
+        target = urlsplit(base_url)
+        self.origin = f"{target.scheme}://{target.netloc}"
+        # Cookies may be set for the bare domain (.naukri.com) or the host itself
+        host = target.hostname or ''
+        self.cookie_domain = host[4:] if host.startswith('www.') else host
+        self.fernet = None
+        self._script_id = None
+
+    @classmethod
+    def from_env(cls, account_email, base_url=NAUKRI_BASE_URL):
+        """
+        Build a store for an account from environment variables.
+
+        Args:
+            account_email: Account the session belongs to
+            base_url: Site whose cookies and localStorage are kept
+
+        Returns None when NAUKRI_SESSION_KEY is not set (session reuse disabled).
+        """
+        passphrase = os.environ.get('NAUKRI_SESSION_KEY')
+        if not passphrase:
+            print("[Session] NAUKRI_SESSION_KEY not set - session reuse disabled")
+            return None
+
+        session_dir = os.environ.get('NAUKRI_SESSION_DIR', '.naukri_sessions')
+        max_age_hours = float(os.environ.get('NAUKRI_SESSION_MAX_AGE_HOURS', '72'))
+        # One file per account, named by a hash so the email is not on disk in clear text
+        account_id = hashlib.sha256(account_email.lower().encode('utf-8')).hexdigest()[:16]
+        path = os.path.join(session_dir, f"{account_id}.session")
+        return cls(path, passphrase, base_url=base_url, max_age_hours=max_age_hours)
+
+    def _key(self, create=False):
+        """
+        The Fernet for this file, keyed by PBKDF2 over the passphrase and the
+        file's salt. A new salt is written when create is set and there is
+        none yet; returns None if there is no salt to read.
+        """
+        if self.fernet is not None:
+            return self.fernet
+        try:
+            with open(self.salt_path, 'rb') as f:
+                salt = f.read()
+        except FileNotFoundError:
+            if not create:
+                return None
+            salt = os.urandom(16)
+            os.makedirs(os.path.dirname(self.salt_path) or '.', exist_ok=True)
+            fd = os.open(self.salt_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(salt)
+        kdf = PBKDF2HMAC(algorithm=hashes.SHA256(), length=32, salt=salt, iterations=KDF_ITERATIONS)
+        self.fernet = Fernet(base64.urlsafe_b64encode(kdf.derive(self.passphrase.encode('utf-8'))))
+        return self.fernet
+
+    def _owns(self, cookie):
+        domain = cookie.get('domain', '').lstrip('.')
+        return domain == self.cookie_domain or domain.endswith('.' + self.cookie_domain)
+
+    def save(self, driver):
+        """Export cookies and localStorage from the live browser and write them encrypted."""
+        try:
+            cookies = driver.execute_cdp_cmd('Network.getAllCookies', {}).get('cookies', [])
+            local_storage = {}
+            if driver.current_url.startswith(self.origin):
+                local_storage = driver.execute_script(LOCAL_STORAGE_JS) or {}
+            self.write(cookies, local_storage)
+        except Exception as e:
+            print(f"[Session] Could not save session: {e}")
+
+    def write(self, cookies, local_storage):
+        """Encrypt and store cookies (as from Network.getAllCookies) and localStorage."""
+        cookies = [c for c in cookies if self._owns(c)]
+        payload = json.dumps({
+            "saved_at": time.time(),
+            "cookies": cookies,
+            "local_storage": local_storage,
+        }).encode('utf-8')
+
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(self._key(create=True).encrypt(payload))
+        print(f"[Session] Saved {len(cookies)} cookies and {len(local_storage)} localStorage keys")
+
+    def load(self):
+        """Read and decrypt the stored session. Returns None if missing, stale or unreadable."""
+        if not os.path.exists(self.path):
+            print("[Session] No saved session found")
+            return None
+        try:
+            fernet = self._key()
+            if fernet is None:
+                raise ValueError("salt file missing")
+            with open(self.path, 'rb') as f:
+                data = json.loads(fernet.decrypt(f.read()).decode('utf-8'))
+        except (InvalidToken, ValueError) as e:
+            print(f"[Session] Saved session unreadable (wrong key or corrupt): {type(e).__name__}")
+            self.clear()
+            return None
+
+        age = time.time() - data.get('saved_at', 0)
+        if age > self.max_age_seconds:
+            print(f"[Session] Saved session is {age / 3600:.1f}h old - discarding")
+            self.clear()
+            return None
+
+        now = time.time()
+        data['cookies'] = [
+            c for c in data.get('cookies', [])
+            if c.get('session') or c.get('expires', -1) <= 0 or c['expires'] > now
+        ]
+        if not data['cookies']:
+            print("[Session] All saved cookies have expired")
+            self.clear()
+            return None
+        return data
+
+    def restore(self, driver):
+        """
+        Inject the saved session into a fresh browser via CDP.
+
+        Must be called before the first navigation to the site.
+        Returns True if a session was injected.
+        """
+        data = self.load()
+        if not data:
+            return False
+
+        try:
+            driver.execute_cdp_cmd('Network.enable', {})
+            cookies, script = self.restore_payload(data)
+            driver.execute_cdp_cmd('Network.setCookies', {'cookies': cookies})
+            if script:
+                result = driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': script})
+                self._script_id = result.get('identifier')
+
+            print(f"[Session] Restored {len(cookies)} cookies and {len(data.get('local_storage') or {})} "
+                  "localStorage keys")
+            return True
+        except Exception as e:
+            print(f"[Session] Could not restore session: {e}")
+            return False
+
+    def restore_payload(self, data):
+        """
+        What restore() injects for a loaded session.
+
+        Returns:
+            tuple: (cookies for Network.setCookies, localStorage seed script or None)
+        """
+        cookie_keys = ('name', 'value', 'domain', 'path', 'secure', 'httpOnly', 'sameSite')
+        cookies = []
+        for c in data['cookies']:
+            cookie = {k: c[k] for k in cookie_keys if k in c}
+            if not c.get('session') and c.get('expires', -1) > 0:
+                cookie['expires'] = c['expires']
+            cookies.append(cookie)
+
+        local_storage = data.get('local_storage') or {}
+        if not local_storage:
+            return cookies, None
+        # Seed localStorage on every document of the site before page scripts
+        # run, without clobbering values the site has written since
+        script = (
+            "(function() {"
+            f" if (location.origin !== {json.dumps(self.origin)}) return;"
+            f" var d = {json.dumps(local_storage)};"
+            " for (var k in d) { try { if (localStorage.getItem(k) === null)"
+            " localStorage.setItem(k, d[k]); } catch (e) {} }"
+            "})();"
+        )
+        return cookies, script
+
+    def discard(self, driver):
+        """Undo a restore that turned out to be expired and delete the stored session."""
+        self.clear()
+        try:
+            driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+        except Exception as e:
+            print(f"[Session] Could not clear cookies: {e}")
+        self.detach(driver)
+
+    def detach(self, driver):
+        """Stop seeding localStorage into new documents (before the browser is reused)."""
+        if not self._script_id:
+            return
+        try:
+            driver.execute_cdp_cmd('Page.removeScriptToEvaluateOnNewDocument', {'identifier': self._script_id})
+        except Exception as e:
+            print(f"[Session] Could not remove localStorage seed script: {e}")
+        self._script_id = None
+
+    def clear(self):
+        """Delete the stored session (e.g. after it was found to be expired)."""
+        for path in (self.path, self.salt_path):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        self.fernet = None
@@ -0,0 +1,110 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from driver_resolver import DriverResolver
+from otp_sources import open_otp_source
+
+
+class StartupPipeline:
+    """
+    Runs the independent startup phases concurrently instead of one after another:
+
+        browser chain: driver_resolve -> chrome_launch
+        otp chain:     otp_connect    -> otp_baseline
+
+    so the OTP source (Gmail API, IMAP or Maildir) is already connected and
+    baselined by the time the OTP prompt appears, and startup costs roughly
+    the slower of the two chains.
+    """
+
+    def __init__(self, launch_browser, driver_path=None, warm_otp=True, resolver=None, otp_account=None):
+        """
+        Args:
+            launch_browser: Callable taking driver_path= and returning a WebDriver
+            driver_path: Pre-resolved ChromeDriver path (skips driver_resolve)
+            warm_otp: Set False to skip the OTP chain entirely
+            resolver: DriverResolver to use (default: configured from env)
+            otp_account: Account the OTP is for (OTP_SOURCE=auto picks per account)
+        """
+        self.launch_browser = launch_browser
+        self.driver_path = driver_path
+        self.resolver = resolver or DriverResolver()
+        self.warm_otp = warm_otp
+        self.otp_account = otp_account
+        self.timings = {}
+        self._t0 = None
+
+    def _phase(self, name, func, *args, **kwargs):
+        start = time.time()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            end = time.time()
+            self.timings[name] = {
+                "start_offset_seconds": round(start - self._t0, 3),
+                "duration_seconds": round(end - start, 3),
+            }
+
+    def _browser_chain(self):
+        driver_path = self.driver_path
+        if not driver_path:
+            driver_path = self._phase("driver_resolve", self.resolver.resolve)
+            # Cache hit/miss and Chrome version alongside the phase timing
+            self.timings["driver_resolve"].update({
+                "source": self.resolver.last_resolution["source"],
+                "chrome_major": self.resolver.last_resolution["chrome_major"],
+            })
+        return self._phase("chrome_launch", self.launch_browser, driver_path=driver_path)
+
+    def _otp_chain(self):
+        source = self._phase("otp_connect", open_otp_source, self.otp_account)
+        if source is None:
+            print("[Startup] OTP source warm-up failed - OTP will be fetched on demand")
+            return None
+        self.timings["otp_connect"]["source"] = source.name
+        try:
+            self._phase("otp_baseline", source.capture_baseline)
+        except Exception as e:
+            print(f"[Startup] OTP baseline failed ({e}) - OTP will be fetched on demand")
+            source.close()
+            return None
+        return source
+
+    def run(self):
+        """
+        Run both chains and wait for them.
+
+        Returns:
+            tuple: (driver, otp_watch) - otp_watch is a baselined OTPSource,
+            or None if the source is unavailable
+        Raises:
+            Whatever the browser chain raised (a run cannot continue without Chrome)
+        """
+        self._t0 = time.time()
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix="startup") as pool:
+            browser = pool.submit(self._browser_chain)
+            otp = pool.submit(self._otp_chain) if self.warm_otp else None
+            otp_watch = otp.result() if otp else None
+            try:
+                driver = browser.result()
+            except Exception:
+                print("[Startup] ❌ Browser startup failed")
+                if otp_watch is not None:
+                    otp_watch.close()
+                raise
+
+        self.timings["total"] = {
+            "start_offset_seconds": 0.0,
+            "duration_seconds": round(time.time() - self._t0, 3),
+        }
+        self.report()
+        return driver, otp_watch
+
+    def report(self):
+        """Print per-phase timings and the critical path vs. a sequential startup."""
+        sequential = sum(t["duration_seconds"] for name, t in self.timings.items() if name != "total")
+        for name, t in self.timings.items():
+            if name == "total":
+                continue
+            print(f"[Startup] {name:<15} +{t['start_offset_seconds']:6.2f}s  {t['duration_seconds']:6.2f}s")
+        total = self.timings.get("total", {}).get("duration_seconds", 0.0)
+        print(f"[Startup] Critical path {total:.2f}s (sequential would be {sequential:.2f}s)")
@@ -0,0 +1,115 @@
+import json
+
+import pytest
+
+import checkpoints
+from checkpoints import EDIT_HEADLINE, LOGIN, OPEN_PROFILE, RunCheckpoints, StepPolicy
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(checkpoints.time, "sleep", lambda seconds: None)
+
+
+@pytest.fixture
+def journal(tmp_path):
+    return RunCheckpoints(str(tmp_path / "run.checkpoints.json"),
+                          policies={EDIT_HEADLINE: StepPolicy(attempts=3)})
+
+
+class Flaky:
+    """A step that fails the first `failures` calls."""
+
+    def __init__(self, failures, error=RuntimeError):
+        self.failures = failures
+        self.error = error
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise self.error(f"attempt {self.calls}")
+        return "done"
+
+
+def entry(journal, name):
+    return [s for s in journal.journal["steps"] if s["name"] == name][-1]
+
+
+def test_retries_and_recovers_until_the_step_succeeds(journal):
+    step, recovered = Flaky(2), []
+    assert journal.run(EDIT_HEADLINE, step, recover=lambda: recovered.append(True)) == "done"
+    assert step.calls == 3
+    assert len(recovered) == 2
+    assert entry(journal, EDIT_HEADLINE)["status"] == "ok"
+    assert len(entry(journal, EDIT_HEADLINE)["errors"]) == 2
+
+
+def test_gives_up_after_the_policy_attempts(journal):
+    step = Flaky(5)
+    with pytest.raises(RuntimeError, match="attempt 3"):
+        journal.run(EDIT_HEADLINE, step)
+    assert step.calls == 3
+    assert entry(journal, EDIT_HEADLINE)["status"] == "failed"
+
+
+def test_fatal_errors_are_never_retried(journal):
+    step = Flaky(1, error=KeyError)
+    with pytest.raises(KeyError):
+        journal.run(EDIT_HEADLINE, step, fatal=(KeyError,))
+    assert step.calls == 1
+    assert entry(journal, EDIT_HEADLINE)["status"] == "failed"
+
+
+def test_retry_if_can_veto_a_retry(journal):
+    step = Flaky(1)
+    with pytest.raises(RuntimeError):
+        journal.run(EDIT_HEADLINE, step, retry_if=lambda: False)
+    assert step.calls == 1
+
+
+def test_verify_satisfies_a_failed_step(journal):
+    step = Flaky(1)
+    assert journal.run(LOGIN, step, verify=lambda: True) is None
+    assert step.calls == 1
+    assert entry(journal, LOGIN)["status"] == "verified"
+
+
+def test_a_failing_recover_does_not_stop_the_retry(journal):
+    def recover():
+        raise OSError("page gone")
+    assert journal.run(EDIT_HEADLINE, Flaky(1), recover=recover) == "done"
+
+
+def test_unfinished_run_is_resumed(journal):
+    journal.run(LOGIN, lambda: None)
+    journal.run(OPEN_PROFILE, lambda: None)
+    journal.record_otp_request()
+    with pytest.raises(RuntimeError):
+        journal.run(EDIT_HEADLINE, Flaky(5))
+    journal.finish("FAILURE")
+
+    resumed = RunCheckpoints(journal.path)
+    point = resumed.resume_point()
+    assert point["last_step"] == OPEN_PROFILE
+    assert point["otp_requests"] == 1
+    assert resumed.done_before(OPEN_PROFILE)
+    assert not resumed.done_before(EDIT_HEADLINE)
+
+
+def test_success_removes_the_journal(journal, tmp_path):
+    journal.run(LOGIN, lambda: None)
+    details = journal.finish("SUCCESS")
+    assert details["steps"][0]["status"] == "ok"
+    assert RunCheckpoints(journal.path).resume_point() is None
+
+
+def test_stale_journal_is_ignored(journal):
+    journal.run(LOGIN, lambda: None)
+    journal.finish("FAILURE")
+    with open(journal.path) as f:
+        data = json.load(f)
+    data["started_at"] -= 25 * 3600
+    with open(journal.path, "w") as f:
+        json.dump(data, f)
+    assert RunCheckpoints(journal.path, max_age_hours=24).resume_point() is None
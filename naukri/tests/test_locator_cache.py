@@ -0,0 +1,54 @@
+import pytest
+
+from locator_cache import LocatorCache
+
+CANDIDATES = ["#otp", ".otp-input", "input[maxlength='1']"]
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return LocatorCache(str(tmp_path / "locators.json"), max_misses=2)
+
+
+def test_cold_cache_keeps_the_order_and_has_no_hit_rate(cache):
+    assert cache.order("otp", CANDIDATES) == CANDIDATES
+    cache.record("otp", "#otp", "#otp")
+    assert cache.stats() == {"lookups": 1, "cached": 0, "hits": 0, "hit_rate": None}
+
+
+def test_winner_moves_to_the_front(cache):
+    cache.record("otp", ".otp-input", "#otp")
+    assert cache.order("otp", CANDIDATES) == [".otp-input", "#otp", "input[maxlength='1']"]
+
+
+def test_hits_count_only_cached_first_tries(cache):
+    cache.record("otp", ".otp-input", "#otp")
+    first = cache.order("otp", CANDIDATES)[0]
+    cache.record("otp", first, first)
+    assert cache.stats() == {"lookups": 2, "cached": 1, "hits": 1, "hit_rate": 1.0}
+
+
+def test_stale_favourite_is_dropped_after_max_misses(cache):
+    cache.record("otp", ".otp-input", ".otp-input")
+    cache.record("otp", "#otp", ".otp-input")
+    assert ".otp-input" in cache.entries["otp"]
+    cache.record("otp", None, ".otp-input")
+    assert ".otp-input" not in cache.entries["otp"]
+
+
+def test_order_with_a_key(cache):
+    candidates = [("css", "#otp"), ("css", ".otp-input")]
+    cache.record("otp", ".otp-input", "#otp")
+    assert cache.order("otp", candidates, key=lambda c: c[1])[0] == ("css", ".otp-input")
+
+
+def test_old_entries_age_out(cache):
+    cache.record("otp", ".otp-input", "#otp")
+    cache.entries["otp"][".otp-input"]["last_success"] -= cache.max_age_seconds + 1
+    assert cache.order("otp", CANDIDATES) == CANDIDATES
+
+
+def test_save_and_reload(cache):
+    cache.record("otp", ".otp-input", "#otp")
+    cache.save()
+    assert LocatorCache(cache.path).order("otp", CANDIDATES)[0] == ".otp-input"
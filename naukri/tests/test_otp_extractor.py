@@ -0,0 +1,69 @@
+import base64
+from email.message import EmailMessage
+
+import pytest
+
+from otp_extractor import (CONFIDENCE, SNIPPET_CUT_LENGTH, extract_otp, html_to_text,
+                           otp_from_email_message, otp_from_gmail_message)
+
+
+@pytest.mark.parametrize("text, otp, rule", [
+    ("Your OTP is 482913 for login", "482913", "otp_is"),
+    ("OTP: 4821", "4821", "otp_is"),
+    ("735102 is your verification code", "735102", "is_your"),
+    ("Your one-time password: 991820", "991820", "code_is"),
+    ("Please enter below OTP to login. It is valid for the next 30 minutes. 711070", "711070", "otp_near"),
+    ("Use code: 55123 to continue", "55123", "code"),
+    ("Reference 123456", "123456", "bare"),
+])
+def test_each_rule_and_its_confidence(text, otp, rule):
+    assert extract_otp(text) == (otp, CONFIDENCE[rule])
+
+
+def test_strongest_rule_wins_over_earlier_weak_match():
+    text = "Job ID 100200 - your OTP is 654321"
+    assert extract_otp(text) == ("654321", CONFIDENCE["otp_is"])
+
+
+def test_longer_numbers_are_not_codes():
+    assert extract_otp("Call 98765432101 or mail us") == (None, 0.0)
+
+
+def test_no_text():
+    assert extract_otp("") == (None, 0.0)
+    assert extract_otp(None) == (None, 0.0)
+
+
+def test_html_to_text_drops_hidden_markup():
+    markup = "<html><head><title>123456</title></head><style>.a{}</style><p>OTP&nbsp;is <b>246810</b></p></html>"
+    text = html_to_text(markup)
+    assert "123456" not in text
+    assert extract_otp(text) == ("246810", CONFIDENCE["otp_is"])
+
+
+def _b64(text):
+    return base64.urlsafe_b64encode(text.encode("utf-8")).decode("ascii")
+
+
+def test_gmail_snippet_is_enough_when_confident():
+    message = {"snippet": "Your OTP is 112233", "payload": {"mimeType": "text/plain", "body": {"data": "!"}}}
+    assert otp_from_gmail_message(message) == ("112233", CONFIDENCE["otp_is"])
+
+
+def test_gmail_cut_snippet_falls_back_to_body():
+    snippet = ("x " * SNIPPET_CUT_LENGTH) + "OTP is 12"
+    message = {
+        "snippet": snippet,
+        "payload": {"mimeType": "multipart/alternative", "parts": [
+            {"mimeType": "text/html", "body": {"data": _b64("<p>OTP is <b>123456</b></p>")}},
+        ]},
+    }
+    assert otp_from_gmail_message(message) == ("123456", CONFIDENCE["otp_is"])
+
+
+def test_email_message_prefers_plain_text_and_skips_attachments():
+    message = EmailMessage()
+    message.set_content("Your OTP is 778899")
+    message.add_alternative("<p>OTP is 111111</p>", subtype="html")
+    message.add_attachment(b"OTP is 222222", maintype="text", subtype="plain", filename="old.txt")
+    assert otp_from_email_message(message) == ("778899", CONFIDENCE["otp_is"])
@@ -0,0 +1,180 @@
+import time
+import threading
+
+import pytest
+
+import otp_inbox
+from otp_inbox import CLOCK_SKEW_SECONDS, QuotaBudget, SharedInbox
+from otp_sources import OTPSource
+
+
+class Clock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(otp_inbox.time, "time", clock)
+    return clock
+
+
+class NullSource(OTPSource):
+    name = "null"
+    tag = "Null"
+
+    def capture_baseline(self):
+        pass
+
+    def poll_mail(self, timeout):
+        return []
+
+
+def mail(recipient, otp, at):
+    return {"id": otp, "time": at, "sender": "info@naukri.com", "recipients": [recipient], "otp": otp}
+
+
+# -- QuotaBudget -------------------------------------------------------------
+
+def test_budget_starts_full_and_goes_into_debt(clock):
+    budget = QuotaBudget(units_per_second=10, burst=20)
+    assert budget.delay(20) == 0.0
+    budget.spend(30)
+    assert budget.spent == 30
+    # 10 units of debt plus the 5 asked for, at 10 units/s
+    assert budget.delay(5) == pytest.approx(1.5)
+
+
+def test_budget_refills_up_to_burst(clock):
+    budget = QuotaBudget(units_per_second=10, burst=20)
+    budget.spend(20)
+    clock.now += 1
+    assert budget.delay(10) == 0.0
+    assert budget.delay(15) == pytest.approx(0.5)
+    clock.now += 60
+    budget.delay()
+    assert budget.units == 20
+
+
+def test_budget_from_env(monkeypatch):
+    monkeypatch.setenv("OTP_INBOX_QUOTA_UNITS_PER_SECOND", "5")
+    monkeypatch.delenv("OTP_INBOX_QUOTA_BURST", raising=False)
+    budget = QuotaBudget.from_env()
+    assert (budget.rate, budget.burst) == (5.0, 20.0)
+
+
+# -- SharedInbox routing -----------------------------------------------------
+
+@pytest.fixture
+def inbox():
+    return SharedInbox(NullSource(), budget=QuotaBudget(25, 100))
+
+
+def test_routes_by_recipient(inbox, clock):
+    first = inbox.register("Me+One@Gmail.com ")
+    second = inbox.register("me+two@gmail.com")
+    assert inbox._route(mail("me+two@gmail.com", "222222", clock.now + 1))
+    assert inbox._route(mail("me+one@gmail.com", "111111", clock.now + 2))
+    assert first.future.result(0) == ("111111", clock.now + 2)
+    assert second.future.result(0) == ("222222", clock.now + 1)
+    assert inbox.stats()["waiting"] == 0
+
+
+def test_mail_for_nobody_is_not_routed(inbox, clock):
+    waiter = inbox.register("me+one@gmail.com")
+    assert not inbox._route(mail("me+other@gmail.com", "333333", clock.now))
+    assert not waiter.future.done()
+
+
+def test_mail_older_than_the_request_is_not_routed(inbox, clock):
+    waiter = inbox.register("me+one@gmail.com")
+    assert not inbox._route(mail("me+one@gmail.com", "444444", clock.now - CLOCK_SKEW_SECONDS - 1))
+    # Within the clock skew it still counts
+    assert inbox._route(mail("me+one@gmail.com", "555555", clock.now - CLOCK_SKEW_SECONDS / 2))
+    assert waiter.future.result(0)[0] == "555555"
+
+
+def test_newest_request_owns_the_mail(inbox, clock):
+    stale = inbox.register("me+one@gmail.com")
+    clock.now += 30
+    retry = inbox.register("me+one@gmail.com")
+    assert inbox._route(mail("me+one@gmail.com", "666666", clock.now + 1))
+    assert retry.future.result(0)[0] == "666666"
+    assert not stale.future.done()
+
+
+def test_ticket_returns_the_routed_mail(inbox, clock):
+    ticket = inbox.ticket("me+one@gmail.com")
+    ticket.capture_baseline()
+    assert ticket.poll_mail(0) == []
+    inbox._route(mail("me+one@gmail.com", "777777", clock.now))
+    polled = ticket.poll_mail(0)
+    assert [(m["otp"], m["recipients"]) for m in polled] == [("777777", ["me+one@gmail.com"])]
+    ticket.close()
+    assert inbox.stats()["waiting"] == 0
+
+
+# -- watcher -----------------------------------------------------------------
+
+class ScriptedSource(NullSource):
+    """Hands out one batch of mail per poll; the idle re-baseline can be held."""
+
+    def __init__(self, batches=()):
+        super().__init__()
+        self.batches = list(batches)
+        self.baselines = 0
+        self.baselining = threading.Event()
+        self.release = threading.Event()
+        self.release.set()
+
+    def capture_baseline(self):
+        self.baselines += 1
+        if self.baselines > 1:
+            self.baselining.set()
+            self.release.wait(5)
+
+    def poll_mail(self, timeout):
+        return self.batches.pop(0) if self.batches else []
+
+
+def test_sync_wait_returns_none_when_the_inbox_stops(inbox):
+    ticket = inbox.ticket("me+one@gmail.com")
+    ticket.capture_baseline()
+    threading.Timer(0.05, inbox.stop).start()
+    assert ticket.wait_for_otp(max_wait_seconds=5) is None
+
+
+def test_register_waits_for_an_idle_rebaseline_in_flight():
+    source = ScriptedSource()
+    source.release.clear()
+    inbox = SharedInbox(source, budget=QuotaBudget(25, 100), min_interval=0.01).start()
+    try:
+        assert source.baselining.wait(5)
+        registered = threading.Event()
+        threading.Thread(target=lambda: (inbox.register("me@gmail.com"), registered.set()), daemon=True).start()
+        assert not registered.wait(0.2)
+        source.release.set()
+        assert registered.wait(5)
+    finally:
+        source.release.set()
+        inbox.stop()
+
+
+def test_seen_message_ids_are_capped(monkeypatch):
+    monkeypatch.setattr(otp_inbox, "MAX_CACHED_MESSAGES", 3)
+    batch = [{"id": str(i), "time": None, "sender": "x", "recipients": [], "otp": None} for i in range(10)]
+    source = ScriptedSource([batch])
+    inbox = SharedInbox(source, budget=QuotaBudget(25, 100), min_interval=0.01).start()
+    try:
+        inbox.register("me@gmail.com")
+        for _ in range(500):
+            if inbox.stats()["mails"]:
+                break
+            time.sleep(0.01)
+        assert list(inbox.seen) == ["7", "8", "9"]
+    finally:
+        inbox.stop()
@@ -0,0 +1,76 @@
+import time
+import socket
+import threading
+
+import pytest
+
+from otp_sources import IMAPIdleSource
+
+
+class DroppingIMAP:
+    """
+    Bare IMAP server for an empty INBOX that misbehaves in IDLE on the first
+    connection: 'drop' closes the socket, 'silent' never answers DONE.
+    """
+
+    def __init__(self, mode):
+        self.mode = mode
+        self.connections = 0
+        self.server = socket.create_server(("127.0.0.1", 0))
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    @property
+    def port(self):
+        return self.server.getsockname()[1]
+
+    def _accept(self):
+        while True:
+            try:
+                conn, _ = self.server.accept()
+            except OSError:
+                return
+            self.connections += 1
+            threading.Thread(target=self._serve, args=(conn, self.connections == 1), daemon=True).start()
+
+    def _serve(self, conn, misbehave):
+        lines = conn.makefile("rb")
+        conn.sendall(b"* OK [CAPABILITY IMAP4rev1 IDLE] ready\r\n")
+        for line in lines:
+            tag, command = line.split()[:2]
+            command = command.upper()
+            if command == b"CAPABILITY":
+                conn.sendall(b"* CAPABILITY IMAP4rev1 IDLE\r\n")
+            elif command in (b"SELECT", b"EXAMINE"):
+                conn.sendall(b"* 0 EXISTS\r\n* OK [UIDNEXT 1] next\r\n")
+            elif command == b"UID":
+                conn.sendall(b"* SEARCH\r\n")
+            elif command == b"IDLE":
+                conn.sendall(b"+ idling\r\n")
+                if misbehave and self.mode == "drop":
+                    conn.close()
+                    return
+                if misbehave and self.mode == "silent":
+                    lines.readline()
+                    continue
+                lines.readline()
+            conn.sendall(tag + b" OK done\r\n")
+
+    def close(self):
+        self.server.close()
+
+
+@pytest.mark.parametrize("mode", ["drop", "silent"])
+def test_idle_wait_ends_at_the_deadline_and_reconnects(mode):
+    server = DroppingIMAP(mode)
+    source = IMAPIdleSource("127.0.0.1", "user", "password", port=server.port, use_ssl=False)
+    source.ANSWER_GRACE_SECONDS = 0.5
+    try:
+        source.connect()
+        source.capture_baseline()
+        started = time.time()
+        assert source.wait_for_otp(max_wait_seconds=1) is None
+        assert time.time() - started < 1 + source.ANSWER_GRACE_SECONDS + 1
+        assert server.connections == 2
+    finally:
+        source.close()
+        server.close()
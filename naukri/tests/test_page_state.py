@@ -0,0 +1,46 @@
+import pytest
+
+import page_state
+from page_state import (LOGGED_IN, LOGIN_FORM, OTP_INVALID, OTP_REQUIRED, PROFILE_LOADED, RATE_LIMITED,
+                        UNKNOWN, classify_raw)
+
+
+def raw(url="https://www.naukri.com/nlogin/login", keywords=None, indicators=None, otp_inputs=0,
+        login_buttons=0, email_fields=0, password_fields=0, resume_headline=False):
+    """What CLASSIFY_JS returns, with no hits unless given."""
+    found = {state: [] for state in page_state.RULES["keywords"]}
+    found.update(keywords or {})
+    matched = {name: [] for name in page_state.LOGGED_IN_INDICATORS}
+    matched.update(indicators or {})
+    return {"url": url, "title": "Naukri", "keywords": found, "indicators": matched,
+            "otp_inputs": otp_inputs, "login_buttons": login_buttons, "email_fields": email_fields,
+            "password_fields": password_fields, "resume_headline": resume_headline}
+
+
+@pytest.mark.parametrize("page, state", [
+    (raw(keywords={RATE_LIMITED: ["reached max limit"]}, otp_inputs=6), RATE_LIMITED),
+    (raw(keywords={OTP_INVALID: ["invalid otp"], OTP_REQUIRED: ["enter otp"]}), OTP_INVALID),
+    (raw(keywords={OTP_REQUIRED: ["enter otp"]}), OTP_REQUIRED),
+    (raw(otp_inputs=6, password_fields=1), OTP_REQUIRED),
+    (raw(url="https://www.naukri.com/mnjuser/profile", resume_headline=True,
+         indicators={"my_naukri": ["my naukri"]}), PROFILE_LOADED),
+    (raw(url="https://www.naukri.com/mnjuser/profile", indicators={"my_naukri": ["my naukri"]}), LOGGED_IN),
+    (raw(indicators={"naukri360": ["naukri360"]}, password_fields=1), LOGGED_IN),
+    (raw(login_buttons=1, email_fields=1), LOGIN_FORM),
+    (raw(password_fields=1), LOGIN_FORM),
+    (raw(login_buttons=1), UNKNOWN),
+])
+def test_states_in_priority_order(page, state):
+    assert classify_raw(page)["state"] == state
+
+
+def test_evidence_and_flags():
+    result = classify_raw(raw(indicators={"profile_link": ["/mnjuser/homepage"]}, login_buttons=1, email_fields=1))
+    assert result["evidence"] == {"indicators": ["profile_link"]}
+    assert result["indicators"] == {"naukri360": False, "my_naukri": False, "profile_link": True}
+    assert result["login_form"] is True
+
+
+def test_rate_limit_evidence_lists_the_keywords():
+    result = classify_raw(raw(keywords={RATE_LIMITED: ["try after 24 hours", "reached max limit"]}))
+    assert result["evidence"] == {"keywords": ["try after 24 hours", "reached max limit"]}
@@ -0,0 +1,94 @@
+import pytest
+
+import run_coordinator
+from run_coordinator import ATTEMPT, DEFER, SKIP, WINDOW_SECONDS, OTPLedger, RunCoordinator
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    return OTPLedger(str(tmp_path / "ledger.json"), daily_limit=3, cooldown_hours=2)
+
+
+def test_ledger_counts_the_rolling_window(ledger):
+    now = 10 * WINDOW_SECONDS
+    ledger.data["otp_requests"] = [now - WINDOW_SECONDS - 1, now - 3600, now - 60]
+    assert ledger.used(now) == 2
+    assert ledger.remaining(now) == 1
+    assert ledger.next_available(now) == now
+
+
+def test_ledger_next_available_when_used_up(ledger):
+    now = 10 * WINDOW_SECONDS
+    ledger.data["otp_requests"] = [now - 7200, now - 3600, now - 60]
+    assert ledger.remaining(now) == 0
+    # The oldest request has to age out first
+    assert ledger.next_available(now) == now - 7200 + WINDOW_SECONDS
+
+
+def test_ledger_rate_limit_blocks_for_the_cooldown(ledger):
+    ledger.record_rate_limited()
+    blocked_until = ledger.data["blocked_until"]
+    assert ledger.remaining() == 0
+    assert ledger.next_available() == blocked_until
+    assert ledger.remaining(blocked_until + 1) == 3
+
+
+def test_ledger_persists(ledger):
+    ledger.record_otp_request()
+    assert OTPLedger(ledger.path, daily_limit=3).used() == 1
+
+
+@pytest.fixture
+def coordinator(tmp_path, monkeypatch):
+    monkeypatch.delenv("NAUKRI_SESSION_KEY", raising=False)
+    made = []
+
+    def make(reserve=0):
+        coordinator = RunCoordinator("me@example.com", state_dir=str(tmp_path), daily_limit=2,
+                                     reserve=reserve, cooldown_hours=1)
+        made.append(coordinator)
+        return coordinator
+    yield make
+    for coordinator in made:
+        coordinator.finish()
+
+
+def test_begin_attempts_within_budget(coordinator):
+    decision = coordinator().begin()
+    assert decision["action"] == ATTEMPT
+    assert decision["otp_allowed"] is True
+    assert decision["otp_remaining"] == 2
+
+
+def test_begin_defers_without_budget_or_session(coordinator):
+    first = coordinator()
+    first.record_otp_request()
+    first.record_otp_request()
+    decision = first.begin()
+    assert decision["action"] == DEFER
+    assert decision["otp_allowed"] is False
+    assert "retry_at" in decision
+
+
+def test_begin_keeps_the_reserve(coordinator):
+    decision = coordinator(reserve=2).begin()
+    assert decision["action"] == DEFER
+
+
+def test_begin_uses_the_saved_session_when_out_of_budget(coordinator, monkeypatch):
+    class SavedSession:
+        def load(self):
+            return {"cookies": []}
+    monkeypatch.setattr(run_coordinator.SessionStore, "from_env", classmethod(lambda cls, email: SavedSession()))
+    first = coordinator()
+    first.record_rate_limited()
+    decision = first.begin()
+    assert decision["action"] == ATTEMPT
+    assert decision["otp_allowed"] is False
+
+
+def test_begin_skips_while_another_run_holds_the_lock(coordinator):
+    assert coordinator().begin()["action"] == ATTEMPT
+    second = coordinator()
+    assert second.begin()["action"] == SKIP
+    assert second.otp_allowed is False
@@ -0,0 +1,78 @@
+from datetime import datetime
+
+import pytest
+
+from run_history import RunHistory
+
+NOW = datetime(2026, 3, 10, 12, 0).timestamp()
+HOUR = 3600
+
+
+def timeline(*steps):
+    """Spans as in run_status.json: (name, start offset, duration)."""
+    return [{"name": name, "start_offset_seconds": start, "duration_seconds": duration}
+            for name, start, duration in steps]
+
+
+@pytest.fixture
+def history(tmp_path):
+    history = RunHistory(str(tmp_path / "history.db"))
+    yield history
+    history.close()
+
+
+def test_totals_and_rates(history):
+    history.record("me@example.com", "SUCCESS", {"timeline": timeline(("login", 0, 5), ("otp_wait", 1, 3))},
+                   recorded_at=NOW - 2 * HOUR)
+    history.record("me@example.com", "RATE_LIMITED", {"timeline": timeline(("otp_wait", 0, 1))},
+                   recorded_at=NOW - HOUR)
+    history.record("Me@Example.com", "DEFERRED", recorded_at=NOW - HOUR)
+    history.record("other@example.com", "FAILURE", recorded_at=NOW - 30 * HOUR)
+
+    stats = history.stats(now=NOW)
+    totals = stats["totals"]
+    assert (totals["runs"], totals["success"], totals["rate_limited"], totals["deferred"],
+            totals["failure"], totals["otp_requests"]) == (4, 1, 1, 1, 1, 2)
+    # Deferred runs were never attempted
+    assert totals["success_rate"] == round(1 / 3, 3)
+    assert totals["rate_limit_frequency"] == round(1 / 3, 3)
+    assert stats["last_24h"] == {"runs": 3, "otp_requests": 2, "session_reused": 0}
+    assert stats["last_run"]["status"] in ("RATE_LIMITED", "DEFERRED")
+    assert [d["day"] for d in stats["daily"]] == ["2026-03-09", "2026-03-10"]
+
+
+def test_run_duration_spans_the_timeline(history):
+    history.record("me@example.com", "SUCCESS",
+                   {"timeline": timeline(("login", 2, 5), ("save_headline", 10, 2.5)), "session_reused": True},
+                   recorded_at=NOW)
+    stats = history.stats(now=NOW)
+    assert stats["last_run"]["duration_seconds"] == 10.5
+    assert stats["last_24h"]["session_reused"] == 1
+
+
+def test_latency_percentiles(history):
+    for i in range(1, 11):
+        history.record("me@example.com", "SUCCESS", {"timeline": timeline(("login", 0, float(i)))},
+                       recorded_at=NOW - i * 60)
+    history.record("me@example.com", "FAILURE", {"timeline": timeline(("login", 0, 99.0))}, recorded_at=NOW)
+
+    latency = history.stats(now=NOW)["latency"]
+    assert latency["run"] == {"count": 10, "p50": 5.0, "p90": 9.0, "p95": 10.0}
+    # Step timings include every run, not only the successful ones
+    assert latency["steps"]["login"] == {"count": 11, "p50": 6.0, "p90": 10.0, "p95": 10.0}
+
+
+def test_window_excludes_old_runs(history):
+    history.record("me@example.com", "SUCCESS", {"timeline": timeline(("login", 0, 1))},
+                   recorded_at=NOW - 40 * 86400)
+    stats = history.stats(days=30, now=NOW)
+    assert stats["totals"]["runs"] == 0
+    assert stats["totals"]["success_rate"] is None
+    assert stats["latency"] == {"run": None, "steps": {}}
+    assert stats["last_run"] is not None
+
+
+def test_accounts_are_stored_hashed(history):
+    history.record("me@example.com", "SUCCESS", recorded_at=NOW)
+    accounts = [row[0] for row in history.db.execute("SELECT account FROM runs")]
+    assert accounts and "me@example.com" not in accounts[0]
@@ -0,0 +1,180 @@
+import os
+import time
+import threading
+from contextlib import contextmanager
+
+# Histogram buckets for step durations, in seconds
+DURATION_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 90.0)
+
+_active = threading.local()
+
+
+class Span:
+    """One timed step. Call end() when it is done (or use span())."""
+
+    def __init__(self, timeline, name, parent, attrs):
+        self.timeline = timeline
+        self.name = name
+        self.parent = parent
+        self.attrs = attrs
+        self.start = time.time()
+        self.duration = None
+        self.status = None
+
+    def end(self, status="ok", **attrs):
+        """Close the span; extra keyword arguments are stored as attributes."""
+        if self.duration is not None:
+            return
+        self.duration = time.time() - self.start
+        self.status = status
+        self.attrs.update(attrs)
+        self.timeline._close(self)
+
+    def to_dict(self):
+        entry = {
+            "name": self.name,
+            "start_offset_seconds": round(self.start - self.timeline.t0, 3),
+            "duration_seconds": round(self.duration, 3) if self.duration is not None else None,
+            "status": self.status,
+        }
+        if self.parent:
+            entry["parent"] = self.parent
+        entry.update(self.attrs)
+        return entry
+
+
+class Timeline:
+    """
+    Per-run list of timed spans.
+
+    A timeline is activated for the thread that runs an account, so the flow
+    code and the Gmail reader can open spans with span()/start_span()
+    without it being passed around. Spans still open when finish() is called
+    (the step that raised) are closed with the run's status.
+    """
+
+    def __init__(self):
+        self.t0 = time.time()
+        self.spans = []
+        self._open = []
+
+    def begin(self, name, **attrs):
+        parent = self._open[-1].name if self._open else None
+        span = Span(self, name, parent, attrs)
+        self._open.append(span)
+        return span
+
+    def _close(self, span):
+        if span in self._open:
+            self._open.remove(span)
+        self.spans.append(span)
+
+    def add(self, name, start_offset_seconds, duration_seconds, parent=None, **attrs):
+        """Record a span that was measured elsewhere (e.g. the startup phases)."""
+        span = Span(self, name, parent, attrs)
+        span.start = self.t0 + start_offset_seconds
+        span.duration = duration_seconds
+        span.status = "ok"
+        self.spans.append(span)
+
+    def activate(self):
+        """Make this the timeline span() records into on this thread."""
+        _active.timeline = self
+        return self
+
+    def finish(self, status):
+        """Close any open spans and detach the timeline from the thread."""
+        for span in reversed(list(self._open)):
+            span.end(status=status)
+        if getattr(_active, "timeline", None) is self:
+            _active.timeline = None
+
+    def durations(self, name):
+        return [s.duration for s in self.spans if s.name == name and s.duration is not None]
+
+    def to_list(self):
+        """The spans as a timeline sorted by start time."""
+        return [s.to_dict() for s in sorted(self.spans, key=lambda s: s.start)]
+
+    def write_openmetrics(self, path, labels=None):
+        """
+        Write the run as an OpenMetrics text file: a step-duration histogram
+        per span name, the OTP wait time and the total run time.
+
+        Args:
+            path: File to write
+            labels: Labels added to every sample (e.g. account, status)
+        """
+        labels = labels or {}
+        lines = [
+            "# TYPE naukri_step_duration_seconds histogram",
+            "# UNIT naukri_step_duration_seconds seconds",
+            "# HELP naukri_step_duration_seconds Duration of each step of a run.",
+        ]
+        for name in sorted({s.name for s in self.spans}):
+            durations = self.durations(name)
+            step_labels = {**labels, "step": name}
+            for bound in DURATION_BUCKETS:
+                count = sum(1 for d in durations if d <= bound)
+                lines.append(f"naukri_step_duration_seconds_bucket{_labels({**step_labels, 'le': str(bound)})} {count}")
+            lines.append(f"naukri_step_duration_seconds_bucket{_labels({**step_labels, 'le': '+Inf'})} {len(durations)}")
+            lines.append(f"naukri_step_duration_seconds_count{_labels(step_labels)} {len(durations)}")
+            lines.append(f"naukri_step_duration_seconds_sum{_labels(step_labels)} {sum(durations):.3f}")
+
+        lines += [
+            "# TYPE naukri_otp_wait_seconds gauge",
+            "# UNIT naukri_otp_wait_seconds seconds",
+            "# HELP naukri_otp_wait_seconds Time from OTP prompt to OTP received from Gmail.",
+        ]
+        otp_waits = self.durations("otp_wait")
+        if otp_waits:
+            lines.append(f"naukri_otp_wait_seconds{_labels(labels)} {sum(otp_waits):.3f}")
+
+        lines += [
+            "# TYPE naukri_run_duration_seconds gauge",
+            "# UNIT naukri_run_duration_seconds seconds",
+            "# HELP naukri_run_duration_seconds Wall time of the account run.",
+            f"naukri_run_duration_seconds{_labels(labels)} {time.time() - self.t0:.3f}",
+            "# EOF",
+        ]
+        try:
+            with open(path, "w") as f:
+                f.write("\n".join(lines) + "\n")
+            print(f"[Timing] OpenMetrics written to {path}")
+        except OSError as e:
+            print(f"[Timing] Could not write {path}: {e}")
+
+
+class _NoSpan:
+    """Stand-in when no timeline is active on this thread."""
+
+    def end(self, status="ok", **attrs):
+        pass
+
+
+def start_span(name, **attrs):
+    """Open a span on the current thread's timeline (no-op if there is none)."""
+    timeline = getattr(_active, "timeline", None)
+    return timeline.begin(name, **attrs) if timeline else _NoSpan()
+
+
+@contextmanager
+def span(name, **attrs):
+    """Time a block; an exception marks the span as 'error' and propagates."""
+    current = start_span(name, **attrs)
+    try:
+        yield current
+    except BaseException as e:
+        current.end(status="error", error=type(e).__name__)
+        raise
+    current.end()
+
+
+def metrics_enabled():
+    return os.environ.get("METRICS_EXPORT", "false").lower() == "true"
+
+
+def _labels(labels):
+    def escape(value):
+        return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{escape(v)}"' for k, v in labels.items()) + "}" if labels else ""
@@ -1,7 +1,8 @@
 import os
+import re
 import sys
-import time
 import json
+import argparse
 import traceback
 from datetime import datetime
 from dotenv import load_dotenv
@@ -12,45 +13,113 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.keys import Keys
-from webdriver_manager.chrome import ChromeDriverManager
 from gmail_otp_reader import get_otp_from_gmail
+from waits import PageWaits
+from session_store import SessionStore
+from driver_resolver import DriverResolver
+from screenshots import ScreenshotPipeline
+from form_fill import fill_fields
+from otp_sources import start_otp_source
+from otp_discovery import OTP_INPUT_SELECTORS, VERIFY_CANDIDATES, discover_otp_controls, wait_for_otp_controls
+from locator_cache import get_locator_cache
+from resource_blocker import ResourceBlocker
+from timing import Timeline, metrics_enabled, span, start_span
+from run_coordinator import ATTEMPT, SKIP, RunCoordinator
+from run_history import record_run
+from checkpoints import EDIT_HEADLINE, LOGIN, OPEN_PROFILE, SAVE_HEADLINE, RunCheckpoints
+from page_state import (
+    INVALID_OTP_KEYWORDS,
+    LOGIN_FORM,
+    OTP_INVALID,
+    OTP_TEXT_KEYWORDS,
+    RATE_LIMIT_KEYWORDS,
+    RATE_LIMITED,
+    classify_page,
+)
+from startup import StartupPipeline
 
-# Load credentials from .env file
-load_dotenv()
-email = os.environ.get("NAUKRI_EMAIL")
-password = os.environ.get("NAUKRI_PASSWORD")
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/144.0.0.0 Safari/537.36'
+# NAUKRI_BASE_URL points the bot at another site (e.g. the benchmark's fake Naukri)
+NAUKRI_BASE_URL = os.environ.get("NAUKRI_BASE_URL", "https://www.naukri.com").rstrip("/")
+LOGIN_URL = f"{NAUKRI_BASE_URL}/mnjuser/login"
+PROFILE_URL = f"{NAUKRI_BASE_URL}/mnjuser/profile"
 
-# Validate credentials
-if not email or not password:
-    print("[ERROR] Missing credentials!")
-    print("Please create a .env file with:")
-    print("NAUKRI_EMAIL=your_email@example.com")
-    print("NAUKRI_PASSWORD=your_password")
-    exit(1)
+HEADLINE_TEXT = (
+    "Experienced Sr. Software Development Engineer. Expert in Backend Development, Microservices, Agile, Java, SpringBoot, Redis, Kafka, MySQL, Python, Jenkins, Git, AWS, HTML, CSS, JS, Golang, Mongo, CI/CD, AI, MCP, RAG, Agentic AI, Databases, GenAI"
+)
+
+# Resume headline controls on the profile page
+HEADLINE_EDIT_XPATH = "//span[text()='Resume headline']/following-sibling::span[contains(@class, 'edit')]"
+SAVE_BUTTON_XPATH = "//button[text()='Save']"
+
+# The headline editor closes (or a success toast appears) once Naukri has saved
+SAVE_CONFIRMED_JS = (
+    "(function() { var t = document.getElementById('resumeHeadlineTxt');"
+    " return !t || t.offsetParent === null ||"
+    " (document.body.innerText || '').toLowerCase().indexOf('success') !== -1; })()"
+)
+
+
+class RateLimitedError(Exception):
+    """Naukri refused to send an OTP because the daily limit was reached."""
+
+
+class OTPBudgetExhausted(Exception):
+    """A fresh login is needed but the account's OTP budget is used up."""
+
+
+def validate_credentials(email, password):
+    """
+    Check an email/password pair before launching a browser.
+    Returns an error message, or None if the credentials look usable.
+    """
+    if not email or not password:
+        return "Missing credentials"
+
+    # Security: Basic email format validation
+    if not re.match(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$', email):
+        return f"Invalid email format: {email}"
+
+    # Security: Validate password strength (minimum length)
+    if len(password) < 8:
+        print("[WARNING] Password is very short. Consider using a stronger password.")
+        print("[INFO] Continuing anyway...")
+    return None
+
+
+def write_budget_status(log_dir, decision, account=None):
+    """
+    Record a run the coordinator decided not to attempt (no browser was launched).
+
+    Returns:
+        str: DEFERRED or SKIPPED
+    """
+    status = "SKIPPED" if decision["action"] == SKIP else "DEFERRED"
+    write_status_summary(
+        log_dir,
+        status=status,
+        message=f"Run not attempted: {decision['reason']}",
+        details={"budget": decision, "expected": True},
+        account=account
+    )
+    return status
+
+
+def make_log_dir(base_dir="Logs Screenshot"):
+    """Create a timestamped folder for screenshots and run_status.json."""
+    timestamp = datetime.now().strftime("%d-%m-%y_%I-%M_%p")
+    log_dir = os.path.join(base_dir, timestamp)
+    os.makedirs(log_dir, exist_ok=True)
+    print(f"[INFO] Screenshots will be saved in: {log_dir}")
+    return log_dir
 
-# Security: Basic email format validation
-import re
-if not re.match(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$', email):
-    print(f"[ERROR] Invalid email format: {email}")
-    print("Please provide a valid email address")
-    exit(1)
-
-# Security: Validate password strength (minimum length)
-if len(password) < 8:
-    print("[WARNING] Password is very short. Consider using a stronger password.")
-    print("[INFO] Continuing anyway...")
-
-# Create timestamped folder for screenshots
-timestamp = datetime.now().strftime("%d-%m-%y_%I-%M_%p")
-log_dir = os.path.join("Logs Screenshot", timestamp)
-os.makedirs(log_dir, exist_ok=True)
-print(f"[INFO] Screenshots will be saved in: {log_dir}")
 
 # Function to write status summary for dashboard
-def write_status_summary(status, message, details=None):
+def write_status_summary(log_dir, status, message, details=None, account=None):
     """
     Write a status summary file that can be read by the dashboard
-    Status can be: SUCCESS, RATE_LIMITED, FAILURE, OTP_FAILED, LOGIN_FAILED
+    Status can be: SUCCESS, RATE_LIMITED, DEFERRED, SKIPPED, FAILURE, OTP_FAILED, LOGIN_FAILED
+    When account is given the run is also added to the run history.
     """
     status_data = {
         "status": status,
@@ -66,282 +135,251 @@ def write_status_summary(status, message, details=None):
         print(f"[STATUS] Written to {status_file}: {status}")
     except Exception as e:
         print(f"[WARN] Could not write status file: {e}")
+    if account:
+        record_run(account, status, status_data["details"])
+
+
+def create_driver(headless=None, driver_path=None):
+    """
+    Launch Chrome with the anti-detection options and the wait helpers installed.
+
+    Args:
+        headless: Run without a visible window (defaults to the HEADLESS env var)
+        driver_path: ChromeDriver binary to use (resolved via DriverResolver if omitted)
+    """
+    # Chrome options with anti-detection
+    options = Options()
+
+    # Check if headless mode is requested (via env variable or for server deployment)
+    if headless is None:
+        headless = os.environ.get("HEADLESS", "false").lower() == "true"
+    if headless:
+        options.add_argument("--headless=new")
+        print("[INFO] Running in headless mode (no visible browser)")
+    else:
+        print("[INFO] Running with visible browser")
+
+    # Anti-detection measures
+    options.add_argument("--disable-blink-features=AutomationControlled")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--window-size=1920,1080")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument(f"--user-agent={USER_AGENT}")
+
+    # Additional anti-bot detection
+    options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    options.add_experimental_option('useAutomationExtension', False)
+
+    # Network log for the per-page request/byte report (lean mode or NETWORK_REPORT only)
+    ResourceBlocker.configure_options(options)
+
+    if not driver_path:
+        driver_path = DriverResolver().resolve()
+
+    # Logging
+    service = Service(driver_path)
+    service.log_path = "chromedriver.log"
+    service.service_args = ["--verbose"]
+
+    # Driver
+    driver = webdriver.Chrome(service=service, options=options)
+    PageWaits(driver).install()
+    if ResourceBlocker.enabled():
+        ResourceBlocker.from_env(driver).install()
+
+    # Remove webdriver property to avoid detection
+    driver.execute_cdp_cmd('Network.setUserAgentOverride', {"userAgent": USER_AGENT})
+    driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+    return driver
+
+
+def reset_browser_context(driver):
+    """
+    Wipe cookies, cache and site storage so the next account starts from a clean
+    browser without paying for a Chrome relaunch.
+    """
+    driver.get("about:blank")
+    driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+    driver.execute_cdp_cmd('Network.clearBrowserCache', {})
+    driver.execute_cdp_cmd('Storage.clearDataForOrigin', {
+        'origin': NAUKRI_BASE_URL,
+        'storageTypes': 'local_storage,session_storage,indexeddb,cache_storage,service_workers',
+    })
+
+
+def login(driver, email, password, shots, otp_watch=None, coordinator=None, checkpoints=None):
+    """
+    Full credential login, including OTP verification via the configured
+    OTP source (otp_sources.py).
+
+    Args:
+        otp_watch: OTP source already baselined during startup (skips the
+            mailbox connection here); closed when login returns or raises
+        coordinator: RunCoordinator the OTP is counted against (budget)
+        checkpoints: RunCheckpoints the OTP is counted against (this update)
+
+    Raises RateLimitedError if Naukri refuses to send an OTP, or another
+    exception if the login could not be verified.
+    """
+    wait = WebDriverWait(driver, 20)
+    waits = PageWaits(driver)
+    # Last-known-good locators are tried first
+    locators = get_locator_cache()
+    input_selectors = locators.order("otp_input", OTP_INPUT_SELECTORS)
+    verify_candidates = locators.order("verify_button", VERIFY_CANDIDATES, key=lambda c: c['name'])
 
-# Print ChromeDriver info only (skip broken chrome version detection on Windows)
-print("ChromeDriver path (via webdriver-manager):")
-print(ChromeDriverManager().install())
-
-# Chrome options with anti-detection
-options = Options()
-
-# Check if headless mode is requested (via env variable or for server deployment)
-headless = os.environ.get("HEADLESS", "false").lower() == "true"
-if headless:
-    options.add_argument("--headless=new")
-    print("[INFO] Running in headless mode (no visible browser)")
-else:
-    print("[INFO] Running with visible browser")
-
-# Anti-detection measures
-options.add_argument("--disable-blink-features=AutomationControlled")
-options.add_argument("--disable-gpu")
-options.add_argument("--window-size=1920,1080")
-options.add_argument("--no-sandbox")
-options.add_argument("--disable-dev-shm-usage")
-options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/144.0.0.0 Safari/537.36")
-
-# Additional anti-bot detection
-options.add_experimental_option("excludeSwitches", ["enable-automation"])
-options.add_experimental_option('useAutomationExtension', False)
-
-# Logging
-service = Service(ChromeDriverManager().install())
-service.log_path = "chromedriver.log"
-service.service_args = ["--verbose"]
-
-# Driver
-driver = webdriver.Chrome(service=service, options=options)
-wait = WebDriverWait(driver, 20)
-
-# Remove webdriver property to avoid detection
-driver.execute_cdp_cmd('Network.setUserAgentOverride', {
-    "userAgent": 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/144.0.0.0 Safari/537.36'
-})
-driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-
-try:
     # Step 1: Login
-    driver.get("https://www.naukri.com/mnjuser/login")
-    time.sleep(8)
-    driver.save_screenshot(os.path.join(log_dir, "step_1_login_page.png"))
-
-    # Wait for and fill email field with explicit click
-    print("[🔍] Locating email field...")
-    print(f"[DEBUG] Current URL: {driver.current_url}")
-    print(f"[DEBUG] Page title: {driver.title}")
-    email_field = wait.until(EC.element_to_be_clickable((By.ID, "usernameField")))
-    email_field.click()
-    time.sleep(1)
-    email_field.clear()
-    email_field.send_keys(email)
-    print("[✓] Email entered")
+    try:
+        step = start_span("login_page")
+        driver.get(LOGIN_URL)
+        waits.page_loaded()
+        shots.capture("step_1_login_page")
+
+        # Wait for and fill email field with explicit click
+        print("[🔍] Locating email field...")
+        print(f"[DEBUG] Current URL: {driver.current_url}")
+        print(f"[DEBUG] Page title: {driver.title}")
+        email_field = wait.until(EC.element_to_be_clickable((By.ID, "usernameField")))
+        password_field = wait.until(EC.element_to_be_clickable((By.ID, "passwordField")))
+        step.end()
     
-    # Fill password field
-    password_field = wait.until(EC.element_to_be_clickable((By.ID, "passwordField")))
-    password_field.click()
-    time.sleep(1)
-    password_field.clear()
-    password_field.send_keys(password)
-    print("[✓] Password entered")
+        step = start_span("credentials_fill")
+        # Fill both credential fields in one operation
+        fill_fields(driver, [(email_field, email), (password_field, password)])
+        print("[✓] Email and password entered")
     
-    driver.save_screenshot(os.path.join(log_dir, "step_1_credentials_filled.png"))
+        shots.capture("step_1_credentials_filled")
+        step.end()
     
-    # Click login button
-    login_btn = wait.until(EC.element_to_be_clickable((By.XPATH, "//button[@type='submit']")))
-    login_btn.click()
-    time.sleep(8)
-    print("[✓] Login button clicked")
-    driver.save_screenshot(os.path.join(log_dir, "step_1_after_login_click.png"))
+        # Click login button
+        step = start_span("login_submit")
+        login_btn = wait.until(EC.element_to_be_clickable((By.XPATH, "//button[@type='submit']")))
+        # Baseline the inbox before the OTP is triggered so only newer mail counts
+        if otp_watch is None:
+            otp_watch = start_otp_source(email)
+        login_url = driver.current_url
+        login_btn.click()
+        # Wait for the login to resolve: redirect, OTP prompt, or rate-limit message
+        waits.js_condition(
+            f"location.href !== {json.dumps(login_url)} || "
+            "document.querySelector(\"input[maxlength='1']\") !== null || "
+            f"{json.dumps(OTP_TEXT_KEYWORDS + RATE_LIMIT_KEYWORDS)}.some(function(k) {{ "
+            "return (document.body.innerText || '').toLowerCase().indexOf(k) !== -1; })",
+            timeout=20, description="login response")
+        waits.page_loaded()
+        print("[✓] Login button clicked")
+        shots.capture("step_1_after_login_click")
+        step.end()
+    except BaseException:
+        # The OTP step below never ran, so release the mailbox (or shared inbox slot) here
+        if otp_watch is not None:
+            otp_watch.close()
+        raise
     
     # Check if OTP is required
+    step = start_span("otp_detect")
     try:
         print("[🔍] Checking for OTP prompt...")
-        print(f"[DEBUG] Current URL after login: {driver.current_url}")
-        print(f"[DEBUG] Page title after login: {driver.title}")
-        
-        # Check if page content contains OTP-related text
-        page_source = driver.page_source.lower()
+        # One in-page classification instead of pulling the whole page source
+        page = classify_page(driver)
+        print(f"[DEBUG] Current URL after login: {page['url']}")
+        print(f"[DEBUG] Page title after login: {page['title']}")
+        print(f"[DEBUG] Page state: {page['state']} {page['evidence']}")
         
         # Check for rate limiting first
-        rate_limit_keywords = [
-            'max limit to generate otp',
-            'reached max limit',
-            'try after 24 hours',
-            'too many otp requests',
-            'otp limit exceeded'
-        ]
-        
-        is_rate_limited = any(keyword in page_source for keyword in rate_limit_keywords)
-        
-        if is_rate_limited:
+        if page['state'] == RATE_LIMITED:
             print("[OTP] 🚫 RATE LIMITED!")
             print("[OTP] Naukri has blocked OTP generation due to too many requests.")
             print("[OTP] This is expected when testing frequently.")
             print("[OTP] The bot will try again on the next scheduled run (6 hours).")
-            driver.save_screenshot(os.path.join(log_dir, "step_1_otp_rate_limited.png"))
+            shots.capture("step_1_otp_rate_limited", failure=True)
             
-            # Write status summary
-            write_status_summary(
-                status="RATE_LIMITED",
-                message="Naukri rate limited OTP requests. Will retry in next scheduled run.",
-                details={"retry_in": "6 hours", "expected": True}
-            )
-            
-            # Exit gracefully - this is not a failure, just need to wait
-            print("[INFO] Exiting gracefully - will retry on next schedule")
-            driver.quit()
-            print("[INFO] Browser closed.")
-            sys.exit(0)  # Exit with success code since this is expected behavior
+            # Not a failure, just need to wait - run_account records the status
+            raise RateLimitedError("Naukri rate limited OTP requests")
         
-        has_otp_text = any(text in page_source for text in ['enter the otp', 'enter otp', 'otp sent', 'verification code', 'otp to login'])
+        has_otp_text = bool(page['keywords']['otp_required'])
         
         print(f"[DEBUG] OTP-related text in page: {has_otp_text}")
         
-        # Look for OTP input fields - try multiple selectors
-        otp_present = False
-        otp_inputs = []
-        
-        # Common OTP field patterns - try them all
-        otp_selectors = [
-            "input[type='text'][maxlength='1']",  # Individual digit boxes
-            "input[type='tel'][maxlength='1']",    # Tel input with maxlength 1
-            "input[placeholder*='OTP' i]",         # OTP placeholder
-            "input[id*='otp' i]",                  # OTP in ID
-            "input[name*='otp' i]",                # OTP in name
-            "input[class*='otp' i]",               # OTP in class
-        ]
-        
-        for selector in otp_selectors:
-            try:
-                elements = driver.find_elements(By.CSS_SELECTOR, selector)
-                if elements and len(elements) > 0:
-                    # Filter out hidden elements
-                    visible_elements = [el for el in elements if el.is_displayed()]
-                    if visible_elements:
-                        otp_inputs = visible_elements
-                        otp_present = True
-                        print(f"[OTP] Found {len(visible_elements)} visible OTP input fields using selector: {selector}")
-                        break
-            except Exception as e:
-                print(f"[DEBUG] Error with selector {selector}: {str(e)}")
-                continue
-        
-        # If we found OTP text but no inputs, wait a bit more for page to load
-        if has_otp_text and not otp_present:
-            print("[OTP] OTP text found but inputs not detected yet, waiting for page to load...")
-            time.sleep(5)  # Increased wait time
-            
-            # Take a screenshot to see what's on the page
-            driver.save_screenshot(os.path.join(log_dir, "step_1_otp_page_loading.png"))
-            
-            # Try again with extended timeout
-            for selector in otp_selectors:
-                try:
-                    elements = driver.find_elements(By.CSS_SELECTOR, selector)
-                    if elements:
-                        visible_elements = [el for el in elements if el.is_displayed()]
-                        if visible_elements:
-                            otp_inputs = visible_elements
-                            otp_present = True
-                            print(f"[OTP] Found {len(visible_elements)} OTP fields on retry")
-                            break
-                except:
-                    continue
-            
-            # If still not found, try waiting for the input to appear
-            if not otp_present:
-                print("[OTP] Still not found - trying explicit wait...")
-                try:
-                    wait = WebDriverWait(driver, 10)
-                    otp_input = wait.until(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, "input[type='text'][maxlength='1'], input[type='tel'][maxlength='1']"))
-                    )
-                    otp_inputs = driver.find_elements(By.CSS_SELECTOR, "input[type='text'][maxlength='1'], input[type='tel'][maxlength='1']")
-                    otp_present = True
-                    print(f"[OTP] Found {len(otp_inputs)} OTP fields via explicit wait")
-                except Exception as wait_err:
-                    print(f"[OTP] ❌ Explicit wait failed: {str(wait_err)}")
-                    driver.save_screenshot(os.path.join(log_dir, "step_1_otp_inputs_not_found.png"))
+        # Look for OTP inputs - every candidate selector in one in-page pass,
+        # waiting (on that single combined check) only when the page says OTP
+        controls = wait_for_otp_controls(driver, timeout=10 if has_otp_text else 0,
+                                         input_selectors=input_selectors)
+        otp_inputs = controls['inputs']
+        otp_present = bool(otp_inputs)
+        if otp_present or has_otp_text:
+            locators.record("otp_input", controls['input_selector'], input_selectors[0])
+        if otp_present:
+            print(f"[OTP] Found {len(otp_inputs)} visible OTP input fields using selector: {controls['input_selector']}")
+        elif has_otp_text:
+            print("[OTP] ❌ OTP text found but no OTP inputs appeared")
+            shots.capture("step_1_otp_inputs_not_found", failure=True)
         
+        step.end(otp_required=otp_present or has_otp_text)
+        if (otp_present or has_otp_text) and coordinator:
+            coordinator.record_otp_request()
+        if (otp_present or has_otp_text) and checkpoints:
+            checkpoints.record_otp_request()
         if otp_present or has_otp_text:
             print("[OTP] ⚠️  OTP verification required!")
-            driver.save_screenshot(os.path.join(log_dir, "step_1_otp_prompt.png"))
+            shots.capture("step_1_otp_prompt")
             
-            # Get OTP from Gmail
-            print("[OTP] Fetching OTP from Gmail API...")
-            otp_code = get_otp_from_gmail(sender_filter="naukri.com", max_wait_seconds=90)
+            # Get OTP from the mailbox
+            source_name = otp_watch.name if otp_watch else "gmail_api"
+            print(f"[OTP] Fetching OTP via {source_name}...")
+            with span("otp_wait", source=source_name) as otp_span:
+                if otp_watch:
+                    otp_code = otp_watch.wait_for_otp(sender_filter="naukri.com", max_wait_seconds=90)
+                else:
+                    otp_code = get_otp_from_gmail(sender_filter="naukri.com", max_wait_seconds=90)
+                otp_span.end(status="ok" if otp_code else "timeout")
             
             if not otp_code:
-                raise Exception("Failed to retrieve OTP from Gmail - check Gmail API credentials")
+                raise Exception(f"Failed to retrieve OTP via {source_name} - check the OTP source credentials")
             
             print(f"[OTP] ✓ Received OTP: {otp_code}")
             
+            step = start_span("otp_entry")
             # Re-fetch OTP inputs in case page structure changed
-            time.sleep(1)
-            for selector in otp_selectors:
-                try:
-                    elements = driver.find_elements(By.CSS_SELECTOR, selector)
-                    if elements:
-                        visible_elements = [el for el in elements if el.is_displayed()]
-                        if visible_elements:
-                            otp_inputs = visible_elements
-                            break
-                except:
-                    continue
-            
-            # Enter OTP
-            if not otp_inputs:
-                # If still no inputs found, try a more generic approach
-                print("[OTP] Trying to find OTP inputs more generically...")
-                all_inputs = driver.find_elements(By.CSS_SELECTOR, "input[type='text'], input[type='tel']")
-                visible_inputs = [inp for inp in all_inputs if inp.is_displayed() and inp.get_attribute('maxlength') == '1']
-                if visible_inputs:
-                    otp_inputs = visible_inputs
-                    print(f"[OTP] Found {len(otp_inputs)} generic OTP fields")
+            controls = discover_otp_controls(driver, input_selectors=input_selectors)
+            if controls['inputs']:
+                otp_inputs = controls['inputs']
             
             if len(otp_inputs) >= 6 and len(otp_code) == 6:
                 # Multiple input boxes (one digit each) - Naukri's style
                 print(f"[OTP] Entering OTP in {len(otp_inputs)} separate fields...")
-                for i, digit in enumerate(otp_code):
-                    if i < len(otp_inputs):
-                        try:
-                            # Click to focus
-                            otp_inputs[i].click()
-                            time.sleep(0.3)
-                            # Clear and enter
-                            otp_inputs[i].clear()
-                            otp_inputs[i].send_keys(digit)
-                            print(f"[OTP] Entered digit {i+1}")
-                            time.sleep(0.5)
-                        except Exception as e:
-                            print(f"[OTP] Error entering digit {i+1}: {str(e)}")
+                try:
+                    fill_fields(driver, list(zip(otp_inputs, otp_code)))
+                except Exception as e:
+                    print(f"[OTP] Error entering digits: {str(e)}")
             elif otp_inputs:
                 # Single input box fallback
                 print("[OTP] Entering OTP in single field...")
-                otp_inputs[0].click()
-                time.sleep(0.5)
-                otp_inputs[0].clear()
-                otp_inputs[0].send_keys(otp_code)
+                fill_fields(driver, [(otp_inputs[0], otp_code)])
             else:
                 print("[OTP] ⚠️  No OTP input fields found - trying direct page interaction")
-                # Last resort - try to find any input and send keys
-                time.sleep(2)
+                # Last resort - give the page a moment to render the inputs
+                waits.network_idle(timeout=2)
             
             print("[OTP] OTP entered, saving screenshot...")
-            driver.save_screenshot(os.path.join(log_dir, "step_1_otp_entered.png"))
+            shots.capture("step_1_otp_entered")
+            step.end()
             
-            # Click verify/submit button
-            time.sleep(2)
+            step = start_span("otp_verify")
+            # Click verify/submit button - one combined wait for the best candidate
+            controls = wait_for_otp_controls(driver, timeout=3, need_inputs=False, need_submit=True,
+                                             input_selectors=input_selectors,
+                                             verify_candidates=verify_candidates)
+            locators.record("verify_button", controls['submit_selector'], verify_candidates[0]['name'])
             verify_button_found = False
-            verify_selectors = [
-                "//button[contains(translate(text(), 'VERIFY', 'verify'), 'verify')]",
-                "//button[contains(translate(text(), 'SUBMIT', 'submit'), 'submit')]",
-                "//button[contains(translate(text(), 'CONTINUE', 'continue'), 'continue')]",
-                "//button[@type='submit']",
-                "//input[@type='submit']",
-            ]
-            
-            for selector in verify_selectors:
+            if controls['submit'] is not None:
                 try:
-                    verify_btn = WebDriverWait(driver, 3).until(
-                        EC.element_to_be_clickable((By.XPATH, selector))
-                    )
-                    verify_btn.click()
-                    print(f"[OTP] Verify button clicked using selector: {selector}")
+                    controls['submit'].click()
+                    print(f"[OTP] Verify button clicked using selector: {controls['submit_selector']}")
                     verify_button_found = True
-                    break
-                except:
-                    continue
+                except Exception as e:
+                    print(f"[OTP] Could not click verify button: {str(e)}")
             
             if not verify_button_found:
                 print("[OTP] No verify button found - OTP might auto-submit")
@@ -353,36 +391,41 @@ try:
                     except:
                         pass
             
-            time.sleep(8)
-            driver.save_screenshot(os.path.join(log_dir, "step_1_after_otp_verification.png"))
+            # Wait until we leave the login page or the site reports a bad OTP
+            waits.js_condition(
+                "location.href.toLowerCase().indexOf('login') === -1 || "
+                f"{json.dumps(INVALID_OTP_KEYWORDS)}.some(function(k) {{ "
+                "return (document.body.innerText || '').toLowerCase().indexOf(k) !== -1; })",
+                timeout=20, description="OTP verification result")
+            waits.page_loaded()
+            shots.capture("step_1_after_otp_verification")
             print(f"[DEBUG] URL after OTP: {driver.current_url}")
             print(f"[DEBUG] Title after OTP: {driver.title}")
             
             # Check if we're actually logged in
             if "login" in driver.current_url.lower():
                 print("[OTP] ⚠️  Still on login page after OTP - verification may have failed")
-                driver.save_screenshot(os.path.join(log_dir, "step_1_otp_verification_failed.png"))
+                shots.capture("step_1_otp_verification_failed", failure=True)
                 
                 # Double-check if we're really stuck or just redirecting
-                time.sleep(3)
-                if "login" in driver.current_url.lower():
+                if not waits.url_lacks("login", timeout=5):
                     # Check if there's an error message
-                    page_text = driver.page_source.lower()
-                    if any(err in page_text for err in ['invalid otp', 'incorrect otp', 'otp expired', 'otp is invalid']):
+                    if classify_page(driver)['state'] == OTP_INVALID:
                         print("[OTP] ❌ OTP verification failed - invalid/expired OTP")
                         raise Exception("OTP verification failed - invalid/expired OTP")
                     else:
                         print("[OTP] ⚠️  Still on login page but no error - page might be loading slowly")
             else:
                 print("[✓] OTP verification completed successfully")
+            step.end()
         else:
             print("[OTP] ℹ️  No OTP fields detected")
-            print(f"[DEBUG] Checked {len(otp_selectors)} different OTP selectors")
+            print(f"[DEBUG] Checked {len(OTP_INPUT_SELECTORS)} different OTP selectors")
             print(f"[DEBUG] Has OTP text on page: {has_otp_text}")
             
             # Check if we might be logged in already
-            page_source_check = driver.page_source.lower()
-            if any(indicator in page_source_check for indicator in ['naukri360', 'my naukri', 'mynaukri']):
+            indicators = classify_page(driver)['indicators']
+            if indicators['naukri360'] or indicators['my_naukri']:
                 print("[OTP] ✅ No OTP required - looks like you're already logged in (existing session)")
             elif "login" in driver.current_url.lower():
                 print("[OTP] ⚠️  WARNING: Still on login page but no OTP detected!")
@@ -392,51 +435,45 @@ try:
             else:
                 print("[OTP] ✅ No OTP required - login successful")
     
+    except RateLimitedError:
+        step.end(status="rate_limited")
+        raise
     except Exception as otp_error:
+        step.end(status="error", error=type(otp_error).__name__)
         print(f"[OTP] ❌ OTP handling error: {str(otp_error)}")
         print(f"[OTP] Traceback: {traceback.format_exc()}")
-        driver.save_screenshot(os.path.join(log_dir, "step_1_otp_error.png"))
+        shots.capture("step_1_otp_error", failure=True)
         print("[OTP] Continuing anyway...")
+    finally:
+        # Whether or not an OTP was needed, release the mailbox (or shared inbox slot)
+        if otp_watch is not None:
+            otp_watch.close()
     
     # Verify login was successful
+    step = start_span("login_verify")
     print("[🔍] Verifying login status...")
-    time.sleep(3)
+    waits.page_loaded()
     current_url = driver.current_url
     print(f"[DEBUG] Final URL after login: {current_url}")
     
     # First, check if we're STILL on the login submission page (not redirected at all)
     is_stuck_on_login = "nlogin/login" in current_url.lower() and "URL=" in current_url
     
+    page = classify_page(driver)
+    
     if is_stuck_on_login:
         print("[⚠️] Still on login/OTP page - checking if actually logged in...")
-        driver.save_screenshot(os.path.join(log_dir, "step_1_login_page_check.png"))
+        shots.capture("step_1_login_page_check")
         
-        # Look for login FORM elements - if present, we definitely failed
-        try:
-            login_button = driver.find_elements(By.XPATH, "//button[contains(text(), 'Login') or contains(text(), 'login')]")
-            email_field = driver.find_elements(By.CSS_SELECTOR, "input[placeholder*='Email' i], input[placeholder*='email' i]")
-            password_field = driver.find_elements(By.CSS_SELECTOR, "input[type='password']")
-            
-            # If we can still see the login form, we're definitely not logged in
-            if (login_button and email_field) or password_field:
-                print("[ERROR] ❌ Login form still visible - login/OTP failed!")
-                print(f"[DEBUG] Login button found: {len(login_button) > 0}")
-                print(f"[DEBUG] Email field found: {len(email_field) > 0}")
-                print(f"[DEBUG] Password field found: {len(password_field) > 0}")
-                driver.save_screenshot(os.path.join(log_dir, "step_1_login_failed_form_visible.png"))
-                raise Exception("Login failed - login form still visible. OTP handling may have failed.")
-        except Exception as form_check_err:
-            if "Login failed" in str(form_check_err):
-                raise  # Re-raise our own exception
-            print(f"[DEBUG] Form check error (will proceed): {form_check_err}")
+        # Login FORM elements still present - we definitely failed
+        if page['login_form']:
+            print("[ERROR] ❌ Login form still visible - login/OTP failed!")
+            print(f"[DEBUG] Page state: {page['state']} {page['evidence']}")
+            shots.capture("step_1_login_failed_form_visible", failure=True)
+            raise Exception("Login failed - login form still visible. OTP handling may have failed.")
     
     # Check for logged-in indicators
-    page_source = driver.page_source.lower()
-    logged_in_indicators = {
-        'naukri360': 'naukri360' in page_source,
-        'my_naukri': 'my naukri' in page_source or 'mynaukri' in page_source,
-        'profile_link': '/mnjuser/profile' in page_source or '/mnjuser/homepage' in page_source,
-    }
+    logged_in_indicators = page['indicators']
     
     is_logged_in = any(logged_in_indicators.values())
     positive_checks = sum(1 for v in logged_in_indicators.values() if v)
@@ -452,88 +489,345 @@ try:
         is_logged_in = True
     else:
         print("[ERROR] ❌ Login verification failed - no logged-in indicators and still on login page")
-        driver.save_screenshot(os.path.join(log_dir, "step_1_login_verification_failed.png"))
+        shots.capture("step_1_login_verification_failed", failure=True)
         raise Exception("Login verification failed - could not confirm successful login")
     
+    step.end()
     print("[✓] Login verification completed")
-    driver.save_screenshot(os.path.join(log_dir, "step_1_login_success.png"))
+    shots.capture("step_1_login_success")
+
+
+def is_session_valid(driver, shots):
+    """
+    Open the profile page with the restored session and check we were not
+    bounced back to the login page.
+    """
+    print("[Session] Checking restored session...")
+    driver.get(PROFILE_URL)
+    PageWaits(driver).page_loaded()
+    page = classify_page(driver)
+    current_url = page['url'].lower()
+    print(f"[DEBUG] URL with restored session: {page['url']} ({page['state']})")
+    if "login" in current_url or "mnjuser/profile" not in current_url or page['state'] == LOGIN_FORM:
+        print("[Session] ⚠️  Restored session has expired - falling back to full login")
+        return False
+    print("[Session] ✅ Restored session is valid - skipping login and OTP")
+    shots.capture("step_1_session_restored")
+    return True
+
 
-    # Step 2: Profile
-    print("[→] Navigating to profile page...")
-    driver.get("https://www.naukri.com/mnjuser/profile")
-    time.sleep(8)
+def update_headline(driver, shots, headline=HEADLINE_TEXT):
+    """Steps 2-5: open the profile, edit the Resume headline and save it."""
+    open_profile(driver, shots)
+    edit_headline(driver, shots, headline)
+    save_headline(driver, shots)
+
+
+def open_profile(driver, shots):
+    """Step 2: make sure the profile page is open. Raises if it is not reachable."""
+    waits = PageWaits(driver)
+    step = start_span("profile_page")
+    if "mnjuser/profile" not in driver.current_url.lower():
+        print("[→] Navigating to profile page...")
+        driver.get(PROFILE_URL)
+        waits.page_loaded()
     
     # Verify we're on profile page
     if "profile" not in driver.current_url.lower():
         print(f"[WARN] ⚠️  Not on profile page. Current URL: {driver.current_url}")
-        driver.save_screenshot(os.path.join(log_dir, "step_2_not_on_profile.png"))
-    else:
-        print("[✓] Successfully reached profile page")
+        shots.capture("step_2_not_on_profile", failure=True)
+        step.end(status="error")
+        raise Exception(f"Not on the profile page: {driver.current_url}")
+    print("[✓] Successfully reached profile page")
     
-    driver.save_screenshot(os.path.join(log_dir, "step_2_profile_page.png"))
-    time.sleep(3)
+    shots.capture("step_2_profile_page")
+    step.end()
+
+
+def reload_profile(driver):
+    """Retry recovery for the profile steps: a fresh profile page (the session stays)."""
+    print("[Checkpoint] Reloading the profile page...")
+    driver.get(PROFILE_URL)
+    PageWaits(driver).page_loaded()
+
+
+def edit_headline(driver, shots, headline=HEADLINE_TEXT):
+    """Steps 3-4: open the Resume headline editor and enter the text."""
+    wait = WebDriverWait(driver, 20)
 
     # Step 3: Resume Headline
+    step = start_span("headline_edit")
     print("[🔍] Locating Resume Headline section...")
-    edit_btn = wait.until(EC.element_to_be_clickable(
-        (By.XPATH, "//span[text()='Resume headline']/following-sibling::span[contains(@class, 'edit')]")
-    ))
-    driver.save_screenshot(os.path.join(log_dir, "step_3_resume_headline_section_found.png"))
+    edit_btn = wait.until(EC.element_to_be_clickable((By.XPATH, HEADLINE_EDIT_XPATH)))
+    shots.capture("step_3_resume_headline_section_found")
     edit_btn.click()
     print("[✏️] Clicked edit")
-    time.sleep(2)
-    driver.save_screenshot(os.path.join(log_dir, "step_3_edit_clicked.png"))
 
     # Step 4: Update text
     textarea = wait.until(EC.visibility_of_element_located((By.ID, "resumeHeadlineTxt")))
-    textarea.click()
-    time.sleep(1)
-    textarea.clear()
-    updated_text = (
-        "Experienced Sr. Software Development Engineer. Expert in Backend Development, Microservices, Agile, Java, SpringBoot, Redis, Kafka, MySQL, Python, Jenkins, Git, AWS, HTML, CSS, JS, Golang, Mongo, CI/CD, AI, MCP, RAG, Agentic AI, Databases, GenAI"
-    )
-    textarea.send_keys(updated_text)
+    shots.capture("step_3_edit_clicked")
+    fill_fields(driver, [(textarea, headline)])
     print("[✓] Text updated")
-    driver.save_screenshot(os.path.join(log_dir, "step_4_text_updated.png"))
+    shots.capture("step_4_text_updated")
+    step.end()
+
 
-    # Step 5: Save
-    time.sleep(2)
-    save_btn = wait.until(EC.element_to_be_clickable((By.XPATH, "//button[text()='Save']")))
+def reopen_editor(driver, shots, headline=HEADLINE_TEXT):
+    """Retry recovery for the save step: reload the profile and enter the text again."""
+    reload_profile(driver)
+    edit_headline(driver, shots, headline)
+
+
+def save_headline(driver, shots):
+    """Step 5: click Save and wait for Naukri to confirm."""
+    wait = WebDriverWait(driver, 20)
+    waits = PageWaits(driver)
+    step = start_span("headline_save")
+    save_btn = wait.until(EC.element_to_be_clickable((By.XPATH, SAVE_BUTTON_XPATH)))
+    waits.arm_mutation(SAVE_CONFIRMED_JS)
     save_btn.click()
-    time.sleep(3)
+    save_confirmed = waits.wait_mutation(timeout=10, description="save confirmation")
+    step.end(confirmed=save_confirmed)
+    if not save_confirmed:
+        print("[WARN] ⚠️  Save was not confirmed by the page - check step_5 screenshot")
+        shots.capture("step_5_save_unconfirmed", failure=True)
     print("[✓] Resume Headline updated")
-    driver.save_screenshot(os.path.join(log_dir, "step_5_save_clicked.png"))
-    
-    # Write success status
-    write_status_summary(
-        status="SUCCESS",
-        message="Profile headline updated successfully",
-        details={"profile_section": "Resume Headline", "automated": True}
-    )
-    print("[✅] Profile update completed successfully!")
+    shots.capture("step_5_save_clicked")
+
+
+def run_account(driver, email, password, log_dir, headline=HEADLINE_TEXT,
+                otp_watch=None, startup_timings=None, probe_live_session=False,
+                coordinator=None):
+    """
+    Run the full login -> profile update flow for one account on an existing driver.
+
+    With probe_live_session the browser's current session is checked first and
+    login is skipped while it is still valid (daemon mode keeps one browser).
+    With a coordinator (whose begin() said attempt) OTPs are recorded in its
+    ledger, and a fresh login is refused when the OTP budget is used up.
+
+    The run is split into checkpointed steps (checkpoints.py): a step that
+    fails after login is retried in place on the logged-in browser, and
+    login itself only while no OTP has been requested, so a successful
+    update costs at most one OTP. A run that died after login is resumed
+    by the next run: login is skipped via the saved session, and so is
+    opening the profile if the dead run got past it (the session check
+    already lands there); the headline steps run again.
+
+    Writes run_status.json into log_dir and returns the status string
+    (SUCCESS, RATE_LIMITED, DEFERRED or FAILURE). Never raises for flow errors.
+    """
+    # Startup phase timings go into every status file of this run
+    base_details = {"startup": startup_timings} if startup_timings else {}
+    locators = get_locator_cache()
+    blocker = ResourceBlocker.from_env(driver)
+    checkpoints = RunCheckpoints.from_env(email)
+
+    # Step timeline of this run; the startup phases ended just before it began
+    timeline = Timeline().activate()
+    if startup_timings:
+        startup_total = startup_timings.get("total", {}).get("duration_seconds", 0.0)
+        for name, phase in startup_timings.items():
+            if name != "total":
+                timeline.add(name, phase["start_offset_seconds"] - startup_total,
+                             phase["duration_seconds"], parent="startup")
+
+    def run_details(status, **extra):
+        # Close the timeline and collect everything every status file carries
+        timeline.finish(status.lower())
+        if metrics_enabled():
+            timeline.write_openmetrics(os.path.join(log_dir, "metrics.prom"),
+                                       labels={"account": email, "status": status})
+        return {**base_details, "timeline": timeline.to_list(), "checkpoints": checkpoints.finish(status),
+                "locator_cache": locators.stats(), "network": blocker.report(), **extra}
+
+    # Encrypted session reuse (skips login + OTP while the saved session is valid)
+    session_store = SessionStore.from_env(email, base_url=NAUKRI_BASE_URL)
+    session_restored = False
+    shots = ScreenshotPipeline(driver, log_dir)
+    resume = checkpoints.resume_point()
+    if resume:
+        print(f"[Checkpoint] The run of {resume['started_at']} got past login (to {resume['last_step']}) "
+              "but did not finish - resuming from the saved session")
+        if not session_store:
+            print("[Checkpoint] ⚠️  No saved session to resume from (NAUKRI_SESSION_KEY not set) - logging in again")
 
-except Exception as e:
-    error_type = type(e).__name__
-    error_msg = str(e)
-    print(f"[ERROR] {error_type}: {error_msg}")
-    print(f"[DEBUG] Current URL at error: {driver.current_url}")
-    
     try:
-        driver.save_screenshot(os.path.join(log_dir, "error_occurred.png"))
-        print(f"[INFO] Error screenshot saved")
-    except:
-        print("[WARN] Could not save error screenshot")
-    
-    # Write failure status
-    write_status_summary(
-        status="FAILURE",
-        message=f"Script failed: {error_type}",
-        details={"error": error_msg, "error_type": error_type, "url": driver.current_url}
-    )
-    
-    # Exit with error code
-    sys.exit(1)
+        if probe_live_session:
+            with span("session_probe") as probe_span:
+                session_restored = is_session_valid(driver, shots)
+                probe_span.end(valid=session_restored)
+
+        if not session_restored and session_store and session_store.restore(driver):
+            with span("session_restore") as restore_span:
+                session_restored = is_session_valid(driver, shots)
+                restore_span.end(valid=session_restored)
+            if not session_restored:
+                # Drop the stale cookies so the login page starts clean
+                session_store.discard(driver)
+
+        if session_restored:
+            checkpoints.mark(LOGIN, via="live_session" if probe_live_session else "saved_session")
+        else:
+            if coordinator and not coordinator.otp_allowed:
+                raise OTPBudgetExhausted(coordinator.decision["reason"])
+            # login() closes its OTP source on every exit, failures included, so only
+            # the first attempt gets the watch baselined at startup and a retry opens
+            # a fresh one
+            pending_watch = [otp_watch]
+            otp_requests = checkpoints.journal["otp_requests"]
+
+            def login_step():
+                watch, pending_watch[0] = pending_watch[0], None
+                login(driver, email, password, shots, otp_watch=watch, coordinator=coordinator,
+                      checkpoints=checkpoints)
+
+            checkpoints.run(
+                LOGIN, login_step,
+                # Logged in after all (e.g. only the verification timed out) - no second OTP
+                verify=lambda: otp_requests != checkpoints.journal["otp_requests"] and is_session_valid(driver, shots),
+                retry_if=lambda: otp_requests == checkpoints.journal["otp_requests"],
+                fatal=(RateLimitedError,),
+            )
+            # Saved right away, so a crash in a later step resumes without a new OTP
+            if session_store:
+                session_store.save(driver)
+
+        if session_restored and checkpoints.done_before(OPEN_PROFILE):
+            # The session check just opened the profile page the last run got past
+            print("[Checkpoint] Profile page already open - resuming at the headline edit")
+            checkpoints.mark(OPEN_PROFILE, via="resume")
+        else:
+            checkpoints.run(OPEN_PROFILE, lambda: open_profile(driver, shots),
+                            recover=lambda: reload_profile(driver))
+        checkpoints.run(EDIT_HEADLINE, lambda: edit_headline(driver, shots, headline),
+                        recover=lambda: reload_profile(driver))
+        checkpoints.run(SAVE_HEADLINE, lambda: save_headline(driver, shots),
+                        recover=lambda: reopen_editor(driver, shots, headline))
+        
+        # Persist the refreshed session cookies for the next run
+        if session_store:
+            session_store.save(driver)
+        
+        # Write success status
+        write_status_summary(
+            log_dir,
+            status="SUCCESS",
+            message="Profile headline updated successfully",
+            details=run_details("SUCCESS", profile_section="Resume Headline", automated=True,
+                                session_reused=session_restored),
+            account=email
+        )
+        print("[✅] Profile update completed successfully!")
+        return "SUCCESS"
+
+    except OTPBudgetExhausted as e:
+        print(f"[Budget] ⏸️  Saved session expired and {e} - deferring")
+        write_status_summary(
+            log_dir,
+            status="DEFERRED",
+            message="OTP budget used up and the saved session expired. Will retry later.",
+            details=run_details("DEFERRED", budget=coordinator.decision, expected=True),
+            account=email
+        )
+        return "DEFERRED"
+
+    except RateLimitedError:
+        if coordinator:
+            coordinator.record_rate_limited()
+        write_status_summary(
+            log_dir,
+            status="RATE_LIMITED",
+            message="Naukri rate limited OTP requests. Will retry in next scheduled run.",
+            details=run_details("RATE_LIMITED", retry_in="6 hours", expected=True),
+            account=email
+        )
+        print("[INFO] Exiting gracefully - will retry on next schedule")
+        return "RATE_LIMITED"
+
+    except Exception as e:
+        error_type = type(e).__name__
+        error_msg = str(e)
+        print(f"[ERROR] {error_type}: {error_msg}")
+        print(f"[DEBUG] Current URL at error: {driver.current_url}")
+        
+        shots.capture("error_occurred", failure=True)
+        
+        # Write failure status
+        write_status_summary(
+            log_dir,
+            status="FAILURE",
+            message=f"Script failed: {error_type}",
+            details=run_details("FAILURE", error=error_msg, error_type=error_type,
+                                url=driver.current_url),
+            account=email
+        )
+        return "FAILURE"
+
+    finally:
+        if session_store:
+            session_store.detach(driver)
+        shots.close()
+        timeline.finish("error")
+        locators.save()
+        print(f"[Locator] Cache hit rate: {locators.stats()}")
+
+
+def main():
+    # daemon.py builds on this module, so it is imported only when needed here
+    from daemon import add_daemon_arguments, daemon_options, run_daemon
+
+    parser = argparse.ArgumentParser(description="Update the Naukri resume headline")
+    parser.add_argument("--daemon", action="store_true",
+                        help="Stay resident with a warm browser and refresh on a schedule")
+    add_daemon_arguments(parser)
+    args = parser.parse_args()
+
+    # Load credentials from .env file
+    load_dotenv()
+    email = os.environ.get("NAUKRI_EMAIL")
+    password = os.environ.get("NAUKRI_PASSWORD")
+
+    # Validate credentials
+    error = validate_credentials(email, password)
+    if error:
+        print(f"[ERROR] {error}!")
+        print("Please create a .env file with:")
+        print("NAUKRI_EMAIL=your_email@example.com")
+        print("NAUKRI_PASSWORD=your_password")
+        sys.exit(1)
+
+    if args.daemon:
+        run_daemon(email, password, **daemon_options(args))
+        return
+
+    log_dir = make_log_dir()
+    # Check the OTP budget and take the account's run lock before launching anything
+    coordinator = RunCoordinator(email)
+    decision = coordinator.begin()
+    if decision["action"] != ATTEMPT:
+        write_budget_status(log_dir, decision, account=email)
+        coordinator.finish()
+        sys.exit(0)
+
+    try:
+        # Resolve/launch Chrome and warm up the OTP source at the same time
+        pipeline = StartupPipeline(launch_browser=create_driver, otp_account=email)
+        driver, otp_watch = pipeline.run()
+        try:
+            status = run_account(driver, email, password, log_dir, otp_watch=otp_watch,
+                                 startup_timings=pipeline.timings, coordinator=coordinator)
+        finally:
+            driver.quit()
+            print("[INFO] Browser closed.")
+            if otp_watch is not None:
+                otp_watch.close()
+    finally:
+        coordinator.finish()
+
+    # Rate limiting and deferral are expected behaviour, so only a real failure is a non-zero exit
+    sys.exit(1 if status == "FAILURE" else 0)
+
 
-finally:
-    driver.quit()
-    print("[INFO] Browser closed.")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+import json
+import time
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+
+# Counts in-flight fetch/XHR requests in every document. Installed through CDP
+# (Page.addScriptToEvaluateOnNewDocument) so it is in place before page scripts run.
+NETWORK_TRACKER_JS = """
+(function() {
+    if (window.__pubNet) return;
+    var net = window.__pubNet = {pending: 0, last: Date.now()};
+    function start() { net.pending++; net.last = Date.now(); }
+    function end() { net.pending = Math.max(0, net.pending - 1); net.last = Date.now(); }
+    if (window.fetch) {
+        var origFetch = window.fetch;
+        window.fetch = function() {
+            start();
+            return origFetch.apply(this, arguments).then(
+                function(r) { end(); return r; },
+                function(e) { end(); throw e; });
+        };
+    }
+    var origSend = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function() {
+        start();
+        this.addEventListener('loadend', end);
+        return origSend.apply(this, arguments);
+    };
+})();
+"""
+
+# Arms a MutationObserver that flips window.__pubWatch.done once the predicate
+# (a JS expression substituted for %s) becomes true after a DOM change.
+ARM_MUTATION_WATCH_JS = """
+var predicate = function() { return (%s); };
+if (window.__pubWatch && window.__pubWatch.observer) window.__pubWatch.observer.disconnect();
+var watch = window.__pubWatch = {done: false, observer: null};
+watch.observer = new MutationObserver(function() {
+    try {
+        if (predicate()) { watch.done = true; watch.observer.disconnect(); }
+    } catch (e) {}
+});
+watch.observer.observe(document.documentElement,
+    {childList: true, subtree: true, attributes: true, characterData: true});
+"""
+
+
+class PageWaits:
+    """
+    Event-driven replacements for fixed time.sleep calls.
+
+    Every wait is bounded by a timeout. Readiness waits (document, network,
+    URL, mutation) return True/False and log on timeout so the flow can carry
+    on the same way it did after a fixed sleep; element waits raise
+    TimeoutException like WebDriverWait does.
+    """
+
+    def __init__(self, driver, default_timeout=20, poll_frequency=0.1):
+        self.driver = driver
+        self.default_timeout = default_timeout
+        self.poll_frequency = poll_frequency
+
+    def install(self):
+        """Install the in-page network tracker for every future document."""
+        try:
+            self.driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': NETWORK_TRACKER_JS})
+        except WebDriverException as e:
+            print(f"[Wait] Could not install network tracker: {e}")
+
+    def _wait(self, timeout, ignored_exceptions=None):
+        return WebDriverWait(
+            self.driver,
+            timeout or self.default_timeout,
+            poll_frequency=self.poll_frequency,
+            ignored_exceptions=ignored_exceptions,
+        )
+
+    def _soft_until(self, condition, timeout, description):
+        start = time.time()
+        try:
+            # Navigation can briefly break script execution - keep polling through it
+            self._wait(timeout, ignored_exceptions=(WebDriverException,)).until(condition)
+            print(f"[Wait] {description} after {time.time() - start:.2f}s")
+            return True
+        except TimeoutException:
+            print(f"[Wait] ⚠️  Timed out after {timeout or self.default_timeout}s waiting for {description}")
+            return False
+
+    def document_ready(self, timeout=15):
+        """Wait for document.readyState == 'complete'."""
+        return self._soft_until(
+            lambda d: d.execute_script("return document.readyState") == "complete",
+            timeout, "document ready")
+
+    def network_idle(self, idle_ms=500, timeout=10):
+        """Wait until no fetch/XHR has been in flight for idle_ms."""
+        script = (
+            "var n = window.__pubNet;"
+            " if (!n) return true;"
+            f" return n.pending === 0 && (Date.now() - n.last) >= {int(idle_ms)};"
+        )
+        return self._soft_until(lambda d: d.execute_script(script), timeout, "network idle")
+
+    def page_loaded(self, timeout=15):
+        """Document ready followed by network idle - the replacement for sleep(8) after driver.get."""
+        ready = self.document_ready(timeout)
+        return self.network_idle(timeout=timeout) and ready
+
+    def url_changes(self, old_url, timeout=15):
+        """Wait for the URL to move away from old_url."""
+        return self._soft_until(lambda d: d.current_url != old_url, timeout, "URL change")
+
+    def url_contains(self, fragment, timeout=15):
+        """Wait for the URL to contain fragment (case-insensitive)."""
+        fragment = fragment.lower()
+        return self._soft_until(
+            lambda d: fragment in d.current_url.lower(), timeout, f"URL containing '{fragment}'")
+
+    def url_lacks(self, fragment, timeout=15):
+        """Wait for the URL to no longer contain fragment (case-insensitive)."""
+        fragment = fragment.lower()
+        return self._soft_until(
+            lambda d: fragment not in d.current_url.lower(), timeout, f"URL without '{fragment}'")
+
+    def js_condition(self, expression, timeout=15, description=None):
+        """Wait for an in-page JS expression to become truthy (single round trip per poll)."""
+        script = f"try {{ return !!({expression}); }} catch (e) {{ return false; }}"
+        return self._soft_until(
+            lambda d: d.execute_script(script), timeout, description or "page condition")
+
+    def text_appears(self, phrases, timeout=15):
+        """Wait for any of the given lowercase phrases to appear in the page text."""
+        expression = (
+            "(function(t) { return [" + ", ".join(json.dumps(p) for p in phrases) + "]"
+            ".some(function(p) { return t.indexOf(p) !== -1; }); })"
+            "((document.body && document.body.innerText || '').toLowerCase())"
+        )
+        return self.js_condition(expression, timeout, "page text")
+
+    def clickable(self, locator, timeout=None):
+        """Wait for an element to be visible and enabled. Raises TimeoutException."""
+        return self._wait(timeout).until(EC.element_to_be_clickable(locator))
+
+    def visible(self, locator, timeout=None):
+        """Wait for an element to be visible. Raises TimeoutException."""
+        return self._wait(timeout).until(EC.visibility_of_element_located(locator))
+
+    def arm_mutation(self, expression):
+        """
+        Start watching the DOM for expression to become true.
+        Call before the action (e.g. a Save click), then wait_mutation().
+        """
+        self.driver.execute_script(ARM_MUTATION_WATCH_JS % expression)
+
+    def wait_mutation(self, timeout=10, description="DOM confirmation"):
+        """Wait for a watch armed with arm_mutation() to fire."""
+        return self._soft_until(
+            lambda d: d.execute_script("return !!(window.__pubWatch && window.__pubWatch.done);"),
+            timeout, description)